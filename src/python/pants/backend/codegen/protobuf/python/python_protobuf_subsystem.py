@@ -54,6 +54,20 @@ class PythonProtobufSubsystem(Subsystem):
             ),
         )
 
+        register(
+            "--batch-size",
+            type=int,
+            default=1,
+            advanced=True,
+            help=(
+                "The maximum number of `protobuf_library` targets to generate Python code for with "
+                "a single run of protoc. Targets are batched with the other `protobuf_library` "
+                "targets under the same source root, and the generated files are then split back "
+                "out per target. A larger value avoids setting up a sandbox per target, but any "
+                "change to a target in a batch will regenerate the whole batch."
+            ),
+        )
+
     @property
     def runtime_dependencies(self) -> UnparsedAddressInputs:
         return UnparsedAddressInputs(self.options.runtime_dependencies, owning_address=None)
@@ -66,6 +80,10 @@ class PythonProtobufSubsystem(Subsystem):
     def mypy_plugin_version(self) -> str:
         return cast(str, self.options.mypy_plugin_version)
 
+    @property
+    def batch_size(self) -> int:
+        return max(1, cast(int, self.options.batch_size))
+
 
 class InjectPythonProtobufDependencies(InjectDependenciesRequest):
     inject_for = ProtobufDependencies
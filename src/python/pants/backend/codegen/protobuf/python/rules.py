@@ -1,7 +1,10 @@
 # Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import itertools
+from dataclasses import dataclass
 from pathlib import PurePath
+from typing import Iterable, Tuple
 
 from pants.backend.codegen.protobuf.protoc import Protoc
 from pants.backend.codegen.protobuf.python.additional_fields import PythonSourceRootField
@@ -17,15 +20,19 @@ from pants.backend.python.util_rules.pex import (
     PexRequest,
     PexRequirements,
 )
+from pants.base.specs import AddressSpecs, DescendantAddresses
 from pants.core.util_rules.external_tool import DownloadedExternalTool, ExternalToolRequest
 from pants.core.util_rules.source_files import SourceFilesRequest
 from pants.core.util_rules.stripped_source_files import StrippedSourceFiles
+from pants.engine.addresses import Address, Addresses
 from pants.engine.fs import (
     AddPrefix,
     CreateDigest,
     Digest,
+    DigestSubset,
     Directory,
     MergeDigests,
+    PathGlobs,
     RemovePrefix,
     Snapshot,
 )
@@ -36,12 +43,14 @@ from pants.engine.target import (
     GeneratedSources,
     GenerateSourcesRequest,
     Sources,
+    Targets,
     TransitiveTargets,
     TransitiveTargetsRequestLite,
 )
 from pants.engine.unions import UnionRule
 from pants.source.source_root import SourceRoot, SourceRootRequest
 from pants.util.logging import LogLevel
+from pants.util.strutil import pluralize
 
 
 class GeneratePythonFromProtobufRequest(GenerateSourcesRequest):
@@ -49,13 +58,50 @@ class GeneratePythonFromProtobufRequest(GenerateSourcesRequest):
     output = PythonSources
 
 
-@rule(desc="Generate Python from Protobuf", level=LogLevel.DEBUG)
-async def generate_python_from_protobuf(
-    request: GeneratePythonFromProtobufRequest,
+@dataclass(frozen=True)
+class GeneratePythonFromProtobufBatchRequest:
+    """Generate Python from several `protobuf_library` targets with a single run of protoc.
+
+    All of the targets must share the same gRPC setting, as it determines the protoc plugins to run.
+    """
+
+    addresses: Tuple[Address, ...]
+    grpc: bool
+
+
+@dataclass(frozen=True)
+class GeneratedPythonFromProtobufBatch:
+    # The generated files, relative to the (stripped) roots of the .proto files.
+    digest: Digest
+
+
+def _partition_for_batch(
+    addresses: Iterable[Address], address: Address, *, batch_size: int
+) -> Tuple[Address, ...]:
+    """Deterministically partition `addresses` into batches, and return the one containing
+    `address`."""
+    sorted_addresses = sorted(addresses)
+    for start in range(0, len(sorted_addresses), batch_size):
+        batch = tuple(sorted_addresses[start : start + batch_size])
+        if address in batch:
+            return batch
+    return (address,)
+
+
+def _generated_python_files(stripped_proto_file: str) -> Tuple[str, ...]:
+    """The files which protoc (and its plugins) may generate for the given .proto file."""
+    # NB: protoc replaces dashes in module names, as they are not valid in Python.
+    module = PurePath(stripped_proto_file).with_suffix("").as_posix().replace("-", "_")
+    return (f"{module}_pb2.py", f"{module}_pb2.pyi", f"{module}_pb2_grpc.py")
+
+
+@rule(desc="Run protoc to generate Python", level=LogLevel.DEBUG)
+async def generate_python_from_protobuf_batch(
+    request: GeneratePythonFromProtobufBatchRequest,
     protoc: Protoc,
     grpc_python_plugin: GrpcPythonPlugin,
     python_protobuf_subsystem: PythonProtobufSubsystem,
-) -> GeneratedSources:
+) -> GeneratedPythonFromProtobufBatch:
     download_protoc_request = Get(
         DownloadedExternalTool, ExternalToolRequest, protoc.get_request(Platform.current)
     )
@@ -67,8 +113,9 @@ async def generate_python_from_protobuf(
     # actually generate those dependencies; it only needs to look at their .proto files to work
     # with imports.
     # TODO(#10917): Use TransitiveTargets instead of TransitiveTargetsLite.
-    transitive_targets = await Get(
-        TransitiveTargets, TransitiveTargetsRequestLite([request.protocol_target.address])
+    transitive_targets, batch_targets = await MultiGet(
+        Get(TransitiveTargets, TransitiveTargetsRequestLite(request.addresses)),
+        Get(Targets, Addresses(request.addresses)),
     )
 
     # NB: By stripping the source roots, we avoid having to set the value `--proto_path`
@@ -80,20 +127,21 @@ async def generate_python_from_protobuf(
             for_sources_types=(ProtobufSources,),
         ),
     )
-    target_stripped_sources_request = Get(
-        StrippedSourceFiles, SourceFilesRequest([request.protocol_target[ProtobufSources]])
+    batch_stripped_sources_request = Get(
+        StrippedSourceFiles,
+        SourceFilesRequest(tgt[ProtobufSources] for tgt in batch_targets),
     )
 
     (
         downloaded_protoc_binary,
         empty_output_dir,
         all_sources_stripped,
-        target_sources_stripped,
+        batch_sources_stripped,
     ) = await MultiGet(
         download_protoc_request,
         create_output_dir_request,
         all_stripped_sources_request,
-        target_stripped_sources_request,
+        batch_stripped_sources_request,
     )
 
     # To run the MyPy Protobuf plugin, we first install it with Pex, then extract the wheels and
@@ -120,7 +168,7 @@ async def generate_python_from_protobuf(
             ExternalToolRequest,
             grpc_python_plugin.get_request(Platform.current),
         )
-        if request.protocol_target.get(ProtobufGrcpToggle).value
+        if request.grpc
         else None
     )
 
@@ -153,23 +201,87 @@ async def generate_python_from_protobuf(
         argv.extend(
             [f"--plugin=protoc-gen-grpc={downloaded_grpc_plugin.exe}", "--grpc_out", output_dir]
         )
-    argv.extend(target_sources_stripped.snapshot.files)
+    argv.extend(batch_sources_stripped.snapshot.files)
 
     env = {}
     if extracted_mypy_wheels:
         env["PYTHONPATH"] = ":".join(extracted_mypy_wheels.wheel_directory_paths)
 
+    description = (
+        f"Generating Python sources from {request.addresses[0]}."
+        if len(request.addresses) == 1
+        else (
+            "Generating Python sources from "
+            f"{pluralize(len(request.addresses), 'protobuf_library target')}."
+        )
+    )
     result = await Get(
         ProcessResult,
         Process(
             argv,
             env=env,
             input_digest=input_digest,
-            description=f"Generating Python sources from {request.protocol_target.address}.",
+            description=description,
             level=LogLevel.DEBUG,
             output_directories=(output_dir,),
         ),
     )
+    normalized_digest = await Get(Digest, RemovePrefix(result.output_digest, output_dir))
+    return GeneratedPythonFromProtobufBatch(normalized_digest)
+
+
+@rule(desc="Generate Python from Protobuf", level=LogLevel.DEBUG)
+async def generate_python_from_protobuf(
+    request: GeneratePythonFromProtobufRequest, python_protobuf_subsystem: PythonProtobufSubsystem
+) -> GeneratedSources:
+    grpc = request.protocol_target.get(ProtobufGrcpToggle).value
+    # NB: protoc runs once for all of the files of a `protobuf_library`, even when generating the
+    # sources for only one of its generated subtargets.
+    address = request.protocol_target.address.maybe_convert_to_base_target()
+    batch_addresses: Tuple[Address, ...] = (address,)
+    if python_protobuf_subsystem.batch_size > 1:
+        # Batch with the other `protobuf_library` targets under the same source root (and with
+        # the same gRPC setting). The partitioning only depends on those targets, so every target
+        # in a batch computes the same batch, and protoc runs once for all of them.
+        protobuf_source_root = await Get(
+            SourceRoot, SourceRootRequest, SourceRootRequest.for_target(request.protocol_target)
+        )
+        source_root_spec = "" if protobuf_source_root.path == "." else protobuf_source_root.path
+        candidate_targets = await Get(
+            Targets, AddressSpecs([DescendantAddresses(source_root_spec)])
+        )
+        candidates = [
+            tgt
+            for tgt in candidate_targets
+            if tgt.has_field(ProtobufSources) and tgt.get(ProtobufGrcpToggle).value == grpc
+        ]
+        candidate_source_roots = await MultiGet(
+            Get(SourceRoot, SourceRootRequest, SourceRootRequest.for_target(tgt))
+            for tgt in candidates
+        )
+        batch_addresses = _partition_for_batch(
+            (
+                tgt.address
+                for tgt, source_root in zip(candidates, candidate_source_roots)
+                if source_root == protobuf_source_root
+            ),
+            address,
+            batch_size=python_protobuf_subsystem.batch_size,
+        )
+
+    batch, target_sources_stripped = await MultiGet(
+        Get(
+            GeneratedPythonFromProtobufBatch,
+            GeneratePythonFromProtobufBatchRequest(batch_addresses, grpc=grpc),
+        ),
+        Get(StrippedSourceFiles, SourceFilesRequest([request.protocol_target[ProtobufSources]])),
+    )
+
+    # Split out the files generated for this target from the batch.
+    generated_files = itertools.chain.from_iterable(
+        _generated_python_files(f) for f in target_sources_stripped.snapshot.files
+    )
+    target_digest = await Get(Digest, DigestSubset(batch.digest, PathGlobs(generated_files)))
 
     # We must do some path manipulation on the output digest for it to look like normal sources,
     # including adding back a source root.
@@ -181,15 +293,12 @@ async def generate_python_from_protobuf(
         # The target didn't specify a python source root, so use the protobuf_library's source root.
         source_root_request = SourceRootRequest.for_target(request.protocol_target)
 
-    normalized_digest, source_root = await MultiGet(
-        Get(Digest, RemovePrefix(result.output_digest, output_dir)),
-        Get(SourceRoot, SourceRootRequest, source_root_request),
-    )
+    source_root = await Get(SourceRoot, SourceRootRequest, source_root_request)
 
     source_root_restored = (
-        await Get(Snapshot, AddPrefix(normalized_digest, source_root.path))
+        await Get(Snapshot, AddPrefix(target_digest, source_root.path))
         if source_root.path != "."
-        else await Get(Snapshot, Digest, normalized_digest)
+        else await Get(Snapshot, Digest, target_digest)
     )
     return GeneratedSources(source_root_restored)
 
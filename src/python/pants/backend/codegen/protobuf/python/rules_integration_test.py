@@ -7,7 +7,10 @@ from typing import List
 import pytest
 
 from pants.backend.codegen.protobuf.python import additional_fields
-from pants.backend.codegen.protobuf.python.rules import GeneratePythonFromProtobufRequest
+from pants.backend.codegen.protobuf.python.rules import (
+    GeneratePythonFromProtobufRequest,
+    _generated_python_files,
+)
 from pants.backend.codegen.protobuf.python.rules import rules as protobuf_rules
 from pants.backend.codegen.protobuf.target_types import ProtobufLibrary, ProtobufSources
 from pants.core.util_rules import stripped_source_files
@@ -39,10 +42,12 @@ def assert_files_generated(
     expected_files: List[str],
     source_roots: List[str],
     mypy: bool = False,
+    batch_size: int = 1,
 ) -> None:
     options = [
         "--backend-packages=pants.backend.codegen.protobuf.python",
         f"--source-root-patterns={repr(source_roots)}",
+        f"--python-protobuf-batch-size={batch_size}",
     ]
     if mypy:
         options.append("--python-protobuf-mypy-plugin")
@@ -58,12 +63,15 @@ def assert_files_generated(
     assert set(generated_sources.snapshot.files) == set(expected_files)
 
 
-def test_generates_python(rule_runner: RuleRunner) -> None:
+@pytest.mark.parametrize("batch_size", [1, 10])
+def test_generates_python(rule_runner: RuleRunner, batch_size: int) -> None:
     # This tests a few things:
     #  * We generate the correct file names.
     #  * Protobuf files can import other protobuf files, and those can import others
     #    (transitive dependencies). We'll only generate the requested target, though.
     #  * We can handle multiple source roots, which need to be preserved in the final output.
+    #  * When batching, `dir1` and `dir2` are generated by the same run of protoc, but each
+    #    target only gets its own files.
 
     rule_runner.create_file(
         "src/protobuf/dir1/f.proto",
@@ -132,22 +140,34 @@ def test_generates_python(rule_runner: RuleRunner) -> None:
         rule_runner,
         "src/protobuf/dir1",
         source_roots=source_roots,
+        batch_size=batch_size,
         expected_files=["src/protobuf/dir1/f_pb2.py", "src/protobuf/dir1/f2_pb2.py"],
     )
     assert_files_generated(
         rule_runner,
         "src/protobuf/dir2",
         source_roots=source_roots,
+        batch_size=batch_size,
         expected_files=["src/python/dir2/f_pb2.py"],
     )
     assert_files_generated(
         rule_runner,
         "tests/protobuf/test_protos",
         source_roots=source_roots,
+        batch_size=batch_size,
         expected_files=["tests/protobuf/test_protos/f_pb2.py"],
     )
 
 
+def test_generated_python_files() -> None:
+    assert _generated_python_files("dir/f.proto") == (
+        "dir/f_pb2.py",
+        "dir/f_pb2.pyi",
+        "dir/f_pb2_grpc.py",
+    )
+    assert _generated_python_files("my-dir/my-f.proto")[0] == "my_dir/my_f_pb2.py"
+
+
 def test_top_level_proto_root(rule_runner: RuleRunner) -> None:
     rule_runner.create_file(
         "protos/f.proto",
@@ -1,7 +1,11 @@
 # Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
-from typing import Tuple
+import dataclasses
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple, cast
 
 from pants.core.util_rules.external_tool import (
     DownloadedExternalTool,
@@ -9,11 +13,11 @@ from pants.core.util_rules.external_tool import (
     ExternalToolRequest,
 )
 from pants.engine.console import Console
-from pants.engine.fs import Digest, MergeDigests, SourcesSnapshot
+from pants.engine.fs import Digest, DigestSubset, MergeDigests, PathGlobs, SourcesSnapshot
 from pants.engine.goal import Goal, GoalSubsystem
 from pants.engine.platform import Platform
 from pants.engine.process import Process, ProcessResult
-from pants.engine.rules import Get, collect_rules, goal_rule
+from pants.engine.rules import Get, MultiGet, collect_rules, goal_rule
 from pants.option.custom_types import shell_str
 from pants.util.enums import match
 from pants.util.logging import LogLevel
@@ -64,14 +68,130 @@ class CountLinesOfCodeSubsystem(GoalSubsystem):
 
     name = "count-loc"
 
+    @classmethod
+    def register_options(cls, register) -> None:
+        super().register_options(register)
+        register(
+            "--batch-size",
+            type=int,
+            default=None,
+            advanced=True,
+            help=(
+                "If set (to at least 1), count the files in batches of roughly this many files, in "
+                "parallel, and sum the counts of each language. Files are assigned to batches by "
+                "a hash of their path, so a rerun only re-counts the batches with a changed file, "
+                "and the rest are served from the cache. The summary per language is the same as "
+                "SCC's, but any COCOMO estimate is not, as it cannot be summed across batches."
+            ),
+        )
+
+    @property
+    def batch_size(self) -> Optional[int]:
+        batch_size = cast(Optional[int], self.options.batch_size)
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(
+                f"--{self.name}-batch-size must be at least 1, but was {batch_size}. Leave it "
+                "unset to count all the files in a single process."
+            )
+        return batch_size
+
 
 class CountLinesOfCode(Goal):
     subsystem_cls = CountLinesOfCodeSubsystem
 
 
+@dataclass(frozen=True)
+class LanguageCount:
+    language: str
+    files: int
+    lines: int
+    blanks: int
+    comments: int
+    code: int
+    complexity: int
+
+    def __add__(self, other: "LanguageCount") -> "LanguageCount":
+        return LanguageCount(
+            language=self.language,
+            files=self.files + other.files,
+            lines=self.lines + other.lines,
+            blanks=self.blanks + other.blanks,
+            comments=self.comments + other.comments,
+            code=self.code + other.code,
+            complexity=self.complexity + other.complexity,
+        )
+
+
+def partition_into_batches(files: Iterable[str], batch_size: int) -> Tuple[Tuple[str, ...], ...]:
+    """Partition `files` into batches of roughly `batch_size` files each.
+
+    A file's batch only depends on its path and the number of batches, which is rounded up to a
+    power of two. So the batches (and so the cached counts of them) are stable as long as the
+    repo is within a factor of two of its size, and editing, adding or removing a file only
+    changes the one batch which holds it.
+    """
+    files = sorted(files)
+    batch_count = 1
+    while batch_count * batch_size < len(files):
+        batch_count *= 2
+    batches: Dict[int, List[str]] = {}
+    for path in files:
+        batch = int(hashlib.sha256(path.encode()).hexdigest(), 16) % batch_count
+        batches.setdefault(batch, []).append(path)
+    return tuple(tuple(batches[batch]) for batch in sorted(batches))
+
+
+def parse_scc_json(stdout: bytes) -> Tuple[LanguageCount, ...]:
+    return tuple(
+        LanguageCount(
+            language=summary["Name"],
+            files=summary["Count"],
+            lines=summary["Lines"],
+            blanks=summary["Blank"],
+            comments=summary["Comment"],
+            code=summary["Code"],
+            complexity=summary["Complexity"],
+        )
+        for summary in json.loads(stdout) or ()
+    )
+
+
+def sum_language_counts(counts: Iterable[LanguageCount]) -> Tuple[LanguageCount, ...]:
+    """Sum the counts of each language, sorted like SCC sorts them: by the number of files."""
+    totals: Dict[str, LanguageCount] = {}
+    for count in counts:
+        total = totals.get(count.language)
+        totals[count.language] = count if total is None else total + count
+    return tuple(sorted(totals.values(), key=lambda count: (-count.files, count.language)))
+
+
+def format_language_counts(counts: Iterable[LanguageCount]) -> str:
+    """Format the counts as a table with the same columns as SCC's default output."""
+    counts = tuple(counts)
+    total = LanguageCount("Total", 0, 0, 0, 0, 0, 0)
+    for count in counts:
+        total += count
+    header = ("Language", "Files", "Lines", "Blanks", "Comments", "Code", "Complexity")
+    rows = [tuple(str(cell) for cell in dataclasses.astuple(count)) for count in (*counts, total)]
+    widths = [max(len(row[i]) for row in (header, *rows)) for i in range(len(header))]
+
+    def format_row(row: Tuple[str, ...]) -> str:
+        return "  ".join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        )
+
+    separator = "-" * len(format_row(header))
+    lines = [separator, format_row(header), separator]
+    lines.extend(format_row(row) for row in rows[:-1])
+    lines.extend([separator, format_row(rows[-1]), separator])
+    return "\n".join(lines) + "\n"
+
+
 @goal_rule
 async def count_loc(
     console: Console,
+    count_loc_subsystem: CountLinesOfCodeSubsystem,
     succinct_code_counter: SuccinctCodeCounter,
     sources_snapshot: SourcesSnapshot,
 ) -> CountLinesOfCode:
@@ -83,6 +203,39 @@ async def count_loc(
         ExternalToolRequest,
         succinct_code_counter.get_request(Platform.current),
     )
+
+    batch_size = count_loc_subsystem.batch_size
+    if batch_size is not None:
+        # Each batch is counted in its own process, whose input is only the files of the batch.
+        # So its result is cached by the content of those files, and is reused until one of them
+        # changes.
+        batches = partition_into_batches(sources_snapshot.snapshot.files, batch_size)
+        batch_digests = await MultiGet(
+            Get(Digest, DigestSubset(sources_snapshot.snapshot.digest, PathGlobs(batch)))
+            for batch in batches
+        )
+        batch_input_digests = await MultiGet(
+            Get(Digest, MergeDigests((scc_program.digest, batch_digest)))
+            for batch_digest in batch_digests
+        )
+        batch_results = await MultiGet(
+            Get(
+                ProcessResult,
+                Process(
+                    argv=(scc_program.exe, *succinct_code_counter.args, "--format=json"),
+                    input_digest=batch_input_digest,
+                    description=f"Count lines of code for {pluralize(len(batch), 'file')}",
+                    level=LogLevel.DEBUG,
+                ),
+            )
+            for batch, batch_input_digest in zip(batches, batch_input_digests)
+        )
+        language_counts = sum_language_counts(
+            count for result in batch_results for count in parse_scc_json(result.stdout)
+        )
+        console.print_stdout(format_language_counts(language_counts))
+        return CountLinesOfCode(exit_code=0)
+
     input_digest = await Get(
         Digest, MergeDigests((scc_program.digest, sources_snapshot.snapshot.digest))
     )
@@ -1,13 +1,24 @@
 # Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import json
+
 import pytest
 
 from pants.backend.project_info import count_loc
-from pants.backend.project_info.count_loc import CountLinesOfCode
+from pants.backend.project_info.count_loc import (
+    CountLinesOfCode,
+    CountLinesOfCodeSubsystem,
+    LanguageCount,
+    format_language_counts,
+    parse_scc_json,
+    partition_into_batches,
+    sum_language_counts,
+)
 from pants.backend.python.target_types import PythonLibrary
 from pants.core.util_rules import external_tool
 from pants.engine.target import Sources, Target
+from pants.testutil.option_util import create_goal_subsystem
 from pants.testutil.rule_runner import GoalRuleResult, RuleRunner
 
 
@@ -68,6 +79,76 @@ def test_count_loc(rule_runner: RuleRunner) -> None:
     assert_counts(result.stdout, "Elixir", comment=1, code=1)
 
 
+@pytest.mark.parametrize("batch_size", [1, 2])
+def test_count_loc_batched(rule_runner: RuleRunner, batch_size: int) -> None:
+    py_dir = "src/py/foo"
+    rule_runner.create_file(
+        f"{py_dir}/foo.py", '# A comment.\n\nprint("some code")\n# Another comment.'
+    )
+    rule_runner.create_file(f"{py_dir}/bar.py", '# A comment.\n\nprint("some more code")')
+    rule_runner.create_file(f"{py_dir}/baz.py", 'print("even more code")')
+    rule_runner.add_to_build_file(py_dir, "python_library()")
+    rule_runner.create_file("test/foo.ex", 'IO.puts("Some elixir")\n# A comment')
+
+    result = rule_runner.run_goal_rule(
+        CountLinesOfCode, args=[f"--batch-size={batch_size}", py_dir, "test/foo.ex"]
+    )
+    assert result.exit_code == 0
+    assert_counts(result.stdout, "Python", num_files=3, blank=2, comment=3, code=3)
+    assert_counts(result.stdout, "Elixir", comment=1, code=1)
+
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+def test_invalid_batch_size(batch_size: int) -> None:
+    subsystem = create_goal_subsystem(CountLinesOfCodeSubsystem, batch_size=batch_size)
+    with pytest.raises(ValueError, match="batch-size must be at least 1"):
+        subsystem.batch_size
+
+
+def test_partition_into_batches() -> None:
+    files = [f"src/f{i}.py" for i in range(10)]
+    batches = partition_into_batches(files, batch_size=3)
+    assert len(batches) <= 4
+    assert sorted(f for batch in batches for f in batch) == files
+
+    # Adding a file only changes the batch it lands in, while the batch count is unchanged.
+    new_batches = partition_into_batches([*files, "src/new.py"], batch_size=3)
+    assert len(set(new_batches) - set(batches)) == 1
+
+    assert partition_into_batches(files, batch_size=10) == (tuple(files),)
+
+
+def test_sum_and_format_language_counts() -> None:
+    def scc_json(*summaries: LanguageCount) -> bytes:
+        return json.dumps(
+            [
+                dict(
+                    Name=count.language,
+                    Count=count.files,
+                    Lines=count.lines,
+                    Blank=count.blanks,
+                    Comment=count.comments,
+                    Code=count.code,
+                    Complexity=count.complexity,
+                )
+                for count in summaries
+            ]
+        ).encode()
+
+    python = LanguageCount("Python", 1, 4, 1, 2, 1, 0)
+    elixir = LanguageCount("Elixir", 1, 2, 0, 1, 1, 0)
+    counts = sum_language_counts(
+        [*parse_scc_json(scc_json(python)), *parse_scc_json(scc_json(python, elixir))]
+    )
+    assert counts == (LanguageCount("Python", 2, 8, 2, 4, 2, 0), elixir)
+    assert parse_scc_json(b"null") == ()
+
+    stdout = format_language_counts(counts)
+    assert_counts(stdout, "Python", num_files=2, blank=2, comment=4, code=2)
+    assert_counts(stdout, "Elixir", comment=1, code=1)
+    assert_counts(stdout, "Total", num_files=3, blank=2, comment=5, code=3)
+
+
 def test_passthrough_args(rule_runner: RuleRunner) -> None:
     rule_runner.create_file("foo.py", "print('hello world!')\n")
     rule_runner.add_to_build_file("", "python_library(name='foo')")
@@ -0,0 +1,215 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple, cast
+
+from pants.backend.python.target_types import PythonRequirementsField
+from pants.base.build_root import BuildRoot
+from pants.base.specs import AddressSpecs, DescendantAddresses
+from pants.core.util_rules.distdir import DistDir
+from pants.engine.addresses import Addresses
+from pants.engine.console import Console
+from pants.engine.goal import Goal, GoalSubsystem
+from pants.engine.rules import Get, MultiGet, collect_rules, goal_rule
+from pants.engine.target import (
+    Dependencies,
+    DependenciesRequest,
+    HydratedSources,
+    HydrateSourcesRequest,
+    Sources,
+    UnexpandedTargets,
+)
+from pants.util.dirutil import safe_delete, safe_mkdir_for
+from pants.util.strutil import pluralize
+
+# Bump this when changing the schema: an export with a different version is rebuilt from scratch.
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE targets (address TEXT PRIMARY KEY, type TEXT NOT NULL, fingerprint TEXT NOT NULL);
+CREATE TABLE sources (address TEXT NOT NULL, path TEXT NOT NULL);
+CREATE INDEX sources_by_address ON sources (address);
+CREATE INDEX sources_by_path ON sources (path);
+CREATE TABLE dependencies (address TEXT NOT NULL, dependency TEXT NOT NULL);
+CREATE INDEX dependencies_by_address ON dependencies (address);
+CREATE INDEX dependencies_by_dependency ON dependencies (dependency);
+CREATE TABLE requirements (address TEXT NOT NULL, requirement TEXT NOT NULL);
+CREATE INDEX requirements_by_address ON requirements (address);
+CREATE VIEW dependees AS SELECT dependency AS address, address AS dependee FROM dependencies;
+"""
+
+
+class ExportGraphSubsystem(GoalSubsystem):
+    """Export the target graph to a SQLite database, so that other tools may query it directly.
+
+    The graph contains the targets declared in BUILD files, with dependencies on generated
+    file-level targets recorded as dependencies on the BUILD targets which own them.
+
+    The database has the tables `targets(address, type, fingerprint)`, `sources(address, path)`,
+    `dependencies(address, dependency)` and `requirements(address, requirement)`, along with the
+    view `dependees(address, dependee)`. Every table is indexed by `address`, and `sources` and
+    `dependencies` are also indexed by `path` and `dependency`, for reverse lookups. Re-exporting
+    to the same file only rewrites the targets which changed.
+    """
+
+    name = "export-graph"
+
+    @classmethod
+    def register_options(cls, register):
+        super().register_options(register)
+        register(
+            "--output-file",
+            type=str,
+            default=None,
+            metavar="<path>",
+            help=(
+                "The path of the database to write, relative to the build root. Defaults to "
+                "`graph.db` in the dist dir."
+            ),
+        )
+
+    @property
+    def output_file(self) -> Optional[str]:
+        return cast(Optional[str], self.options.output_file)
+
+
+class ExportGraph(Goal):
+    subsystem_cls = ExportGraphSubsystem
+
+
+@dataclass(frozen=True)
+class ExportedTarget:
+    address: str
+    type_alias: str
+    sources: Tuple[str, ...]
+    dependencies: Tuple[str, ...]
+    requirements: Tuple[str, ...]
+
+    @property
+    def fingerprint(self) -> str:
+        return hashlib.sha256(
+            json.dumps(
+                [self.type_alias, self.sources, self.dependencies, self.requirements]
+            ).encode()
+        ).hexdigest()
+
+
+@dataclass(frozen=True)
+class GraphUpdate:
+    added: int
+    changed: int
+    removed: int
+
+
+def update_graph_database(path: str, targets: Iterable[ExportedTarget]) -> GraphUpdate:
+    """Update the database at `path` (creating it if necessary) to contain exactly `targets`.
+
+    Only the rows of targets which were added, changed or removed since the previous export are
+    written, in a single transaction so that concurrent readers always see a consistent graph.
+    """
+    safe_mkdir_for(path)
+    connection = sqlite3.connect(path)
+    (schema_version,) = connection.execute("PRAGMA user_version").fetchone()
+    if schema_version != SCHEMA_VERSION:
+        connection.close()
+        safe_delete(path)
+        connection = sqlite3.connect(path)
+        connection.executescript(SCHEMA)
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    try:
+        with connection:
+            previous = dict(connection.execute("SELECT address, fingerprint FROM targets"))
+            current = {tgt.address: tgt for tgt in targets}
+
+            removed = previous.keys() - current.keys()
+            stale = [
+                tgt for address, tgt in current.items() if previous.get(address) != tgt.fingerprint
+            ]
+            for address in (*removed, *(tgt.address for tgt in stale)):
+                for table in ("targets", "sources", "dependencies", "requirements"):
+                    connection.execute(f"DELETE FROM {table} WHERE address = ?", (address,))
+            for tgt in stale:
+                connection.execute(
+                    "INSERT INTO targets VALUES (?, ?, ?)",
+                    (tgt.address, tgt.type_alias, tgt.fingerprint),
+                )
+                connection.executemany(
+                    "INSERT INTO sources VALUES (?, ?)", ((tgt.address, p) for p in tgt.sources)
+                )
+                connection.executemany(
+                    "INSERT INTO dependencies VALUES (?, ?)",
+                    ((tgt.address, dep) for dep in tgt.dependencies),
+                )
+                connection.executemany(
+                    "INSERT INTO requirements VALUES (?, ?)",
+                    ((tgt.address, req) for req in tgt.requirements),
+                )
+    finally:
+        connection.close()
+
+    changed = sum(1 for tgt in stale if tgt.address in previous)
+    return GraphUpdate(added=len(stale) - changed, changed=changed, removed=len(removed))
+
+
+@goal_rule
+async def export_graph(
+    console: Console,
+    export_graph_subsystem: ExportGraphSubsystem,
+    build_root: BuildRoot,
+    dist_dir: DistDir,
+) -> ExportGraph:
+    # NB: We export the targets declared in BUILD files, rather than the file-level targets
+    # generated from them, so that the graph matches what users see in their BUILD files.
+    all_targets = sorted(
+        await Get(UnexpandedTargets, AddressSpecs([DescendantAddresses("")])),
+        key=lambda t: t.address,
+    )
+
+    dependencies_per_target = await MultiGet(
+        Get(Addresses, DependenciesRequest(tgt.get(Dependencies), include_special_cased_deps=True))
+        for tgt in all_targets
+    )
+    sources_per_target = await MultiGet(
+        Get(HydratedSources, HydrateSourcesRequest(tgt.get(Sources))) for tgt in all_targets
+    )
+
+    exported_targets = [
+        ExportedTarget(
+            address=tgt.address.spec,
+            type_alias=tgt.alias,
+            sources=sources.snapshot.files,
+            # A dependency on a generated subtarget is recorded as one on its BUILD target, and
+            # a target's dependencies on its own generated subtargets are dropped.
+            dependencies=tuple(
+                sorted(
+                    {dep.maybe_convert_to_base_target().spec for dep in dependencies}
+                    - {tgt.address.spec}
+                )
+            ),
+            requirements=(
+                tuple(str(req) for req in tgt[PythonRequirementsField].value)
+                if tgt.has_field(PythonRequirementsField)
+                else ()
+            ),
+        )
+        for tgt, dependencies, sources in zip(
+            all_targets, dependencies_per_target, sources_per_target
+        )
+    ]
+
+    output_file = export_graph_subsystem.output_file or os.path.join(dist_dir.relpath, "graph.db")
+    update = update_graph_database(os.path.join(build_root.path, output_file), exported_targets)
+    console.print_stderr(
+        f"Wrote the graph of {pluralize(len(exported_targets), 'target')} to {output_file} "
+        f"({update.added} added, {update.changed} changed, {update.removed} removed)."
+    )
+    return ExportGraph(exit_code=0)
+
+
+def rules():
+    return collect_rules()
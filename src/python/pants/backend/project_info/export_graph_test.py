@@ -0,0 +1,60 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import os
+import sqlite3
+from textwrap import dedent
+
+import pytest
+
+from pants.backend.project_info.export_graph import ExportGraph, rules
+from pants.backend.python.target_types import PythonLibrary, PythonRequirementLibrary
+from pants.core.util_rules import distdir
+from pants.testutil.rule_runner import RuleRunner
+
+
+@pytest.fixture
+def rule_runner() -> RuleRunner:
+    return RuleRunner(
+        rules=[*rules(), *distdir.rules()],
+        target_types=[PythonLibrary, PythonRequirementLibrary],
+    )
+
+
+def query(rule_runner: RuleRunner, sql: str):
+    with sqlite3.connect(os.path.join(rule_runner.build_root, "dist", "graph.db")) as connection:
+        return sorted(connection.execute(sql))
+
+
+def test_export_graph(rule_runner: RuleRunner) -> None:
+    rule_runner.create_file("src/app.py")
+    rule_runner.add_to_build_file(
+        "3rdparty",
+        dedent(
+            """\
+            python_requirement_library(name='req', requirements=['foo==1.0'])
+            """
+        ),
+    )
+    rule_runner.add_to_build_file("src", "python_library(dependencies=['3rdparty:req'])")
+
+    result = rule_runner.run_goal_rule(ExportGraph)
+    assert result.exit_code == 0
+    assert "(2 added, 0 changed, 0 removed)" in result.stderr
+    assert query(rule_runner, "SELECT address, type FROM targets") == [
+        ("3rdparty:req", "python_requirement_library"),
+        ("src", "python_library"),
+    ]
+    assert query(rule_runner, "SELECT * FROM sources") == [("src", "src/app.py")]
+    assert query(rule_runner, "SELECT * FROM dependees") == [("3rdparty:req", "src")]
+    assert query(rule_runner, "SELECT * FROM requirements") == [("3rdparty:req", "foo==1.0")]
+
+    # Re-exporting only rewrites the targets which changed.
+    rule_runner.create_file("src/util.py")
+    result = rule_runner.run_goal_rule(ExportGraph)
+    assert "(0 added, 1 changed, 0 removed)" in result.stderr
+    assert query(rule_runner, "SELECT * FROM sources") == [
+        ("src", "src/app.py"),
+        ("src", "src/util.py"),
+    ]
+    assert query(rule_runner, "SELECT * FROM dependees") == [("3rdparty:req", "src")]
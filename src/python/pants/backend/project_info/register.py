@@ -7,6 +7,7 @@ from pants.backend.project_info import (
     count_loc,
     dependees,
     dependencies,
+    export_graph,
     filedeps,
     filter_targets,
     list_roots,
@@ -20,6 +21,7 @@ def rules():
         *count_loc.rules(),
         *dependees.rules(),
         *dependencies.rules(),
+        *export_graph.rules(),
         *filedeps.rules(),
         *filter_targets.rules(),
         *list_roots.rules(),
@@ -1,26 +1,43 @@
 # Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import csv
+import logging
 from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import PurePath
 from typing import DefaultDict, Dict, List, Optional, Set, Tuple, cast
 
+from pants.backend.python.dependency_inference.subsystem import PythonInference
 from pants.backend.python.target_types import (
     ModuleMappingField,
     PythonRequirementsField,
     PythonSources,
 )
+from pants.backend.python.util_rules import extract_pex, pex
+from pants.backend.python.util_rules.extract_pex import ExtractedPexDistributions
+from pants.backend.python.util_rules.pex import (
+    FalliblePex,
+    FalliblePexRequest,
+    Pex,
+    PexInterpreterConstraints,
+    PexRequest,
+    PexRequirements,
+)
 from pants.base.specs import AddressSpecs, DescendantAddresses
 from pants.core.util_rules.source_files import SourceFilesRequest
 from pants.core.util_rules.stripped_source_files import StrippedSourceFiles
 from pants.engine.addresses import Address
-from pants.engine.collection import Collection
+from pants.engine.collection import Collection, DeduplicatedCollection
+from pants.engine.fs import Digest, DigestContents, DigestSubset, PathGlobs
 from pants.engine.rules import Get, MultiGet, collect_rules, rule
 from pants.engine.target import Targets
+from pants.python.python_setup import PythonSetup
 from pants.util.frozendict import FrozenDict
 from pants.util.logging import LogLevel
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class PythonModule:
@@ -124,20 +141,131 @@ class ThirdPartyModuleToAddressMapping:
         return self.address_for_module(parent_module)
 
 
+def modules_from_distribution_metadata(
+    *, record: Optional[str], top_level: Optional[str]
+) -> Tuple[str, ...]:
+    """Determine the modules provided by an installed distribution from its `.dist-info` files.
+
+    RECORD lists every installed file, which lets us descend into namespace packages, e.g. to map
+    `protobuf` to `google.protobuf` rather than to `google`. If there is no RECORD, we fall back to
+    top_level.txt.
+    """
+    if record is None:
+        return tuple(sorted({line.strip() for line in (top_level or "").splitlines()} - {""}))
+
+    paths = {row[0] for row in csv.reader(record.splitlines()) if row}
+    modules: Set[str] = set()
+    for path in paths:
+        parts = PurePath(path).parts
+        if not parts or parts[0].startswith("..") or parts[0].endswith((".dist-info", ".data")):
+            continue
+        for i, part in enumerate(parts):
+            if part == "__pycache__":
+                break
+            if i == len(parts) - 1:
+                # A module file, e.g. `six.py` or `_cffi_backend.cpython-38-x86_64-linux-gnu.so`,
+                # directly in the top level or in a namespace package.
+                if part.endswith((".py", ".so", ".pyd")):
+                    modules.add(".".join((*parts[:i], part.split(".", 1)[0])))
+                break
+            if "/".join((*parts[: i + 1], "__init__.py")) in paths:
+                modules.add(".".join(parts[: i + 1]))
+                break
+            # Otherwise, this is a namespace package, so keep looking for the modules inside it.
+    return tuple(sorted(modules))
+
+
+@dataclass(frozen=True)
+class DistributionModulesRequest:
+    """A request for the modules provided by the distribution which a requirement resolves to."""
+
+    requirement: str
+    interpreter_constraints: PexInterpreterConstraints
+
+
+class DistributionModules(DeduplicatedCollection[str]):
+    sort_input = True
+
+
+@rule(desc="Determining the modules provided by a requirement", level=LogLevel.DEBUG)
+async def find_distribution_modules(request: DistributionModulesRequest) -> DistributionModules:
+    # We only need the distribution of the requirement itself, and not of its dependencies.
+    fallible_requirement_pex = await Get(
+        FalliblePex,
+        FalliblePexRequest(
+            PexRequest(
+                output_filename="distribution.pex",
+                internal_only=True,
+                requirements=PexRequirements([request.requirement]),
+                interpreter_constraints=request.interpreter_constraints,
+                additional_args=("--intransitive",),
+                description=f"Resolving {request.requirement} to determine its modules",
+            )
+        ),
+    )
+    # A requirement which doesn't resolve (e.g. it only has wheels for other platforms, or the
+    # index is unreachable) must not break dependency inference for every other requirement.
+    if fallible_requirement_pex.pex is None:
+        logger.warning(
+            f"Could not resolve {request.requirement} to determine its modules, so guessing them "
+            "from its project name instead. Set `module_mapping` on its target if the guess is "
+            f"wrong. Pex failed with:\n{fallible_requirement_pex.result.stderr.decode()}"
+        )
+        return DistributionModules()
+    distributions = await Get(ExtractedPexDistributions, Pex, fallible_requirement_pex.pex)
+    metadata_digest = await Get(
+        Digest,
+        DigestSubset(
+            distributions.digest,
+            PathGlobs([".deps/*/*.dist-info/RECORD", ".deps/*/*.dist-info/top_level.txt"]),
+        ),
+    )
+    metadata_contents = await Get(DigestContents, Digest, metadata_digest)
+    metadata = {
+        PurePath(file_content.path).name: file_content.content.decode()
+        for file_content in metadata_contents
+    }
+    return DistributionModules(
+        modules_from_distribution_metadata(
+            record=metadata.get("RECORD"), top_level=metadata.get("top_level.txt")
+        )
+    )
+
+
 @rule(desc="Creating map of third party targets to Python modules", level=LogLevel.DEBUG)
-async def map_third_party_modules_to_addresses() -> ThirdPartyModuleToAddressMapping:
+async def map_third_party_modules_to_addresses(
+    python_infer: PythonInference, python_setup: PythonSetup
+) -> ThirdPartyModuleToAddressMapping:
     all_targets = await Get(Targets, AddressSpecs([DescendantAddresses("")]))
+    requirement_targets = [tgt for tgt in all_targets if tgt.has_field(PythonRequirementsField)]
+
+    resolved_modules: Dict[str, DistributionModules] = {}
+    if python_infer.resolve_module_mapping:
+        unmapped_requirements = sorted(
+            {
+                str(python_req)
+                for tgt in requirement_targets
+                for python_req in tgt[PythonRequirementsField].value
+                if python_req.project_name not in (tgt.get(ModuleMappingField).value or {})
+            }
+        )
+        interpreter_constraints = PexInterpreterConstraints(python_setup.interpreter_constraints)
+        modules_per_requirement = await MultiGet(
+            Get(DistributionModules, DistributionModulesRequest(req, interpreter_constraints))
+            for req in unmapped_requirements
+        )
+        resolved_modules = dict(zip(unmapped_requirements, modules_per_requirement))
+
     modules_to_addresses: Dict[str, Address] = {}
     modules_with_multiple_owners: Set[str] = set()
-    for tgt in all_targets:
-        if not tgt.has_field(PythonRequirementsField):
-            continue
+    for tgt in requirement_targets:
         module_map = tgt.get(ModuleMappingField).value or {}  # type: ignore[var-annotated]
         for python_req in tgt[PythonRequirementsField].value:
-            modules = module_map.get(
-                python_req.project_name,
-                [python_req.project_name.lower().replace("-", "_")],
+            modules = module_map.get(python_req.project_name) or resolved_modules.get(
+                str(python_req)
             )
+            if not modules:
+                modules = [python_req.project_name.lower().replace("-", "_")]
             for module in modules:
                 if module in modules_to_addresses:
                     modules_with_multiple_owners.add(module)
@@ -191,4 +319,4 @@ async def map_module_to_address(
 
 
 def rules():
-    return collect_rules()
+    return (*collect_rules(), *extract_pex.rules(), *pex.rules())
@@ -12,6 +12,7 @@ from pants.backend.python.dependency_inference.module_mapper import (
     PythonModule,
     PythonModuleOwners,
     ThirdPartyModuleToAddressMapping,
+    modules_from_distribution_metadata,
 )
 from pants.backend.python.dependency_inference.module_mapper import rules as module_mapper_rules
 from pants.backend.python.target_types import PythonLibrary, PythonRequirementLibrary
@@ -67,6 +68,33 @@ def test_third_party_modules_mapping() -> None:
     assert mapping.address_for_module("pants.task.task.Task") == pants_addr
 
 
+def test_modules_from_distribution_metadata() -> None:
+    record = dedent(
+        """\
+        google/protobuf/__init__.py,sha256=abc,100
+        google/protobuf/message.py,sha256=abc,100
+        google/protobuf/__pycache__/message.cpython-38.pyc,,
+        protobuf-3.13.0-py3.8-nspkg.pth,sha256=abc,100
+        protobuf-3.13.0.dist-info/RECORD,,
+        protobuf-3.13.0.dist-info/top_level.txt,sha256=abc,7
+        six.py,sha256=abc,100
+        _cffi_backend.cpython-38-x86_64-linux-gnu.so,sha256=abc,100
+        ../../bin/protoc-tool,sha256=abc,100
+        """
+    )
+    # Namespace packages are descended into, rather than mapping the top-level `google`.
+    assert modules_from_distribution_metadata(record=record, top_level="google\n") == (
+        "_cffi_backend",
+        "google.protobuf",
+        "six",
+    )
+    assert modules_from_distribution_metadata(record=None, top_level="yaml\n_yaml\n") == (
+        "_yaml",
+        "yaml",
+    )
+    assert modules_from_distribution_metadata(record=None, top_level=None) == ()
+
+
 @pytest.fixture
 def rule_runner() -> RuleRunner:
     return RuleRunner(
@@ -163,6 +191,20 @@ def test_map_third_party_modules_to_addresses(rule_runner: RuleRunner) -> None:
     )
 
 
+def test_map_third_party_modules_with_unresolvable_requirement(rule_runner: RuleRunner) -> None:
+    # Without any index, the requirement can't be resolved, so we fall back to guessing its module
+    # from its project name, rather than failing.
+    rule_runner.set_options(["--python-infer-resolve-module-mapping", "--python-repos-indexes=[]"])
+    rule_runner.add_to_build_file(
+        "3rdparty/python",
+        "python_requirement_library(name='unresolvable', requirements=['Unresolvable-Pkg==1.0'])",
+    )
+    result = rule_runner.request(ThirdPartyModuleToAddressMapping, [])
+    assert result.mapping == FrozenDict(
+        {"unresolvable_pkg": Address("3rdparty/python", target_name="unresolvable")}
+    )
+
+
 def test_map_module_to_address(rule_runner: RuleRunner) -> None:
     rule_runner.set_options(["--source-root-patterns=['source_root1', 'source_root2', '/']"])
 
@@ -3,12 +3,13 @@
 
 import itertools
 from pathlib import PurePath
-from typing import List, cast
+from typing import List
 
 from pants.backend.python.dependency_inference import module_mapper
 from pants.backend.python.dependency_inference.import_parser import find_python_imports
 from pants.backend.python.dependency_inference.module_mapper import PythonModule, PythonModuleOwners
 from pants.backend.python.dependency_inference.python_stdlib.combined import combined_stdlib
+from pants.backend.python.dependency_inference.subsystem import PythonInference
 from pants.backend.python.target_types import PythonSources, PythonTestsSources
 from pants.backend.python.util_rules import ancestor_files
 from pants.backend.python.util_rules.ancestor_files import AncestorFiles, AncestorFilesRequest
@@ -25,74 +26,6 @@ from pants.engine.target import (
 )
 from pants.engine.unions import UnionRule
 from pants.option.global_options import OwnersNotFoundBehavior
-from pants.option.subsystem import Subsystem
-
-
-class PythonInference(Subsystem):
-    """Options controlling which dependencies will be inferred for Python targets."""
-
-    options_scope = "python-infer"
-
-    @classmethod
-    def register_options(cls, register):
-        super().register_options(register)
-        register(
-            "--imports",
-            default=True,
-            type=bool,
-            help=(
-                "Infer a target's imported dependencies by parsing import statements from sources."
-            ),
-        )
-        register(
-            "--string-imports",
-            default=False,
-            type=bool,
-            help=(
-                "Infer a target's dependencies based on strings that look like dynamic "
-                "dependencies, such as Django settings files expressing dependencies as strings. "
-                "To ignore any false positives, put `!{bad_address}` in the `dependencies` field "
-                "of your target."
-            ),
-        )
-        register(
-            "--inits",
-            default=False,
-            type=bool,
-            help=(
-                "Infer a target's dependencies on any __init__.py files existing for the packages "
-                "it is located in (recursively upward in the directory structure). Even if this is "
-                "disabled, Pants will still include any ancestor __init__.py files, only they will "
-                "not be 'proper' dependencies, e.g. they will not show up in "
-                "`./pants dependencies` and their own dependencies will not be used. If you have "
-                "empty `__init__.py` files, it's safe to leave this option off; otherwise, you "
-                "should enable this option."
-            ),
-        )
-        register(
-            "--conftests",
-            default=True,
-            type=bool,
-            help=(
-                "Infer a test target's dependencies on any conftest.py files in parent directories."
-            ),
-        )
-
-    @property
-    def imports(self) -> bool:
-        return cast(bool, self.options.imports)
-
-    @property
-    def string_imports(self) -> bool:
-        return cast(bool, self.options.string_imports)
-
-    @property
-    def inits(self) -> bool:
-        return cast(bool, self.options.inits)
-
-    @property
-    def conftests(self) -> bool:
-        return cast(bool, self.options.conftests)
 
 
 class InferPythonDependencies(InferDependenciesRequest):
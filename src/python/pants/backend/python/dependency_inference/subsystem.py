@@ -0,0 +1,94 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from typing import cast
+
+from pants.option.subsystem import Subsystem
+
+
+class PythonInference(Subsystem):
+    """Options controlling which dependencies will be inferred for Python targets."""
+
+    options_scope = "python-infer"
+
+    @classmethod
+    def register_options(cls, register):
+        super().register_options(register)
+        register(
+            "--imports",
+            default=True,
+            type=bool,
+            help=(
+                "Infer a target's imported dependencies by parsing import statements from sources."
+            ),
+        )
+        register(
+            "--string-imports",
+            default=False,
+            type=bool,
+            help=(
+                "Infer a target's dependencies based on strings that look like dynamic "
+                "dependencies, such as Django settings files expressing dependencies as strings. "
+                "To ignore any false positives, put `!{bad_address}` in the `dependencies` field "
+                "of your target."
+            ),
+        )
+        register(
+            "--inits",
+            default=False,
+            type=bool,
+            help=(
+                "Infer a target's dependencies on any __init__.py files existing for the packages "
+                "it is located in (recursively upward in the directory structure). Even if this is "
+                "disabled, Pants will still include any ancestor __init__.py files, only they will "
+                "not be 'proper' dependencies, e.g. they will not show up in "
+                "`./pants dependencies` and their own dependencies will not be used. If you have "
+                "empty `__init__.py` files, it's safe to leave this option off; otherwise, you "
+                "should enable this option."
+            ),
+        )
+        register(
+            "--conftests",
+            default=True,
+            type=bool,
+            help=(
+                "Infer a test target's dependencies on any conftest.py files in parent directories."
+            ),
+        )
+
+        register(
+            "--resolve-module-mapping",
+            default=False,
+            type=bool,
+            advanced=True,
+            help=(
+                "Determine the modules provided by each third-party requirement from the metadata "
+                "(RECORD, or else top_level.txt) of its resolved distribution, rather than "
+                "assuming that its module is named after the requirement, e.g. that "
+                "`PyYAML` provides `yaml` and `protobuf` provides `google.protobuf`. Each "
+                "requirement is resolved on its own, using the global interpreter constraints, "
+                "and the results are cached. A requirement which fails to resolve falls back to "
+                "the guess, with a warning. The `module_mapping` field of "
+                "`python_requirement_library` targets still takes precedence."
+            ),
+        )
+
+    @property
+    def imports(self) -> bool:
+        return cast(bool, self.options.imports)
+
+    @property
+    def string_imports(self) -> bool:
+        return cast(bool, self.options.string_imports)
+
+    @property
+    def inits(self) -> bool:
+        return cast(bool, self.options.inits)
+
+    @property
+    def conftests(self) -> bool:
+        return cast(bool, self.options.conftests)
+
+    @property
+    def resolve_module_mapping(self) -> bool:
+        return cast(bool, self.options.resolve_module_mapping)
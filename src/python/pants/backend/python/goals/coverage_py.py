@@ -2,6 +2,8 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 import configparser
+import os
+import sqlite3
 from dataclasses import dataclass
 from enum import Enum
 from io import StringIO
@@ -26,6 +28,7 @@ from pants.core.goals.test import (
     CoverageDataCollection,
     CoverageReport,
     CoverageReports,
+    CoveredFiles,
     FilesystemCoverageReport,
 )
 from pants.engine.addresses import Address, Addresses
@@ -45,6 +48,8 @@ from pants.engine.rules import Get, MultiGet, collect_rules, rule
 from pants.engine.target import TransitiveTargets, TransitiveTargetsRequest
 from pants.engine.unions import UnionRule
 from pants.option.custom_types import file_option
+from pants.util.contextutil import temporary_file
+from pants.util.frozendict import FrozenDict
 from pants.util.logging import LogLevel
 
 """
@@ -168,6 +173,38 @@ class PytestCoverageDataCollection(CoverageDataCollection):
     element_type = PytestCoverageData
 
 
+def _covered_files(coverage_db: bytes) -> Tuple[str, ...]:
+    """The files with any recorded lines (or arcs) in the SQLite database of a `.coverage` file.
+
+    Because we set `relative_files`, these are relative to the build root.
+    """
+    with temporary_file(suffix=".coverage") as f:
+        f.write(coverage_db)
+        f.close()
+        connection = sqlite3.connect(f.name)
+        try:
+            rows = connection.execute(
+                "SELECT path FROM file WHERE id IN "
+                "(SELECT file_id FROM line_bits UNION SELECT file_id FROM arc)"
+            ).fetchall()
+        finally:
+            connection.close()
+    return tuple(sorted(os.path.normpath(path) for (path,) in rows))
+
+
+@rule(desc="Find the files covered by each Pytest test", level=LogLevel.DEBUG)
+async def find_covered_files(data_collection: PytestCoverageDataCollection) -> CoveredFiles:
+    contents_per_data = await MultiGet(
+        Get(DigestContents, Digest, data.digest) for data in data_collection
+    )
+    return CoveredFiles(
+        FrozenDict(
+            (data.address, _covered_files(contents[0].content))
+            for data, contents in zip(data_collection, contents_per_data)
+        )
+    )
+
+
 @dataclass(frozen=True)
 class CoverageConfig:
     digest: Digest
@@ -1,12 +1,18 @@
 # Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import sqlite3
+from pathlib import Path
 from textwrap import dedent
 from typing import List, Optional
 
 import pytest
 
-from pants.backend.python.goals.coverage_py import CoverageSubsystem, create_coverage_config
+from pants.backend.python.goals.coverage_py import (
+    CoverageSubsystem,
+    _covered_files,
+    create_coverage_config,
+)
 from pants.engine.fs import (
     EMPTY_DIGEST,
     CreateDigest,
@@ -142,3 +148,33 @@ def test_invalid_relative_files_setting() -> None:
         ValueError, match="relative_files under the 'run' section must be set to True"
     ):
         run_create_coverage_config_rule(coverage_config=config)
+
+
+def test_covered_files(tmp_path: Path) -> None:
+    # A subset of the schema of the SQLite database used by Coverage 5.
+    db_path = tmp_path / ".coverage"
+    connection = sqlite3.connect(str(db_path))
+    connection.executescript(
+        dedent(
+            """\
+            CREATE TABLE file (id INTEGER PRIMARY KEY, path TEXT, UNIQUE (path));
+            CREATE TABLE line_bits (file_id INTEGER, context_id INTEGER, numbits BLOB);
+            CREATE TABLE arc (file_id INTEGER, context_id INTEGER, fromno INTEGER, tono INTEGER);
+            INSERT INTO file VALUES (1, 'src/python/project/lib.py');
+            INSERT INTO file VALUES (2, './src/python/project/lib_test.py');
+            INSERT INTO file VALUES (3, 'src/python/project/unused.py');
+            INSERT INTO file VALUES (4, 'src/python/project/branches.py');
+            INSERT INTO line_bits VALUES (1, 1, x'01');
+            INSERT INTO line_bits VALUES (2, 1, x'01');
+            INSERT INTO arc VALUES (4, 1, 1, 2);
+            """
+        )
+    )
+    connection.commit()
+    connection.close()
+
+    assert _covered_files(db_path.read_bytes()) == (
+        "src/python/project/branches.py",
+        "src/python/project/lib.py",
+        "src/python/project/lib_test.py",
+    )
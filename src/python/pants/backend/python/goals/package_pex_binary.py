@@ -1,6 +1,8 @@
 # Copyright 2019 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import dataclasses
+import itertools
 import os
 from dataclasses import dataclass
 from typing import Tuple, cast
@@ -16,11 +18,19 @@ from pants.backend.python.target_types import (
 )
 from pants.backend.python.target_types import PexPlatformsField as PythonPlatformsField
 from pants.backend.python.target_types import PexShebangField, PexZipSafeField
-from pants.backend.python.util_rules.pex import PexPlatforms, TwoStepPex
+from pants.backend.python.util_rules.pex import (
+    Pex,
+    PexInterpreterConstraints,
+    PexPlatforms,
+    PexRequest,
+    PexRequirements,
+    TwoStepPex,
+)
 from pants.backend.python.util_rules.pex_from_targets import (
     PexFromTargetsRequest,
     TwoStepPexFromTargetsRequest,
 )
+from pants.base.specs import AddressSpecs, DescendantAddresses
 from pants.core.goals.binary import BinaryFieldSet, CreatedBinary
 from pants.core.goals.package import (
     BuiltPackage,
@@ -29,13 +39,14 @@ from pants.core.goals.package import (
     PackageFieldSet,
 )
 from pants.core.goals.run import RunFieldSet
-from pants.engine.fs import PathGlobs, Paths
-from pants.engine.rules import Get, collect_rules, rule
-from pants.engine.target import InvalidFieldException
+from pants.engine.fs import Digest, MergeDigests, PathGlobs, Paths
+from pants.engine.rules import Get, MultiGet, collect_rules, rule
+from pants.engine.target import InvalidFieldException, Targets
 from pants.engine.unions import UnionRule
 from pants.option.global_options import FilesNotFoundBehavior, GlobalOptions
 from pants.source.source_root import SourceRoot, SourceRootRequest
 from pants.util.logging import LogLevel
+from pants.util.strutil import pluralize
 
 
 @dataclass(frozen=True)
@@ -71,6 +82,71 @@ class PexBinaryFieldSet(PackageFieldSet, BinaryFieldSet, RunFieldSet):
         return tuple(args)
 
 
+@dataclass(frozen=True)
+class SharedPexBinaryResolveRequest:
+    """A request to resolve the requirements of every `pex_binary` target in the repository which
+    has the given interpreter constraints and platforms, at once."""
+
+    interpreter_constraints: PexInterpreterConstraints
+    platforms: PexPlatforms
+
+
+@dataclass(frozen=True)
+class SharedPexBinaryResolve:
+    """A requirements-only PEX which each binary of a group may be built on top of."""
+
+    pex: Pex
+
+
+@rule(desc="Resolving the requirements shared by `pex_binary` targets", level=LogLevel.DEBUG)
+async def shared_pex_binary_resolve(
+    request: SharedPexBinaryResolveRequest,
+) -> SharedPexBinaryResolve:
+    all_targets = await Get(Targets, AddressSpecs([DescendantAddresses("")]))
+    field_sets = [
+        PexBinaryFieldSet.create(tgt) for tgt in all_targets if PexBinaryFieldSet.is_applicable(tgt)
+    ]
+    # NB: These use the same rule as each binary does to compute its interpreter constraints and
+    # requirements, so that every binary finds itself in its group.
+    requirements_pex_requests = await MultiGet(
+        Get(
+            PexRequest,
+            PexFromTargetsRequest(
+                addresses=[field_set.address],
+                output_filename="requirements.pex",
+                internal_only=False,
+                platforms=PexPlatforms.create_from_platforms_field(field_set.platforms),
+                include_source_files=False,
+            ),
+        )
+        for field_set in field_sets
+    )
+    group = [
+        pex_request
+        for pex_request in requirements_pex_requests
+        if pex_request.interpreter_constraints == request.interpreter_constraints
+        and pex_request.platforms == request.platforms
+    ]
+    requirements = PexRequirements(
+        itertools.chain.from_iterable(pex_request.requirements for pex_request in group)
+    )
+    pex = await Get(
+        Pex,
+        PexRequest(
+            output_filename="__shared_requirements.pex",
+            internal_only=False,
+            requirements=requirements,
+            interpreter_constraints=request.interpreter_constraints,
+            platforms=request.platforms,
+            description=(
+                f"Resolving {pluralize(len(requirements), 'requirement')} shared by "
+                f"{pluralize(len(group), '`pex_binary` target')}"
+            ),
+        ),
+    )
+    return SharedPexBinaryResolve(pex)
+
+
 @rule(level=LogLevel.DEBUG)
 async def package_pex_binary(
     field_set: PexBinaryFieldSet,
@@ -103,20 +179,44 @@ async def package_pex_binary(
         file_ending="pex",
         use_legacy_format=global_options.options.pants_distdir_legacy_paths,
     )
-    two_step_pex = await Get(
-        TwoStepPex,
-        TwoStepPexFromTargetsRequest(
-            PexFromTargetsRequest(
-                addresses=[field_set.address],
-                internal_only=False,
-                entry_point=entry_point,
-                platforms=PexPlatforms.create_from_platforms_field(field_set.platforms),
-                output_filename=output_filename,
-                additional_args=field_set.generate_additional_args(pex_binary_defaults),
-            )
-        ),
+    pex_from_targets_request = PexFromTargetsRequest(
+        addresses=[field_set.address],
+        internal_only=False,
+        entry_point=entry_point,
+        platforms=PexPlatforms.create_from_platforms_field(field_set.platforms),
+        output_filename=output_filename,
+        additional_args=field_set.generate_additional_args(pex_binary_defaults),
     )
-    return BuiltPackage(two_step_pex.pex.digest, (BuiltPackageArtifact(output_filename),))
+    if not pex_binary_defaults.shared_resolve:
+        two_step_pex = await Get(TwoStepPex, TwoStepPexFromTargetsRequest(pex_from_targets_request))
+        return BuiltPackage(two_step_pex.pex.digest, (BuiltPackageArtifact(output_filename),))
+
+    # Build the binary on top of the resolve shared by its group, which the engine memoizes, so
+    # that packaging many binaries resolves each group's requirements only once.
+    pex_request = await Get(PexRequest, PexFromTargetsRequest, pex_from_targets_request)
+    if pex_request.requirements:
+        shared_resolve = await Get(
+            SharedPexBinaryResolve,
+            SharedPexBinaryResolveRequest(
+                pex_request.interpreter_constraints, pex_request.platforms
+            ),
+        )
+        additional_inputs = shared_resolve.pex.digest
+        if pex_request.additional_inputs:
+            additional_inputs = await Get(
+                Digest, MergeDigests([pex_request.additional_inputs, additional_inputs])
+            )
+        pex_request = dataclasses.replace(
+            pex_request,
+            requirements=PexRequirements(),
+            additional_inputs=additional_inputs,
+            additional_args=(
+                *pex_request.additional_args,
+                f"--requirements-pex={shared_resolve.pex.name}",
+            ),
+        )
+    pex = await Get(Pex, PexRequest, pex_request)
+    return BuiltPackage(pex.digest, (BuiltPackageArtifact(output_filename),))
 
 
 @rule(level=LogLevel.DEBUG)
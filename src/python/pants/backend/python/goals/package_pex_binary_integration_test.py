@@ -0,0 +1,87 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""A benchmark of packaging many `pex_binary` targets which share most of their requirements.
+
+Run with `-s` to see the total time taken with and without `--pex-binary-defaults-shared-resolve`.
+"""
+
+import os
+import subprocess
+import time
+from textwrap import dedent
+from typing import Dict
+
+import pytest
+
+from pants.testutil.pants_integration_test import run_pants, setup_tmpdir
+
+BINARY_COUNT = 10
+SHARED_REQUIREMENTS = ["ansicolors==1.1.8", "six==1.15.0"]
+
+
+def binaries_sources() -> Dict[str, str]:
+    sources = {
+        "3rdparty/BUILD": "\n".join(
+            f"python_requirement_library(name={req.split('==')[0]!r}, requirements=[{req!r}])"
+            for req in (*SHARED_REQUIREMENTS, "attrs==20.2.0")
+        ),
+    }
+    for i in range(BINARY_COUNT):
+        # Every binary depends on the shared requirements, and only the first on `attrs`, so the
+        # resolves of the binaries differ.
+        extra_dep = ", '{tmpdir}/3rdparty:attrs'" if i == 0 else ""
+        sources[f"src/app{i}/main.py"] = dedent(
+            f"""\
+            import colors
+            import six
+
+            print(colors.green("app{i}"), six.PY3)
+            """
+        )
+        sources[f"src/app{i}/BUILD"] = dedent(
+            f"""\
+            pex_binary(
+                sources=['main.py'],
+                dependencies=[
+                    '{{tmpdir}}/3rdparty:ansicolors', '{{tmpdir}}/3rdparty:six'{extra_dep}
+                ],
+            )
+            """
+        )
+    return sources
+
+
+@pytest.mark.parametrize("shared_resolve", [False, True])
+def test_package_many_binaries(shared_resolve: bool) -> None:
+    with setup_tmpdir(binaries_sources()) as tmpdir:
+        dist_dir = os.path.join(tmpdir, "dist")
+        start = time.time()
+        result = run_pants(
+            [
+                "--backend-packages=pants.backend.python",
+                "--no-pantsd",
+                "--no-process-execution-use-local-cache",
+                f"--source-root-patterns=['/{tmpdir}/src']",
+                f"--pants-distdir={dist_dir}",
+                "--no-pants-distdir-legacy-paths",
+                f"--pex-binary-defaults-shared-resolve={shared_resolve}",
+                "package",
+                f"{tmpdir}/src::",
+            ]
+        )
+        elapsed = time.time() - start
+        result.assert_success()
+        print(
+            f"Packaged {BINARY_COUNT} binaries in {elapsed:.3f}s "
+            f"({'with' if shared_resolve else 'without'} a shared resolve)."
+        )
+
+        def pex_path(i: int) -> str:
+            return os.path.join(
+                dist_dir, f"{tmpdir}.src.app{i}".replace(os.sep, "."), f"app{i}.pex"
+            )
+
+        assert all(os.path.isfile(pex_path(i)) for i in range(BINARY_COUNT))
+        output = subprocess.run([pex_path(1)], stdout=subprocess.PIPE, check=True).stdout.decode()
+        assert "app1" in output
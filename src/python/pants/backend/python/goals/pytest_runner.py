@@ -3,9 +3,10 @@
 
 import itertools
 import logging
+import os
 from dataclasses import dataclass
 from pathlib import PurePath
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple, cast
 
 from pants.backend.python.goals.coverage_py import (
     CoverageConfig,
@@ -15,23 +16,27 @@ from pants.backend.python.goals.coverage_py import (
 from pants.backend.python.subsystems.pytest import PyTest
 from pants.backend.python.target_types import (
     PythonInterpreterCompatibility,
+    PythonRequirementsField,
     PythonRuntimeBinaryDependencies,
     PythonRuntimePackageDependencies,
     PythonTestsSources,
     PythonTestsTimeout,
 )
 from pants.backend.python.util_rules.pex import (
+    COPY_TO_CACHE_SCRIPT,
     Pex,
     PexInterpreterConstraints,
     PexProcess,
     PexRequest,
     PexRequirements,
 )
+from pants.backend.python.util_rules.pex_environment import PexEnvironment, PythonExecutable
 from pants.backend.python.util_rules.pex_from_targets import PexFromTargetsRequest
 from pants.backend.python.util_rules.python_sources import (
     PythonSourceFiles,
     PythonSourceFilesRequest,
 )
+from pants.base.specs import AddressSpecs, DescendantAddresses
 from pants.core.goals.package import BuiltPackage, PackageFieldSet
 from pants.core.goals.test import (
     TestDebugRequest,
@@ -42,8 +47,23 @@ from pants.core.goals.test import (
 )
 from pants.core.util_rules.source_files import SourceFiles, SourceFilesRequest
 from pants.engine.addresses import UnparsedAddressInputs
-from pants.engine.fs import AddPrefix, Digest, DigestSubset, MergeDigests, PathGlobs, Snapshot
-from pants.engine.process import FallibleProcessResult, InteractiveProcess, Process
+from pants.engine.fs import (
+    EMPTY_DIGEST,
+    AddPrefix,
+    Digest,
+    DigestSubset,
+    MergeDigests,
+    PathGlobs,
+    Snapshot,
+)
+from pants.engine.process import (
+    FallibleProcessResult,
+    InteractiveProcess,
+    Process,
+    ProcessResult,
+    ProcessScope,
+    UncacheableProcess,
+)
 from pants.engine.rules import Get, MultiGet, collect_rules, rule
 from pants.engine.target import (
     FieldSetsPerTarget,
@@ -78,6 +98,11 @@ class PythonTestFieldSet(TestFieldSet):
         return file_name.name == "conftest.py" or file_name.suffix == ".pyi"
 
 
+# The named cache which holds the shared requirements PEXes, keyed by their digest.
+SHARED_REQUIREMENTS_CACHE_NAME = "pytest_shared_requirements"
+SHARED_REQUIREMENTS_CACHE_PATH = ".cache/pytest_shared_requirements"
+
+
 @dataclass(frozen=True)
 class TestSetupRequest:
     field_set: PythonTestFieldSet
@@ -103,6 +128,7 @@ async def setup_pytest_for_target(
     coverage_subsystem: CoverageSubsystem,
     test_extra_env: TestExtraEnv,
     global_options: GlobalOptions,
+    pex_environment: PexEnvironment,
 ) -> TestSetup:
     transitive_targets = await Get(
         TransitiveTargets, TransitiveTargetsRequest([request.field_set.address])
@@ -118,11 +144,40 @@ async def setup_pytest_for_target(
         python_setup,
     )
 
-    # Defaults to zip_safe=False.
-    requirements_pex_request = Get(
-        Pex,
-        PexFromTargetsRequest,
-        PexFromTargetsRequest.for_requirements([request.field_set.address], internal_only=True),
+    if pytest.shared_requirements:
+        # Share one PEX with every requirement in the repository between all tests with the same
+        # interpreter constraints, rather than building one for each distinct set of requirements.
+        all_targets_in_repo = await Get(Targets, AddressSpecs([DescendantAddresses("")]))
+        requirements_addresses = [
+            tgt.address for tgt in all_targets_in_repo if tgt.has_field(PythonRequirementsField)
+        ]
+        requirements_pex_request = Get(
+            Pex,
+            PexFromTargetsRequest,
+            PexFromTargetsRequest.for_requirements(
+                requirements_addresses,
+                internal_only=True,
+                hardcoded_interpreter_constraints=interpreter_constraints,
+            ),
+        )
+    else:
+        # Defaults to zip_safe=False.
+        requirements_pex_request = Get(
+            Pex,
+            PexFromTargetsRequest,
+            PexFromTargetsRequest.for_requirements([request.field_set.address], internal_only=True),
+        )
+
+    # When running locally, the shared requirements PEX is referenced from a named cache, rather
+    # than being copied into the sandbox of every test. Interactive processes have no named
+    # caches, and persistent workers are skipped because a worker would keep the requirements it
+    # first started with.
+    reference_shared_requirements = (
+        pytest.shared_requirements
+        and not request.is_debug
+        and not global_options.options.remote_execution
+        and not pex_environment.persistent_workers
+        and pex_environment.bootstrap_python is not None
     )
 
     pytest_pex_request = Get(
@@ -145,8 +200,11 @@ async def setup_pytest_for_target(
                 "--not-zip-safe",
                 # TODO(John Sirois): Support shading python binaries:
                 #   https://github.com/pantsbuild/pants/issues/9206
-                "--pex-path",
-                requirements_pex_request.input.output_filename,
+                *(
+                    ()
+                    if reference_shared_requirements
+                    else ("--pex-path", requirements_pex_request.input.output_filename)
+                ),
             ),
         ),
     )
@@ -193,13 +251,44 @@ async def setup_pytest_for_target(
         field_set_source_files_request,
     )
 
+    extra_env: Dict[str, str] = {}
+    append_only_caches: Dict[str, str] = {}
+    if reference_shared_requirements:
+        shared_requirements_path = os.path.join(
+            SHARED_REQUIREMENTS_CACHE_PATH, f"{requirements_pex.digest.fingerprint}.pex"
+        )
+        python = cast(PythonExecutable, pex_environment.bootstrap_python)
+        await Get(
+            ProcessResult,
+            UncacheableProcess(
+                Process(
+                    argv=(
+                        python.path,
+                        "-c",
+                        COPY_TO_CACHE_SCRIPT,
+                        requirements_pex.name,
+                        shared_requirements_path,
+                    ),
+                    description="Add the shared requirements PEX to the named cache",
+                    input_digest=requirements_pex.digest,
+                    append_only_caches={
+                        SHARED_REQUIREMENTS_CACHE_NAME: SHARED_REQUIREMENTS_CACHE_PATH
+                    },
+                    level=LogLevel.DEBUG,
+                ),
+                scope=ProcessScope.PER_SESSION,
+            ),
+        )
+        extra_env["PEX_PATH"] = shared_requirements_path
+        append_only_caches[SHARED_REQUIREMENTS_CACHE_NAME] = SHARED_REQUIREMENTS_CACHE_PATH
+
     input_digest = await Get(
         Digest,
         MergeDigests(
             (
                 coverage_config.digest,
                 prepared_sources.source_files.snapshot.digest,
-                requirements_pex.digest,
+                EMPTY_DIGEST if reference_shared_requirements else requirements_pex.digest,
                 pytest_pex.digest,
                 *(binary.digest for binary in assets),
             )
@@ -226,10 +315,12 @@ async def setup_pytest_for_target(
             *itertools.chain.from_iterable(["--cov", cov_path] for cov_path in cov_paths),
         ]
 
-    extra_env = {
-        "PYTEST_ADDOPTS": " ".join(add_opts),
-        "PEX_EXTRA_SYS_PATH": ":".join(prepared_sources.source_roots),
-    }
+    extra_env.update(
+        {
+            "PYTEST_ADDOPTS": " ".join(add_opts),
+            "PEX_EXTRA_SYS_PATH": ":".join(prepared_sources.source_roots),
+        }
+    )
 
     extra_env.update(test_extra_env.env)
 
@@ -246,6 +337,8 @@ async def setup_pytest_for_target(
             description=f"Run Pytest for {request.field_set.address}",
             level=LogLevel.DEBUG,
             uncacheable=test_subsystem.force and not request.is_debug,
+            append_only_caches=append_only_caches,
+            interactive=request.is_debug,
         ),
     )
     return TestSetup(process, results_file_name=results_file_name)
@@ -144,6 +144,7 @@ def run_pytest(
     execution_slot_var: Optional[str] = None,
     extra_env_vars: Optional[str] = None,
     env: Optional[Mapping[str, str]] = None,
+    shared_requirements: bool = False,
 ) -> TestResult:
     args = [
         "--backend-packages=pants.backend.python",
@@ -162,6 +163,8 @@ def run_pytest(
         args.append("--test-use-coverage")
     if execution_slot_var:
         args.append(f"--pytest-execution-slot-var={execution_slot_var}")
+    if shared_requirements:
+        args.append("--pytest-shared-requirements")
     rule_runner.set_options(args, env=env)
 
     inputs = [PythonTestFieldSet.create(test_target)]
@@ -266,7 +269,8 @@ def test_transitive_dep(rule_runner: RuleRunner) -> None:
     assert f"{PACKAGE}/test_transitive_dep.py ." in result.stdout
 
 
-def test_thirdparty_dep(rule_runner: RuleRunner) -> None:
+@pytest.mark.parametrize("shared_requirements", [False, True])
+def test_thirdparty_dep(rule_runner: RuleRunner, shared_requirements: bool) -> None:
     setup_thirdparty_dep(rule_runner)
     source = FileContent(
         path=f"{PACKAGE}/test_3rdparty_dep.py",
@@ -280,7 +284,7 @@ def test_thirdparty_dep(rule_runner: RuleRunner) -> None:
         ).encode(),
     )
     tgt = create_test_target(rule_runner, [source], dependencies=["3rdparty/python:ordered-set"])
-    result = run_pytest(rule_runner, tgt)
+    result = run_pytest(rule_runner, tgt, shared_requirements=shared_requirements)
     assert result.exit_code == 0
     assert f"{PACKAGE}/test_3rdparty_dep.py ." in result.stdout
 
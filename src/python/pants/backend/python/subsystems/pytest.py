@@ -90,6 +90,21 @@ class PyTest(Subsystem):
                 "to tests under this environment variable name."
             ),
         )
+        register(
+            "--shared-requirements",
+            type=bool,
+            default=False,
+            advanced=True,
+            help=(
+                "Rather than building a requirements PEX with just the third-party requirements of "
+                "each test, build one PEX with the requirements of the whole repository for each "
+                "set of interpreter constraints, and share it between all of the tests using those "
+                "constraints. This avoids resolving and building a PEX for every distinct set of "
+                "requirements, at the cost of tests being able to import requirements which they "
+                "do not depend on. When running locally, the shared PEX is referenced from a "
+                "named cache rather than being copied into the sandbox of each test."
+            ),
+        )
 
     def get_requirement_strings(self) -> Tuple[str, ...]:
         """Returns a tuple of requirements-style strings for Pytest and Pytest plugins."""
@@ -106,3 +121,7 @@ class PyTest(Subsystem):
     @property
     def timeout_maximum(self) -> Optional[int]:
         return cast(Optional[int], self.options.timeout_maximum)
+
+    @property
+    def shared_requirements(self) -> bool:
+        return cast(bool, self.options.shared_requirements)
@@ -113,6 +113,21 @@ class PexBinaryDefaults(Subsystem):
                 "`pex_binary` targets"
             ),
         )
+        register(
+            "--shared-resolve",
+            advanced=True,
+            type=bool,
+            default=False,
+            help=(
+                "When packaging `pex_binary` targets, resolve the union of the requirements of "
+                "every `pex_binary` target in the repository with the same interpreter "
+                "constraints and platforms once, and build each binary on top of that shared "
+                "resolve, rather than resolving the requirements of each binary separately. This "
+                "is much faster when packaging many binaries with mostly the same requirements, "
+                "but each binary then includes the requirements of the others in its group, and "
+                "the requirements of the group must be compatible with each other."
+            ),
+        )
 
     @property
     def emit_warnings(self) -> bool:
@@ -128,6 +143,10 @@ class PexBinaryDefaults(Subsystem):
             ),
         )
 
+    @property
+    def shared_resolve(self) -> bool:
+        return cast(bool, self.options.shared_resolve)
+
 
 class PexBinarySources(PythonSources):
     """A single file containing the executable, such as ['app.py'].
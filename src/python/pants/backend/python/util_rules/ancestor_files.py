@@ -5,8 +5,8 @@ import os
 from dataclasses import dataclass
 from typing import Sequence, Set
 
-from pants.engine.fs import EMPTY_SNAPSHOT, PathGlobs, Snapshot
-from pants.engine.rules import Get, collect_rules, rule
+from pants.engine.fs import EMPTY_SNAPSHOT, MergeDigests, PathGlobs, Snapshot
+from pants.engine.rules import Get, MultiGet, collect_rules, rule
 from pants.util.ordered_set import FrozenOrderedSet
 
 
@@ -68,8 +68,17 @@ async def find_missing_ancestor_files(request: AncestorFilesRequest) -> Ancestor
     if not missing_ancestor_files:
         return AncestorFiles(EMPTY_SNAPSHOT)
 
-    # NB: This will intentionally _not_ error on any unmatched globs.
-    discovered_ancestors_snapshot = await Get(Snapshot, PathGlobs(missing_ancestor_files))
+    # NB: We glob for each candidate on its own, rather than for all of them at once. Closures
+    # overlap heavily, so the engine has almost always already memoized the glob for each package
+    # directory, and only invalidates the globs of directories which have changed. This will
+    # intentionally _not_ error on any unmatched globs.
+    candidate_snapshots = await MultiGet(
+        Get(Snapshot, PathGlobs([path])) for path in missing_ancestor_files
+    )
+    discovered_ancestors_snapshot = await Get(
+        Snapshot,
+        MergeDigests(snapshot.digest for snapshot in candidate_snapshots if snapshot.files),
+    )
     return AncestorFiles(discovered_ancestors_snapshot)
 
 
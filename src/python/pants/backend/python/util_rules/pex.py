@@ -5,21 +5,11 @@ import dataclasses
 import functools
 import itertools
 import logging
+import os
 from collections import defaultdict
 from dataclasses import dataclass
 from textwrap import dedent
-from typing import (
-    FrozenSet,
-    Iterable,
-    List,
-    Mapping,
-    Optional,
-    Sequence,
-    Set,
-    Tuple,
-    TypeVar,
-    Union,
-)
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple, TypeVar, Union
 
 from pkg_resources import Requirement
 from typing_extensions import Protocol
@@ -36,22 +26,35 @@ from pants.backend.python.util_rules.pex_environment import (
     PexRuntimeEnvironment,
     PythonExecutable,
 )
+from pants.backend.python.util_rules.pex_worker import (
+    PEX_WORKER_SCRIPT,
+    PEX_WORKERS_CACHE_NAME,
+    PEX_WORKERS_CACHE_PATH,
+    pex_worker_key,
+)
+from pants.backend.python.util_rules.requirement_constraints import RequirementConstraints
+from pants.backend.python.util_rules.requirement_constraints import (
+    rules as requirement_constraints_rules,
+)
+from pants.backend.python.util_rules.version_range import VersionRange
 from pants.engine.addresses import Address
 from pants.engine.collection import DeduplicatedCollection
 from pants.engine.engine_aware import EngineAwareParameter
 from pants.engine.fs import (
     EMPTY_DIGEST,
     AddPrefix,
+    CreateDigest,
     Digest,
-    GlobExpansionConjunction,
-    GlobMatchErrorBehavior,
+    DigestSubset,
     MergeDigests,
     PathGlobs,
 )
 from pants.engine.platform import Platform, PlatformConstraint
 from pants.engine.process import (
+    FallibleProcessResult,
     MultiPlatformProcess,
     Process,
+    ProcessExecutionFailure,
     ProcessResult,
     ProcessScope,
     UncacheableProcess,
@@ -61,6 +64,7 @@ from pants.python.python_repos import PythonRepos
 from pants.python.python_setup import PythonSetup
 from pants.util.frozendict import FrozenDict
 from pants.util.logging import LogLevel
+from pants.util.memo import memoized
 from pants.util.meta import frozen_after_init
 from pants.util.ordered_set import FrozenOrderedSet
 from pants.util.strutil import pluralize
@@ -123,63 +127,20 @@ class PexInterpreterConstraints(FrozenOrderedSet[Requirement], EngineAwareParame
 
         For example, given `[["CPython>=2.7", "CPython<=3"], ["CPython==3.6.*"]]`, return
         `["CPython>=2.7,==3.6.*", "CPython<=3,==3.6.*"]`.
+
+        Conjunctions which cannot be satisfied by any version, such as `CPython==2.7.*,==3.6.*`,
+        are dropped as soon as they are formed, unless every conjunction is unsatisfiable (in which
+        case they are kept, so that the failure is reported for the actual constraints).
         """
         # Each element (a Set[ParsedConstraint]) will get ANDed. We use sets to deduplicate
         # identical top-level parsed constraint sets.
-        if not constraint_sets:
-            return []
         parsed_constraint_sets: Set[FrozenSet[Requirement]] = set()
         for constraint_set in constraint_sets:
             # Each element (a ParsedConstraint) will get ORed.
-            parsed_constraint_set = frozenset(
-                cls.parse_constraint(constraint) for constraint in constraint_set
+            parsed_constraint_sets.add(
+                frozenset(cls.parse_constraint(constraint) for constraint in constraint_set)
             )
-            parsed_constraint_sets.add(parsed_constraint_set)
-
-        def and_constraints(parsed_constraints: Sequence[Requirement]) -> Requirement:
-            merged_specs: Set[Tuple[str, str]] = set()
-            expected_interpreter = parsed_constraints[0].project_name
-            for parsed_constraint in parsed_constraints:
-                if parsed_constraint.project_name == expected_interpreter:
-                    merged_specs.update(parsed_constraint.specs)
-                    continue
-
-                def key_fn(req: Requirement):
-                    return req.project_name
-
-                # NB: We must pre-sort the data for itertools.groupby() to work properly.
-                sorted_constraints = sorted(parsed_constraints, key=key_fn)
-                attempted_interpreters = {
-                    interp: sorted(
-                        str(parsed_constraint) for parsed_constraint in parsed_constraints
-                    )
-                    for interp, parsed_constraints in itertools.groupby(
-                        sorted_constraints, key=key_fn
-                    )
-                }
-                raise ValueError(
-                    "Tried ANDing Python interpreter constraints with different interpreter "
-                    "types. Please use only one interpreter type. Got "
-                    f"{attempted_interpreters}."
-                )
-
-            formatted_specs = ",".join(f"{op}{version}" for op, version in merged_specs)
-            return Requirement.parse(f"{expected_interpreter}{formatted_specs}")
-
-        def cmp_constraints(req1: Requirement, req2: Requirement) -> int:
-            if req1.project_name != req2.project_name:
-                return -1 if req1.project_name < req2.project_name else 1
-            if req1.specs == req2.specs:
-                return 0
-            return -1 if req1.specs < req2.specs else 1
-
-        return sorted(
-            {
-                and_constraints(constraints_product)
-                for constraints_product in itertools.product(*parsed_constraint_sets)
-            },
-            key=functools.cmp_to_key(cmp_constraints),
-        )
+        return list(_merge_parsed_constraint_sets(frozenset(parsed_constraint_sets)))
 
     @classmethod
     def create_from_compatibility_fields(
@@ -214,14 +175,8 @@ class PexInterpreterConstraints(FrozenOrderedSet[Requirement], EngineAwareParame
             args.extend(["--interpreter-constraint", str(constraint)])
         return args
 
-    def _includes_version(self, major_minor: str, last_patch: int) -> bool:
-        patch_versions = list(reversed(range(0, last_patch + 1)))
-        for req in self:
-            if any(
-                req.specifier.contains(f"{major_minor}.{p}") for p in patch_versions  # type: ignore[attr-defined]
-            ):
-                return True
-        return False
+    def _includes_version(self, major_minor: str) -> bool:
+        return any(_version_range(req).includes_major_minor(major_minor) for req in self)
 
     def includes_python2(self) -> bool:
         """Checks if any of the constraints include Python 2.
@@ -229,8 +184,7 @@ class PexInterpreterConstraints(FrozenOrderedSet[Requirement], EngineAwareParame
         This will return True even if the code works with Python 3 too, so long as at least one of
         the constraints works with Python 2.
         """
-        last_py27_patch_version = 18
-        return self._includes_version("2.7", last_patch=last_py27_patch_version)
+        return self._includes_version("2.7")
 
     def minimum_python_version(self) -> Optional[str]:
         """Find the lowest major.minor Python version that will work with these constraints.
@@ -238,36 +192,24 @@ class PexInterpreterConstraints(FrozenOrderedSet[Requirement], EngineAwareParame
         The constraints may also be compatible with later versions; this is the lowest version that
         still works.
         """
-        if self.includes_python2():
-            return "2.7"
-        max_expected_py3_patch_version = 12  # The current max is 9.
-        for major_minor in ("3.5", "3.6", "3.7", "3.8", "3.9", "3.10"):
-            if self._includes_version(major_minor, last_patch=max_expected_py3_patch_version):
+        for major_minor in ("2.7", "3.5", "3.6", "3.7", "3.8", "3.9", "3.10"):
+            if self._includes_version(major_minor):
                 return major_minor
         return None
 
     def _requires_python3_version_or_newer(
         self, *, allowed_versions: Iterable[str], prior_version: str
     ) -> bool:
-        # Assume any 3.x release has no more than 13 releases. The max is currently 10.
-        patch_versions = list(reversed(range(0, 13)))
         # We only need to look at the prior Python release. For example, consider Python 3.8+
         # looking at 3.7. If using something like `>=3.5`, Py37 will be included.
-        # `==3.6.*,!=3.7.*,==3.8.*` is extremely unlikely, and even that will work correctly as
-        # it's an invalid constraint so setuptools returns False always. `['==2.7.*', '==3.8.*']`
-        # will fail because not every single constraint is exclusively 3.8.
-        prior_versions = [f"{prior_version}.{p}" for p in patch_versions]
-        allowed_versions = [
-            f"{major_minor}.{p}" for major_minor in allowed_versions for p in patch_versions
-        ]
+        # `['==2.7.*', '==3.8.*']` will fail because not every single constraint is exclusively
+        # 3.8.
+        allowed_versions = list(allowed_versions)
         for req in self:
-            if any(
-                req.specifier.contains(prior) for prior in prior_versions  # type: ignore[attr-defined]
-            ):
+            version_range = _version_range(req)
+            if version_range.includes_major_minor(prior_version):
                 return False
-            if not any(
-                req.specifier.contains(allowed) for allowed in allowed_versions  # type: ignore[attr-defined]
-            ):
+            if not any(version_range.includes_major_minor(allowed) for allowed in allowed_versions):
                 return False
         return True
 
@@ -285,6 +227,82 @@ class PexInterpreterConstraints(FrozenOrderedSet[Requirement], EngineAwareParame
         return " OR ".join(str(constraint) for constraint in self)
 
 
+@memoized
+def _version_range(constraint: Requirement) -> VersionRange:
+    return VersionRange.for_specs(constraint.specs)
+
+
+def _cmp_constraints(req1: Requirement, req2: Requirement) -> int:
+    if req1.project_name != req2.project_name:
+        return -1 if req1.project_name < req2.project_name else 1
+    if req1.specs == req2.specs:
+        return 0
+    return -1 if req1.specs < req2.specs else 1
+
+
+@memoized
+def _merge_parsed_constraint_sets(
+    parsed_constraint_sets: FrozenSet[FrozenSet[Requirement]],
+) -> Tuple[Requirement, ...]:
+    if not parsed_constraint_sets:
+        return ()
+
+    # ANDing constraints for different interpreters can never succeed.
+    interpreters = {
+        constraint.project_name
+        for constraint_set in parsed_constraint_sets
+        for constraint in constraint_set
+    }
+    if len(parsed_constraint_sets) > 1 and len(interpreters) > 1:
+
+        def key_fn(req: Requirement):
+            return req.project_name
+
+        # NB: We must pre-sort the data for itertools.groupby() to work properly.
+        sorted_constraints = sorted(
+            itertools.chain.from_iterable(parsed_constraint_sets), key=key_fn
+        )
+        attempted_interpreters = {
+            interp: sorted({str(parsed_constraint) for parsed_constraint in parsed_constraints})
+            for interp, parsed_constraints in itertools.groupby(sorted_constraints, key=key_fn)
+        }
+        raise ValueError(
+            "Tried ANDing Python interpreter constraints with different interpreter "
+            "types. Please use only one interpreter type. Got "
+            f"{attempted_interpreters}."
+        )
+    # Rather than expanding the full cross product of the constraint sets and only then ANDing
+    # each combination, we AND in one constraint set at a time, and drop unsatisfiable
+    # conjunctions as we go so that they do not multiply the size of the result.
+    conjunctions: Dict[Tuple[str, FrozenSet[Tuple[str, str]]], VersionRange] = {
+        ("", frozenset()): VersionRange.unbounded()
+    }
+    for constraint_set in sorted(parsed_constraint_sets, key=lambda cs: sorted(map(str, cs))):
+        anded = {
+            (constraint.project_name, specs | frozenset(constraint.specs)): (
+                version_range.intersection(_version_range(constraint))
+            )
+            for (_, specs), version_range in conjunctions.items()
+            for constraint in constraint_set
+        }
+        satisfiable = {
+            specs: version_range
+            for specs, version_range in anded.items()
+            if not version_range.is_empty()
+        }
+        conjunctions = satisfiable or anded
+
+    return tuple(
+        sorted(
+            (
+                Requirement.parse(f"{interpreter}{','.join(f'{op}{v}' for op, v in specs)}")
+                for interpreter, specs in conjunctions
+            ),
+            key=functools.cmp_to_key(_cmp_constraints),
+        )
+    )
+
+
 class PexPlatforms(DeduplicatedCollection[str]):
     sort_input = True
 
@@ -397,6 +415,26 @@ class Pex:
     python: Optional[PythonExecutable]
 
 
+@dataclass(frozen=True)
+class FalliblePexRequest(EngineAwareParameter):
+    """A request to create a PEX which may fail to build, e.g. because a requirement does not
+    resolve."""
+
+    pex_request: PexRequest
+
+    def debug_hint(self) -> str:
+        return self.pex_request.debug_hint()
+
+
+@dataclass(frozen=True)
+class FalliblePex:
+    """The result of creating a PEX, which is None if Pex failed to build it."""
+
+    pex: Optional[Pex]
+    result: FallibleProcessResult
+    description: str
+
+
 @dataclass(frozen=True)
 class TwoStepPex:
     """The result of creating a PEX in two steps.
@@ -459,15 +497,17 @@ async def find_interpreter(interpreter_constraints: PexInterpreterConstraints) -
 
 
 @rule(level=LogLevel.DEBUG)
-async def create_pex(
-    request: PexRequest,
+async def create_fallible_pex(
+    fallible_request: FalliblePexRequest,
     python_setup: PythonSetup,
     python_repos: PythonRepos,
     platform: Platform,
     pex_runtime_environment: PexRuntimeEnvironment,
-) -> Pex:
-    """Returns a PEX with the given settings."""
+    requirement_constraints: RequirementConstraints,
+) -> FalliblePex:
+    """Returns a PEX with the given settings, or the reason that it failed to build."""
 
+    request = fallible_request.pex_request
     argv = [
         "--output-file",
         request.output_filename,
@@ -520,26 +560,14 @@ async def create_pex(
     if request.entry_point is not None:
         argv.extend(["--entry-point", request.entry_point])
 
-    if python_setup.requirement_constraints is not None:
-        argv.extend(["--constraints", python_setup.requirement_constraints])
+    if requirement_constraints.path is not None:
+        argv.extend(["--constraints", requirement_constraints.path])
 
     source_dir_name = "source_files"
     argv.append(f"--sources-directory={source_dir_name}")
 
     argv.extend(request.requirements)
 
-    constraint_file_digest = EMPTY_DIGEST
-    if python_setup.requirement_constraints is not None:
-        constraint_file_digest = await Get(
-            Digest,
-            PathGlobs(
-                [python_setup.requirement_constraints],
-                glob_match_error_behavior=GlobMatchErrorBehavior.error,
-                conjunction=GlobExpansionConjunction.all_match,
-                description_of_origin="the option `--python-setup-requirement-constraints`",
-            ),
-        )
-
     sources_digest_as_subdir = await Get(
         Digest, AddPrefix(request.sources or EMPTY_DIGEST, source_dir_name)
     )
@@ -551,7 +579,7 @@ async def create_pex(
             (
                 sources_digest_as_subdir,
                 additional_inputs_digest,
-                constraint_file_digest,
+                requirement_constraints.digest,
             )
         ),
     )
@@ -575,6 +603,12 @@ async def create_pex(
             additional_input_digest=merged_digest,
             description=description,
             output_files=[request.output_filename],
+            # Resolving with `--jobs` runs that many pip processes concurrently.
+            cpu_weight=(
+                python_setup.resolver_jobs
+                if request.requirements and python_setup.resolver_jobs
+                else 1
+            ),
         ),
     )
 
@@ -582,7 +616,7 @@ async def create_pex(
     # without cross-building, we specify that our PEX command should be run on the current local
     # platform.
     result = await Get(
-        ProcessResult,
+        FallibleProcessResult,
         MultiPlatformProcess(
             {(PlatformConstraint(platform.value), PlatformConstraint(platform.value)): process}
         ),
@@ -593,7 +627,24 @@ async def create_pex(
         if log_output:
             logger.info("%s", log_output)
 
-    return Pex(digest=result.output_digest, name=request.output_filename, python=python)
+    if result.exit_code != 0:
+        return FalliblePex(pex=None, result=result, description=description)
+    pex = Pex(digest=result.output_digest, name=request.output_filename, python=python)
+    return FalliblePex(pex=pex, result=result, description=description)
+
+
+@rule(level=LogLevel.DEBUG)
+async def create_pex(request: PexRequest) -> Pex:
+    """Returns a PEX with the given settings."""
+    fallible_pex = await Get(FalliblePex, FalliblePexRequest(request))
+    if fallible_pex.pex is None:
+        raise ProcessExecutionFailure(
+            fallible_pex.result.exit_code,
+            fallible_pex.result.stdout,
+            fallible_pex.result.stderr,
+            fallible_pex.description,
+        )
+    return fallible_pex.pex
 
 
 @rule(level=LogLevel.DEBUG)
@@ -639,6 +690,32 @@ async def two_step_create_pex(two_step_pex_request: TwoStepPexRequest) -> TwoSte
     return TwoStepPex(pex=full_pex)
 
 
+# The named cache which holds tool PEXes, addressed by their digest.
+PEX_TOOLS_CACHE_NAME = "pex_tools"
+PEX_TOOLS_CACHE_PATH = ".cache/pex_tools"
+
+# Atomically copy a file into a named cache, unless it's already there. This must be compatible with
+# Python 2.7 and Python 3.5+, as it runs with the bootstrap Python.
+COPY_TO_CACHE_SCRIPT = dedent(
+    """\
+    import errno, os, shutil, sys
+
+    src, dst = sys.argv[1:]
+    # The named cache is a symlink, whose target may not exist yet.
+    dst = os.path.join(os.path.realpath(os.path.dirname(dst)), os.path.basename(dst))
+    if not os.path.exists(dst):
+        try:
+            os.makedirs(os.path.dirname(dst))
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        tmp = "{}.{}.tmp".format(dst, os.getpid())
+        shutil.copyfile(src, tmp)
+        os.rename(tmp, dst)
+    """
+)
+
+
 @frozen_after_init
 @dataclass(unsafe_hash=True)
 class PexProcess:
@@ -653,6 +730,8 @@ class PexProcess:
     timeout_seconds: Optional[int]
     execution_slot_variable: Optional[str]
     uncacheable: bool
+    append_only_caches: Optional[FrozenDict[str, str]]
+    interactive: bool
 
     def __init__(
         self,
@@ -668,7 +747,14 @@ class PexProcess:
         timeout_seconds: Optional[int] = None,
         execution_slot_variable: Optional[str] = None,
         uncacheable: bool = False,
+        append_only_caches: Optional[Mapping[str, str]] = None,
+        interactive: bool = False,
     ) -> None:
+        """A request to run a PEX.
+
+        :param interactive: Whether the resulting `Process` will be run as an
+            `InteractiveProcess`, which has no named caches, so that the PEX must be in the sandbox.
+        """
         self.pex = pex
         self.argv = tuple(argv)
         self.description = description
@@ -680,15 +766,68 @@ class PexProcess:
         self.timeout_seconds = timeout_seconds
         self.execution_slot_variable = execution_slot_variable
         self.uncacheable = uncacheable
+        self.append_only_caches = FrozenDict(append_only_caches) if append_only_caches else None
+        self.interactive = interactive
 
 
 @rule
 async def setup_pex_process(request: PexProcess, pex_environment: PexEnvironment) -> Process:
-    argv = pex_environment.create_argv(
-        f"./{request.pex.name}",
-        *request.argv,
-        python=request.pex.python,
-    )
+    input_digest = request.input_digest
+    append_only_caches: Dict[str, str] = dict(request.append_only_caches or {})
+    python = request.pex.python or pex_environment.bootstrap_python
+    if pex_environment.persistent_workers and python:
+        # Rather than running the PEX directly, run a small client that hands the request to a
+        # warm worker for this PEX. See `pex_worker.py`.
+        worker_script_digest = await Get(Digest, CreateDigest([PEX_WORKER_SCRIPT]))
+        input_digest = await Get(Digest, MergeDigests([input_digest, worker_script_digest]))
+        append_only_caches[PEX_WORKERS_CACHE_NAME] = PEX_WORKERS_CACHE_PATH
+        argv: Tuple[str, ...] = (
+            python.path,
+            PEX_WORKER_SCRIPT.path,
+            PEX_WORKERS_CACHE_PATH,
+            pex_worker_key(request.pex.digest, python),
+            str(pex_environment.worker_idle_timeout),
+            f"./{request.pex.name}",
+            *request.argv,
+        )
+    elif pex_environment.cache_tool_pexes and python and not request.interactive:
+        # Rather than materializing the PEX into this sandbox, copy it once per session into a
+        # named cache, where it's addressed by its digest, and run it from there.
+        cached_pex_path = os.path.join(
+            PEX_TOOLS_CACHE_PATH, f"{request.pex.digest.fingerprint}.pex"
+        )
+        await Get(
+            ProcessResult,
+            UncacheableProcess(
+                Process(
+                    argv=(
+                        python.path,
+                        "-c",
+                        COPY_TO_CACHE_SCRIPT,
+                        request.pex.name,
+                        cached_pex_path,
+                    ),
+                    description=f"Add {request.pex.name} to the named cache",
+                    input_digest=request.pex.digest,
+                    append_only_caches={PEX_TOOLS_CACHE_NAME: PEX_TOOLS_CACHE_PATH},
+                    level=LogLevel.DEBUG,
+                ),
+                scope=ProcessScope.PER_SESSION,
+            ),
+        )
+        input_digest = await Get(
+            Digest, DigestSubset(input_digest, PathGlobs(["**", f"!{request.pex.name}"]))
+        )
+        append_only_caches[PEX_TOOLS_CACHE_NAME] = PEX_TOOLS_CACHE_PATH
+        argv = pex_environment.create_argv(
+            cached_pex_path, *request.argv, python=request.pex.python
+        )
+    else:
+        argv = pex_environment.create_argv(
+            f"./{request.pex.name}",
+            *request.argv,
+            python=request.pex.python,
+        )
     env = {
         **pex_environment.environment_dict(python_configured=request.pex.python is not None),
         **(request.extra_env or {}),
@@ -697,8 +836,9 @@ async def setup_pex_process(request: PexProcess, pex_environment: PexEnvironment
         argv,
         description=request.description,
         level=request.level,
-        input_digest=request.input_digest,
+        input_digest=input_digest,
         env=env,
+        append_only_caches=append_only_caches,
         output_files=request.output_files,
         output_directories=request.output_directories,
         timeout_seconds=request.timeout_seconds,
@@ -708,4 +848,4 @@ async def setup_pex_process(request: PexProcess, pex_environment: PexEnvironment
 
 
 def rules():
-    return [*collect_rules(), *pex_cli.rules()]
+    return [*collect_rules(), *pex_cli.rules(), *requirement_constraints_rules()]
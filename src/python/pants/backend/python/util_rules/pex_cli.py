@@ -64,6 +64,7 @@ class PexCliProcess:
     output_directories: Optional[Tuple[str, ...]]
     python: Optional[PythonExecutable]
     level: LogLevel
+    cpu_weight: int = dataclasses.field(compare=False)
 
     def __init__(
         self,
@@ -76,6 +77,7 @@ class PexCliProcess:
         output_directories: Optional[Iterable[str]] = None,
         python: Optional[PythonExecutable] = None,
         level: LogLevel = LogLevel.INFO,
+        cpu_weight: int = 1,
     ) -> None:
         self.argv = tuple(argv)
         self.description = description
@@ -85,6 +87,7 @@ class PexCliProcess:
         self.output_directories = tuple(output_directories) if output_directories else None
         self.python = python
         self.level = level
+        self.cpu_weight = cpu_weight
         self.__post_init__()
 
     def __post_init__(self) -> None:
@@ -166,6 +169,7 @@ async def setup_pex_cli_process(
         output_directories=request.output_directories,
         append_only_caches={"pex_root": pex_root_path},
         level=request.level,
+        cpu_weight=request.cpu_weight,
     )
 
 
@@ -12,6 +12,7 @@ from pants.engine import process
 from pants.engine.engine_aware import EngineAwareReturnType
 from pants.engine.process import BinaryPath, BinaryPathRequest, BinaryPaths, BinaryPathTest
 from pants.engine.rules import Get, MultiGet, collect_rules, rule
+from pants.option.global_options import GlobalOptions
 from pants.option.subsystem import Subsystem
 from pants.python.python_setup import PythonSetup
 from pants.util.frozendict import FrozenDict
@@ -63,6 +64,39 @@ class PexRuntimeEnvironment(Subsystem):
             default=0,
             help="Set the verbosity level of PEX logging, from 0 (no logging) up to 9 (max logging).",
         )
+        register(
+            "--persistent-workers",
+            advanced=True,
+            type=bool,
+            default=False,
+            help=(
+                "Run tool PEXes like Pytest, Flake8 and Black through persistent worker processes, "
+                "one per tool PEX and interpreter, which have already bootstrapped the PEX and "
+                "imported the tool. Each run still happens in its own sandbox and produces the "
+                "same result, but skips the tool's startup cost. Workers are stored in the "
+                "`pex_workers` named cache."
+            ),
+        )
+        register(
+            "--cache-tool-pexes",
+            advanced=True,
+            type=bool,
+            default=False,
+            help=(
+                "Rather than materializing tool PEXes like Pytest, Flake8 and MyPy into the sandbox "
+                "of every process which runs them, copy each one once per run into the "
+                "`pex_tools` named cache, where it is addressed by its digest, and run it from "
+                "there. This is ignored with remote execution."
+            ),
+        )
+        register(
+            "--worker-idle-timeout",
+            advanced=True,
+            type=int,
+            default=600,
+            metavar="<seconds>",
+            help="How long a persistent PEX worker waits for new work before exiting.",
+        )
 
     @memoized_property
     def path(self) -> Tuple[str, ...]:
@@ -89,6 +123,18 @@ class PexRuntimeEnvironment(Subsystem):
             raise ValueError("verbosity level must be between 0 and 9")
         return level
 
+    @property
+    def persistent_workers(self) -> bool:
+        return cast(bool, self.options.persistent_workers)
+
+    @property
+    def cache_tool_pexes(self) -> bool:
+        return cast(bool, self.options.cache_tool_pexes)
+
+    @property
+    def worker_idle_timeout(self) -> int:
+        return cast(int, self.options.worker_idle_timeout)
+
 
 class PythonExecutable(BinaryPath, EngineAwareReturnType):
     """The BinaryPath of a Python executable."""
@@ -103,6 +149,9 @@ class PexEnvironment(EngineAwareReturnType):
     interpreter_search_paths: Tuple[str, ...]
     subprocess_environment_dict: FrozenDict[str, str]
     bootstrap_python: Optional[PythonExecutable] = None
+    persistent_workers: bool = False
+    worker_idle_timeout: int = 600
+    cache_tool_pexes: bool = False
 
     def create_argv(
         self, pex_filepath: str, *args: str, python: Optional[PythonExecutable] = None
@@ -150,6 +199,7 @@ async def find_pex_python(
     python_setup: PythonSetup,
     pex_runtime_env: PexRuntimeEnvironment,
     subprocess_env_vars: SubprocessEnvironmentVars,
+    global_options: GlobalOptions,
 ) -> PexEnvironment:
     # PEX files are compatible with bootstrapping via Python 2.7 or Python 3.5+. The bootstrap
     # code will then re-exec itself if the underlying PEX user code needs a more specific python
@@ -215,6 +265,12 @@ async def find_pex_python(
         interpreter_search_paths=tuple(python_setup.interpreter_search_paths),
         subprocess_environment_dict=subprocess_env_vars.vars,
         bootstrap_python=first_python_binary(),
+        persistent_workers=pex_runtime_env.persistent_workers,
+        worker_idle_timeout=pex_runtime_env.worker_idle_timeout,
+        # Named caches are only available to local processes.
+        cache_tool_pexes=(
+            pex_runtime_env.cache_tool_pexes and not global_options.options.remote_execution
+        ),
     )
 
 
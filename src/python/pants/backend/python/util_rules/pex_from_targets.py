@@ -7,9 +7,6 @@ import logging
 from dataclasses import dataclass
 from typing import Iterable, Optional, Tuple
 
-from packaging.utils import canonicalize_name as canonicalize_project_name
-from pkg_resources import Requirement, parse_requirements
-
 from pants.backend.python.target_types import (
     PythonInterpreterCompatibility,
     PythonRequirementsField,
@@ -27,15 +24,9 @@ from pants.backend.python.util_rules.python_sources import (
     StrippedPythonSourceFiles,
 )
 from pants.backend.python.util_rules.python_sources import rules as python_sources_rules
+from pants.backend.python.util_rules.requirement_constraints import RequirementConstraints
 from pants.engine.addresses import Address, Addresses
-from pants.engine.fs import (
-    Digest,
-    DigestContents,
-    GlobExpansionConjunction,
-    GlobMatchErrorBehavior,
-    MergeDigests,
-    PathGlobs,
-)
+from pants.engine.fs import Digest, MergeDigests
 from pants.engine.rules import Get, MultiGet, collect_rules, rule
 from pants.engine.target import (
     Dependencies,
@@ -182,7 +173,11 @@ class TwoStepPexFromTargetsRequest:
 
 
 @rule(level=LogLevel.DEBUG)
-async def pex_from_targets(request: PexFromTargetsRequest, python_setup: PythonSetup) -> PexRequest:
+async def pex_from_targets(
+    request: PexFromTargetsRequest,
+    python_setup: PythonSetup,
+    requirement_constraints: RequirementConstraints,
+) -> PexRequest:
     if request.direct_deps_only:
         targets = await Get(Targets, Addresses(request.addresses))
         direct_deps = await MultiGet(
@@ -234,33 +229,11 @@ async def pex_from_targets(request: PexFromTargetsRequest, python_setup: PythonS
     requirements = exact_reqs
     description = request.description
 
-    if python_setup.requirement_constraints:
-        # In requirement strings Foo_-Bar.BAZ and foo-bar-baz refer to the same project. We let
-        # packaging canonicalize for us.
-        # See: https://www.python.org/dev/peps/pep-0503/#normalized-names
-
-        exact_req_projects = {
-            canonicalize_project_name(Requirement.parse(req).project_name) for req in exact_reqs
-        }
-        constraints_file_contents = await Get(
-            DigestContents,
-            PathGlobs(
-                [python_setup.requirement_constraints],
-                glob_match_error_behavior=GlobMatchErrorBehavior.error,
-                conjunction=GlobExpansionConjunction.all_match,
-                description_of_origin="the option `--python-setup-requirement-constraints`",
-            ),
-        )
-        constraints_file_reqs = set(
-            parse_requirements(next(iter(constraints_file_contents)).content.decode())
-        )
-        constraint_file_projects = {
-            canonicalize_project_name(req.project_name) for req in constraints_file_reqs
-        }
-        unconstrained_projects = exact_req_projects - constraint_file_projects
+    if requirement_constraints.path is not None:
+        unconstrained_projects = requirement_constraints.unconstrained_projects(exact_reqs)
         if unconstrained_projects:
             logger.warning(
-                f"The constraints file {python_setup.requirement_constraints} does not contain "
+                f"The constraints file {requirement_constraints.path} does not contain "
                 f"entries for the following requirements: {', '.join(unconstrained_projects)}"
             )
 
@@ -274,8 +247,10 @@ async def pex_from_targets(request: PexFromTargetsRequest, python_setup: PythonS
                     "because constraints file does not cover all requirements."
                 )
             else:
-                requirements = PexRequirements(str(req) for req in constraints_file_reqs)
-                description = description or f"Resolving {python_setup.requirement_constraints}"
+                requirements = PexRequirements(
+                    str(req) for req in requirement_constraints.all_requirements
+                )
+                description = description or f"Resolving {requirement_constraints.path}"
     elif (
         python_setup.resolve_all_constraints != ResolveAllConstraintsOption.NEVER
         and python_setup.resolve_all_constraints_was_set_explicitly()
@@ -22,8 +22,15 @@ from pants.backend.python.util_rules.pex import (
 )
 from pants.backend.python.util_rules.pex import rules as pex_rules
 from pants.engine.addresses import Address
-from pants.engine.fs import CreateDigest, Digest, FileContent
-from pants.engine.process import Process, ProcessResult
+from pants.engine.fs import (
+    EMPTY_DIGEST,
+    CreateDigest,
+    Digest,
+    DigestContents,
+    FileContent,
+    MergeDigests,
+)
+from pants.engine.process import FallibleProcessResult, Process, ProcessResult
 from pants.engine.target import FieldSet
 from pants.python.python_setup import PythonSetup
 from pants.testutil.option_util import create_subsystem
@@ -55,9 +62,15 @@ def test_merge_interpreter_constraints() -> None:
 
     # Both AND and OR.
     # (A | B) & C => (A & B) | (B & C)
+    assert_merged(
+        inp=[["CPython>=2.7", "CPython>=3.5"], ["CPython==3.6.*"]],
+        expected=["CPython>=2.7,==3.6.*", "CPython>=3.5,==3.6.*"],
+    )
+    # Unsatisfiable conjunctions are dropped, so long as at least one is satisfiable.
+    # (A | B) & C => (A & C) | (B & C) => B & C, given that A & C is impossible.
     assert_merged(
         inp=[["CPython>=2.7,<3", "CPython>=3.5"], ["CPython==3.6.*"]],
-        expected=["CPython>=2.7,<3,==3.6.*", "CPython>=3.5,==3.6.*"],
+        expected=["CPython>=3.5,==3.6.*"],
     )
     # A & B & (C | D) => (A & B & C) | (A & B & D)
     assert_merged(
@@ -66,14 +79,19 @@ def test_merge_interpreter_constraints() -> None:
     )
     # (A | B) & (C | D) => (A & C) | (A & D) | (B & C) | (B & D)
     assert_merged(
-        inp=[["CPython>=2.7,<3", "CPython>=3.5"], ["CPython==3.6.*", "CPython==3.7.*"]],
+        inp=[["CPython>=2.7", "CPython>=3.5"], ["CPython==3.6.*", "CPython==3.7.*"]],
         expected=[
-            "CPython>=2.7,<3,==3.6.*",
-            "CPython>=2.7,<3,==3.7.*",
+            "CPython>=2.7,==3.6.*",
+            "CPython>=2.7,==3.7.*",
             "CPython>=3.5,==3.6.*",
             "CPython>=3.5,==3.7.*",
         ],
     )
+    assert_merged(
+        inp=[["CPython>=2.7,<3", "CPython>=3.5"], ["CPython==3.6.*", "CPython==3.7.*"]],
+        expected=["CPython>=3.5,==3.6.*", "CPython>=3.5,==3.7.*"],
+    )
+    # If every conjunction is impossible, they are all kept.
     # A & (B | C | D) & (E | F) & G =>
     # (A & B & E & G) | (A & B & F & G) | (A & C & E & G) | (A & C & F & G) | (A & D & E & G) | (A & D & F & G)
     assert_merged(
@@ -110,7 +128,7 @@ def test_merge_interpreter_constraints() -> None:
             ["CPython==3.6.*"],
             ["CPython>=3.5", "CPython>=2.7,<3"],
         ],
-        expected=["CPython>=2.7,<3,==3.6.*", "CPython>=3.5,==3.6.*"],
+        expected=["CPython>=3.5,==3.6.*"],
     )
 
     # No specifiers
@@ -307,6 +325,9 @@ def rule_runner() -> RuleRunner:
             QueryRule(Pex, (PexRequest,)),
             QueryRule(Process, (PexProcess,)),
             QueryRule(ProcessResult, (Process,)),
+            QueryRule(FallibleProcessResult, (Process,)),
+            QueryRule(DigestContents, (Digest,)),
+            QueryRule(Digest, (MergeDigests,)),
         ]
     )
 
@@ -462,6 +483,175 @@ def test_pex_environment(rule_runner: RuleRunner) -> None:
     assert b"ftp_proxy=dummyproxy" in result.stdout
 
 
+def test_pex_execution_with_persistent_workers(rule_runner: RuleRunner) -> None:
+    sources = rule_runner.request(
+        Digest,
+        [
+            CreateDigest(
+                (
+                    FileContent(
+                        path="main.py",
+                        content=textwrap.dedent(
+                            """
+                            import sys
+
+                            def main():
+                                print(" ".join(sys.argv[1:]))
+                                with open("out.txt", "w") as fp:
+                                    fp.write(sys.argv[1])
+                                sys.exit(int(sys.argv[2]))
+                            """
+                        ).encode(),
+                    ),
+                )
+            ),
+        ],
+    )
+    pex_output = create_pex_and_get_all_data(
+        rule_runner,
+        entry_point="main:main",
+        sources=sources,
+        additional_pants_args=("--pex-persistent-workers",),
+    )
+
+    def run(message: str, exit_code: int) -> FallibleProcessResult:
+        process = rule_runner.request(
+            Process,
+            [
+                PexProcess(
+                    pex_output["pex"],
+                    argv=[message, str(exit_code)],
+                    output_files=["out.txt"],
+                    description="Run the pex through a persistent worker",
+                ),
+            ],
+        )
+        assert "pex_workers" in process.append_only_caches
+        return rule_runner.request(FallibleProcessResult, [process])
+
+    # The first run spawns the worker and the second reuses it; both must behave like a direct run.
+    for message, exit_code in (("first", 0), ("second", 42)):
+        result = run(message, exit_code)
+        assert result.exit_code == exit_code
+        assert result.stdout == f"{message} {exit_code}\n".encode()
+        digest_contents = rule_runner.request(DigestContents, [result.output_digest])
+        assert digest_contents == DigestContents([FileContent("out.txt", message.encode())])
+
+
+def test_pex_execution_with_persistent_workers_and_pex_path(rule_runner: RuleRunner) -> None:
+    rule_runner.set_options(["--backend-packages=pants.backend.python", "--pex-persistent-workers"])
+
+    def requirements_pex(requirement: str) -> Pex:
+        return rule_runner.request(
+            Pex,
+            [
+                PexRequest(
+                    output_filename="requirements.pex",
+                    internal_only=True,
+                    requirements=PexRequirements([requirement]),
+                )
+            ],
+        )
+
+    six_1_15, six_1_14 = requirements_pex("six==1.15.0"), requirements_pex("six==1.14.0")
+    sources = rule_runner.request(
+        Digest,
+        [
+            CreateDigest(
+                [FileContent("main.py", b"import six\n\ndef main():\n    print(six.__version__)\n")]
+            ),
+        ],
+    )
+    # Like `pytest.pex`, the tool PEX only records the path of the requirements PEX, so it's the
+    # same PEX no matter which requirements it runs with.
+    tool_pex = rule_runner.request(
+        Pex,
+        [
+            PexRequest(
+                output_filename="tool.pex",
+                internal_only=True,
+                entry_point="main:main",
+                sources=sources,
+                additional_inputs=six_1_15.digest,
+                additional_args=("--pex-path", "requirements.pex"),
+            )
+        ],
+    )
+
+    def run(requirements: Pex) -> bytes:
+        input_digest = rule_runner.request(
+            Digest, [MergeDigests([tool_pex.digest, requirements.digest])]
+        )
+        process = rule_runner.request(
+            Process,
+            [
+                PexProcess(
+                    tool_pex,
+                    argv=[],
+                    input_digest=input_digest,
+                    description="Run the pex through a persistent worker",
+                ),
+            ],
+        )
+        assert "pex_workers" in process.append_only_caches
+        return rule_runner.request(ProcessResult, [process]).stdout
+
+    # Each set of requirements must get its own worker, rather than sharing the first one's.
+    assert run(six_1_15) == b"1.15.0\n"
+    assert run(six_1_14) == b"1.14.0\n"
+    assert run(six_1_15) == b"1.15.0\n"
+
+
+def test_pex_execution_from_tool_cache(rule_runner: RuleRunner) -> None:
+    sources = rule_runner.request(
+        Digest,
+        [
+            CreateDigest(
+                (
+                    FileContent(
+                        path="main.py",
+                        content=textwrap.dedent(
+                            """
+                            import sys
+
+                            def main():
+                                with open("out.txt", "w") as fp:
+                                    fp.write(sys.argv[1])
+                            """
+                        ).encode(),
+                    ),
+                )
+            ),
+        ],
+    )
+    pex_output = create_pex_and_get_all_data(
+        rule_runner,
+        entry_point="main:main",
+        sources=sources,
+        additional_pants_args=("--pex-cache-tool-pexes",),
+    )
+    pex = pex_output["pex"]
+    process = rule_runner.request(
+        Process,
+        [
+            PexProcess(
+                pex,
+                argv=["cached"],
+                output_files=["out.txt"],
+                description="Run the pex from the tool cache",
+            ),
+        ],
+    )
+    # The PEX is run from the named cache, rather than being materialized into the sandbox.
+    assert "pex_tools" in process.append_only_caches
+    assert f".cache/pex_tools/{pex.digest.fingerprint}.pex" in process.argv
+    assert process.input_digest == EMPTY_DIGEST
+
+    result = rule_runner.request(ProcessResult, [process])
+    digest_contents = rule_runner.request(DigestContents, [result.output_digest])
+    assert digest_contents == DigestContents([FileContent("out.txt", b"cached")])
+
+
 def test_resolves_dependencies(rule_runner: RuleRunner) -> None:
     requirements = PexRequirements(["six==1.12.0", "jsonschema==2.6.0", "requests==2.23.0"])
     pex_info = create_pex_and_get_pex_info(rule_runner, requirements=requirements)
@@ -0,0 +1,440 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Persistent worker processes for running tool PEXes.
+
+Running a tool PEX (Pytest, Flake8, Black, ...) pays a fixed startup cost on every invocation: the
+interpreter starts, the PEX bootstraps its `.deps` onto `sys.path` and the tool imports its
+modules. When `[pex].persistent_workers` is enabled, `PexProcess` instead runs a tiny client script
+inside the usual sandbox. The client connects over a Unix domain socket to a warm worker, one per
+(tool PEX digest, interpreter, PEX path), which lives in a named append-only cache so that it
+outlives any single sandbox. The PEX path is that of e.g. the requirements PEX which Pytest runs
+with, so that each set of requirements gets its own worker.
+
+For each request, the worker forks a child from its warm state. The child adopts the client's
+stdio file descriptors (passed via `SCM_RIGHTS`), working directory (the sandbox), environment and
+argv, then runs the PEX's entry point. The exit code is sent back to the client, which exits with
+it. Because the tool still reads and writes the sandbox and the client's stdio, the engine captures
+the same `FallibleProcessResult` it would for a direct run, and caching is unchanged.
+
+If a worker can't be used (e.g. the interpreter lacks `socket.sendmsg` or the socket path would be
+too long), the client falls back to executing the PEX directly.
+"""
+
+import hashlib
+from textwrap import dedent
+
+from pants.backend.python.util_rules.pex_environment import PythonExecutable
+from pants.engine.fs import Digest, FileContent
+
+# The name of the append-only cache holding worker sockets and their private copies of tool PEXes.
+PEX_WORKERS_CACHE_NAME = "pex_workers"
+PEX_WORKERS_CACHE_PATH = ".cache/pex_workers"
+
+PEX_WORKER_SCRIPT = FileContent(
+    "__pants_pex_worker.py",
+    # N.B.: The following script must be compatible with Python 2.7 and Python 3.5+, as it runs
+    # with the same interpreter as the tool PEX. Python 2.7 always falls back to running the PEX
+    # directly because it lacks `socket.sendmsg`.
+    dedent(
+        """\
+        import array
+        import errno
+        import fcntl
+        import hashlib
+        import json
+        import os
+        import shutil
+        import socket
+        import struct
+        import sys
+        import threading
+        import time
+        import zipfile
+
+        # AF_UNIX paths are limited to ~108 bytes on Linux and 104 bytes on macOS.
+        _MAX_SOCKET_PATH_LENGTH = 100
+        _HEADER = struct.Struct(">I")
+        _STARTUP_TIMEOUT_SECONDS = 60.0
+
+
+        def _exec_pex_directly(pex_path, args):
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execv(sys.executable, [sys.executable, pex_path] + list(args))
+
+
+        def _recv_exactly(sock, length):
+            chunks = []
+            while length > 0:
+                chunk = sock.recv(length)
+                if not chunk:
+                    raise EOFError("Connection closed while reading a message.")
+                chunks.append(chunk)
+                length -= len(chunk)
+            return b"".join(chunks)
+
+
+        def _send_message(sock, payload, fds=()):
+            data = json.dumps(payload).encode("utf-8")
+            header = _HEADER.pack(len(data))
+            if fds:
+                ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))]
+                sock.sendmsg([header], ancillary)
+            else:
+                sock.sendall(header)
+            sock.sendall(data)
+
+
+        def _recv_message(sock, max_fds=0):
+            fds = array.array("i")
+            if max_fds:
+                header, ancillary, _, _ = sock.recvmsg(
+                    _HEADER.size, socket.CMSG_LEN(max_fds * fds.itemsize)
+                )
+                for level, kind, data in ancillary:
+                    if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                        fds.frombytes(data[: len(data) - (len(data) % fds.itemsize)])
+                if len(header) < _HEADER.size:
+                    header += _recv_exactly(sock, _HEADER.size - len(header))
+            else:
+                header = _recv_exactly(sock, _HEADER.size)
+            (length,) = _HEADER.unpack(header)
+            return json.loads(_recv_exactly(sock, length).decode("utf-8")), list(fds)
+
+
+        def _connect(socket_path):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(socket_path)
+            except (OSError, socket.error):
+                sock.close()
+                return None
+            return sock
+
+
+        def _read_pex_info(pex_path):
+            with zipfile.ZipFile(pex_path) as pex:
+                return pex.read("PEX-INFO")
+
+
+        def _pex_path_entries(pex_path):
+            # The PEXes which the PEX activates along with its own distributions: those baked in
+            # with `--pex-path` and those on `PEX_PATH`, e.g. a requirements PEX. Returns None if
+            # any of them can't be copied into the worker's directory under the same relative path.
+            baked = json.loads(_read_pex_info(pex_path).decode("utf-8")).get("pex_path") or ""
+            if isinstance(baked, list):
+                baked = os.pathsep.join(baked)
+            entries = []
+            for value in (baked, os.environ.get("PEX_PATH", "")):
+                for entry in value.split(os.pathsep):
+                    if not entry:
+                        continue
+                    entry = os.path.normpath(entry)
+                    if os.path.isabs(entry) or entry.startswith(os.pardir):
+                        return None
+                    if not os.path.isfile(entry):
+                        return None
+                    if entry not in entries:
+                        entries.append(entry)
+            return entries
+
+
+        def _worker_key(key, pex_path_entries):
+            # The tool PEX is the same no matter which requirements PEX it runs with, so the worker
+            # is also keyed by the PEX-INFO of each of those, which records its distributions.
+            if not pex_path_entries:
+                return key
+            hasher = hashlib.sha256(key.encode("utf-8"))
+            for entry in pex_path_entries:
+                hasher.update(entry.encode("utf-8"))
+                hasher.update(_read_pex_info(entry))
+            return hasher.hexdigest()[: len(key)]
+
+
+        def _copy_into(src, dst):
+            if os.path.exists(dst):
+                return
+            if not os.path.isdir(os.path.dirname(dst)):
+                os.makedirs(os.path.dirname(dst))
+            tmp = "{}.{}.tmp".format(dst, os.getpid())
+            shutil.copy2(src, tmp)
+            os.rename(tmp, dst)
+
+
+        def _is_running(pid):
+            try:
+                os.kill(pid, 0)
+            except OSError as e:
+                return e.errno == errno.EPERM
+            # A worker which died lingers as a zombie until it's reaped, which `kill` can't tell.
+            try:
+                with open("/proc/{}/stat".format(pid)) as fp:
+                    return fp.read().rsplit(")", 1)[1].split()[0] != "Z"
+            except (IOError, OSError, IndexError):
+                return True
+
+
+        def _spawn_worker(worker_dir, socket_path, pex_path, pex_path_entries, idle_timeout):
+            # Start a worker in the background, and return its pid, or None if it failed to fork.
+            if not os.path.isdir(worker_dir):
+                os.makedirs(worker_dir)
+            # The sandbox holding the original PEXes and this script is deleted when the client
+            # exits, so the worker runs from its own copies. The PEX path entries keep their
+            # relative paths, as those are what the tool PEX records.
+            worker_pex = os.path.join(worker_dir, os.path.basename(pex_path))
+            worker_script = os.path.join(worker_dir, os.path.basename(__file__))
+            _copy_into(pex_path, worker_pex)
+            _copy_into(os.path.abspath(__file__), worker_script)
+            for entry in pex_path_entries:
+                _copy_into(entry, os.path.join(worker_dir, entry))
+            env = dict(os.environ, PEX_INTERPRETER="1", PEX_PATH=os.pathsep.join(pex_path_entries))
+            devnull = os.open(os.devnull, os.O_RDWR)
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    # Detach fully from the client so that the engine does not wait on the worker.
+                    os.setsid()
+                    worker_pid = os.fork()
+                    if worker_pid != 0:
+                        os.write(write_fd, str(worker_pid).encode("ascii"))
+                        os._exit(0)
+                    os.chdir(worker_dir)
+                    for fd in (0, 1, 2):
+                        os.dup2(devnull, fd)
+                    # In particular, the worker must not hold on to the client's spawn lock.
+                    os.closerange(3, 1024)
+                    os.execve(
+                        sys.executable,
+                        [
+                            sys.executable,
+                            worker_pex,
+                            worker_script,
+                            "--serve",
+                            socket_path,
+                            worker_pex,
+                            str(idle_timeout),
+                        ],
+                        env,
+                    )
+                finally:
+                    os._exit(1)
+            os.close(write_fd)
+            os.close(devnull)
+            os.waitpid(pid, 0)
+            worker_pid = os.read(read_fd, 32)
+            os.close(read_fd)
+            return int(worker_pid) if worker_pid else None
+
+
+        def _worker_connection(workers_dir, key, pex_path, idle_timeout):
+            pex_path_entries = _pex_path_entries(pex_path)
+            if pex_path_entries is None:
+                return None
+            key = _worker_key(key, pex_path_entries)
+            worker_dir = os.path.join(os.path.realpath(workers_dir), key)
+            socket_path = os.path.join(worker_dir, "worker.sock")
+            if len(socket_path) > _MAX_SOCKET_PATH_LENGTH:
+                return None
+            sock = _connect(socket_path)
+            if sock is not None:
+                return sock
+            if not os.path.isdir(worker_dir):
+                os.makedirs(worker_dir)
+            with open(os.path.join(worker_dir, "spawn.lock"), "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                sock = _connect(socket_path)
+                if sock is not None:
+                    return sock
+                worker_pid = _spawn_worker(
+                    worker_dir, socket_path, pex_path, pex_path_entries, idle_timeout
+                )
+                deadline = time.time() + _STARTUP_TIMEOUT_SECONDS
+                while worker_pid is not None and time.time() < deadline:
+                    sock = _connect(socket_path)
+                    if sock is not None:
+                        return sock
+                    # Fall back to running the PEX directly as soon as the worker dies, rather
+                    # than waiting out the timeout.
+                    if not _is_running(worker_pid):
+                        break
+                    time.sleep(0.01)
+            return None
+
+
+        def run_client(workers_dir, key, idle_timeout, pex_path, args):
+            if not hasattr(socket.socket, "sendmsg"):
+                _exec_pex_directly(pex_path, args)
+            sock = _worker_connection(workers_dir, key, pex_path, idle_timeout)
+            if sock is None:
+                _exec_pex_directly(pex_path, args)
+            request = {"cwd": os.getcwd(), "argv": list(args), "env": dict(os.environ)}
+            _send_message(sock, request, fds=(0, 1, 2))
+            try:
+                response, _ = _recv_message(sock)
+            except EOFError:
+                sys.stderr.write("The PEX worker for {} exited unexpectedly.\\n".format(pex_path))
+                sys.exit(1)
+            sys.exit(response["exit_code"])
+
+
+        def _run_entry_point(entry_point):
+            import runpy
+
+            if ":" in entry_point:
+                module_name, function_name = entry_point.split(":", 1)
+                module = __import__(module_name, fromlist=[function_name])
+                return getattr(module, function_name)()
+            runpy.run_module(entry_point, run_name="__main__", alter_sys=True)
+            return 0
+
+
+        def _warm_up(entry_point):
+            # Importing a `module:function` entry point or a package is side-effect free for
+            # well-behaved tools. A plain module entry point may run the tool when imported, so we
+            # leave it for the children.
+            import importlib
+
+            module_name = entry_point.split(":", 1)[0]
+            try:
+                if ":" in entry_point:
+                    importlib.import_module(module_name)
+                    return
+                import pkgutil
+
+                loader = pkgutil.get_loader(module_name)
+                if loader is not None and loader.is_package(module_name):
+                    importlib.import_module(module_name)
+            except Exception:
+                pass
+
+
+        def _watch_client(sock):
+            # The client sends nothing after its request, so EOF means that it died, e.g. because
+            # the engine timed it out. Don't let the child keep writing into a deleted sandbox.
+            try:
+                sock.recv(1)
+            finally:
+                os._exit(1)
+
+
+        def _serve_request(conn, pex_path, entry_point, base_sys_path):
+            request, fds = _recv_message(conn, max_fds=3)
+            for target_fd, fd in enumerate(fds):
+                os.dup2(fd, target_fd)
+                os.close(fd)
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+            extra_sys_path = [
+                os.path.abspath(entry)
+                for entry in os.environ.get("PEX_EXTRA_SYS_PATH", "").split(os.pathsep)
+                if entry
+            ]
+            sys.path[:] = base_sys_path + extra_sys_path
+            sys.argv = [pex_path] + request["argv"]
+            watcher = threading.Thread(target=_watch_client, args=(conn,))
+            watcher.daemon = True
+            watcher.start()
+
+            exit_code = 0
+            try:
+                result = _run_entry_point(entry_point)
+                if isinstance(result, int):
+                    exit_code = result
+                elif result is not None:
+                    exit_code = 1
+            except SystemExit as e:
+                if e.code is None:
+                    exit_code = 0
+                elif isinstance(e.code, int):
+                    exit_code = e.code
+                else:
+                    sys.stderr.write("{}\\n".format(e.code))
+                    exit_code = 1
+            except BaseException:
+                import traceback
+
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                try:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                except Exception:
+                    pass
+            _send_message(conn, {"exit_code": exit_code})
+            os._exit(0)
+
+
+        def run_worker(socket_path, pex_path, idle_timeout):
+            entry_point = json.loads(_read_pex_info(pex_path).decode("utf-8"))["entry_point"]
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                os.unlink(socket_path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+            _warm_up(entry_point)
+            base_sys_path = list(sys.path)
+            server.bind(socket_path)
+            server.listen(64)
+            server.settimeout(1.0)
+            last_activity = time.time()
+            children = set()
+            try:
+                while True:
+                    for pid in list(children):
+                        if os.waitpid(pid, os.WNOHANG)[0] != 0:
+                            children.discard(pid)
+                    if children:
+                        last_activity = time.time()
+                    elif time.time() - last_activity > idle_timeout:
+                        return
+                    try:
+                        conn, _ = server.accept()
+                    except socket.timeout:
+                        continue
+                    conn.settimeout(None)
+                    pid = os.fork()
+                    if pid == 0:
+                        server.close()
+                        try:
+                            _serve_request(conn, pex_path, entry_point, base_sys_path)
+                        finally:
+                            os._exit(1)
+                    conn.close()
+                    children.add(pid)
+                    last_activity = time.time()
+            finally:
+                server.close()
+                try:
+                    os.unlink(socket_path)
+                except OSError:
+                    pass
+
+
+        if __name__ == "__main__":
+            if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+                run_worker(sys.argv[2], sys.argv[3], float(sys.argv[4]))
+            else:
+                run_client(sys.argv[1], sys.argv[2], float(sys.argv[3]), sys.argv[4], sys.argv[5:])
+        """
+    ).encode(),
+)
+
+
+def pex_worker_key(pex_digest: Digest, python: PythonExecutable) -> str:
+    """Identify the worker for a tool PEX running with a particular interpreter.
+
+    The client further narrows this down by the PEXes on the tool PEX's `--pex-path` and
+    `PEX_PATH`, which are only known in the sandbox.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(pex_digest.fingerprint.encode())
+    hasher.update(str(pex_digest.serialized_bytes_length).encode())
+    hasher.update(python.path.encode())
+    hasher.update(python.fingerprint.encode())
+    # NB: Keep this short, as it becomes part of the worker's Unix domain socket path.
+    return hasher.hexdigest()[:16]
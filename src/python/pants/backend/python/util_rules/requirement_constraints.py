@@ -0,0 +1,104 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from packaging.utils import canonicalize_name as canonicalize_project_name
+from pkg_resources import Requirement, parse_requirements
+
+from pants.engine.fs import (
+    EMPTY_DIGEST,
+    Digest,
+    DigestContents,
+    GlobExpansionConjunction,
+    GlobMatchErrorBehavior,
+    PathGlobs,
+)
+from pants.engine.rules import Get, collect_rules, rule
+from pants.python.python_setup import PythonSetup
+from pants.util.frozendict import FrozenDict
+from pants.util.logging import LogLevel
+from pants.util.ordered_set import FrozenOrderedSet
+
+
+def canonical_project_name(requirement: str) -> str:
+    """The PEP 503 normalized project name of a requirement string.
+
+    In requirement strings `Foo_-Bar.BAZ` and `foo-bar-baz` refer to the same project. See
+    https://www.python.org/dev/peps/pep-0503/#normalized-names.
+    """
+    return canonicalize_project_name(Requirement.parse(requirement).project_name)
+
+
+@dataclass(frozen=True)
+class RequirementConstraints:
+    """The parsed `--python-setup-requirement-constraints` file, indexed by project.
+
+    This is computed once per session (and then only when the file changes), rather than every
+    time that a PEX is created.
+    """
+
+    path: Optional[str]
+    digest: Digest
+    # The canonical project name -> the constraints for that project. A project may have more than
+    # one constraint, e.g. with different environment markers.
+    by_project: FrozenDict[str, Tuple[Requirement, ...]]
+
+    @classmethod
+    def parse(cls, path: str, digest: Digest, content: str) -> "RequirementConstraints":
+        by_project: Dict[str, Tuple[Requirement, ...]] = {}
+        for req in parse_requirements(content):
+            project = canonicalize_project_name(req.project_name)
+            if req not in by_project.get(project, ()):
+                by_project[project] = (*by_project.get(project, ()), req)
+        return cls(path, digest, FrozenDict(sorted(by_project.items())))
+
+    @classmethod
+    def empty(cls) -> "RequirementConstraints":
+        return cls(None, EMPTY_DIGEST, FrozenDict())
+
+    @property
+    def all_requirements(self) -> Tuple[Requirement, ...]:
+        return tuple(req for reqs in self.by_project.values() for req in reqs)
+
+    def unconstrained_projects(self, requirements: Iterable[str]) -> FrozenOrderedSet[str]:
+        """The canonical names of the projects of `requirements` which have no constraint."""
+        return FrozenOrderedSet(
+            sorted(
+                project
+                for project in {canonical_project_name(req) for req in requirements}
+                if project not in self.by_project
+            )
+        )
+
+    def relevant_to(self, requirements: Iterable[str]) -> Tuple[Requirement, ...]:
+        """The constraints which apply directly to the projects of `requirements`.
+
+        NB: The constraints for transitive dependencies are not included, as we cannot know what
+        they are without resolving.
+        """
+        projects = sorted({canonical_project_name(req) for req in requirements})
+        return tuple(req for project in projects for req in self.by_project.get(project, ()))
+
+
+@rule(desc="Parse the requirement constraints file", level=LogLevel.DEBUG)
+async def parse_requirement_constraints(python_setup: PythonSetup) -> RequirementConstraints:
+    if python_setup.requirement_constraints is None:
+        return RequirementConstraints.empty()
+    path = python_setup.requirement_constraints
+    digest = await Get(
+        Digest,
+        PathGlobs(
+            [path],
+            glob_match_error_behavior=GlobMatchErrorBehavior.error,
+            conjunction=GlobExpansionConjunction.all_match,
+            description_of_origin="the option `--python-setup-requirement-constraints`",
+        ),
+    )
+    digest_contents = await Get(DigestContents, Digest, digest)
+    return RequirementConstraints.parse(path, digest, digest_contents[0].content.decode())
+
+
+def rules():
+    return collect_rules()
@@ -0,0 +1,68 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from textwrap import dedent
+
+import pytest
+from pkg_resources import Requirement
+
+from pants.backend.python.util_rules import requirement_constraints
+from pants.backend.python.util_rules.requirement_constraints import RequirementConstraints
+from pants.engine.fs import EMPTY_DIGEST
+from pants.testutil.rule_runner import QueryRule, RuleRunner
+
+CONSTRAINTS = dedent(
+    """\
+    # A comment.
+    Foo._-BAR==1.0.0
+    bar==5.5.5
+    six==1.14.0; python_version < "3"
+    six==1.15.0; python_version >= "3"
+    """
+)
+
+
+def test_parse() -> None:
+    constraints = RequirementConstraints.parse("constraints.txt", EMPTY_DIGEST, CONSTRAINTS)
+    assert dict(constraints.by_project) == {
+        "bar": (Requirement.parse("bar==5.5.5"),),
+        "foo-bar": (Requirement.parse("Foo._-BAR==1.0.0"),),
+        "six": (
+            Requirement.parse('six==1.14.0; python_version < "3"'),
+            Requirement.parse('six==1.15.0; python_version >= "3"'),
+        ),
+    }
+    assert len(constraints.all_requirements) == 4
+
+
+def test_queries() -> None:
+    constraints = RequirementConstraints.parse("constraints.txt", EMPTY_DIGEST, CONSTRAINTS)
+    requirements = ["foo-bar>=0.1.2", "SIX", "baz", "Qux_Quux"]
+    assert list(constraints.unconstrained_projects(requirements)) == ["baz", "qux-quux"]
+    assert constraints.relevant_to(requirements) == (
+        Requirement.parse("Foo._-BAR==1.0.0"),
+        Requirement.parse('six==1.14.0; python_version < "3"'),
+        Requirement.parse('six==1.15.0; python_version >= "3"'),
+    )
+    assert constraints.relevant_to([]) == ()
+
+
+@pytest.fixture
+def rule_runner() -> RuleRunner:
+    return RuleRunner(
+        rules=[
+            *requirement_constraints.rules(),
+            QueryRule(RequirementConstraints, ()),
+        ]
+    )
+
+
+def test_parse_requirement_constraints_rule(rule_runner: RuleRunner) -> None:
+    assert rule_runner.request(RequirementConstraints, []) == RequirementConstraints.empty()
+
+    rule_runner.create_file("constraints.txt", CONSTRAINTS)
+    rule_runner.set_options(["--python-setup-requirement-constraints=constraints.txt"])
+    constraints = rule_runner.request(RequirementConstraints, [])
+    assert constraints.path == "constraints.txt"
+    assert constraints.digest != EMPTY_DIGEST
+    assert sorted(constraints.by_project) == ["bar", "foo-bar", "six"]
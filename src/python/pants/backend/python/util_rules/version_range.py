@@ -0,0 +1,175 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""An interval representation of version specifiers, e.g. `>=3.6,!=3.7.*`.
+
+This allows us to answer questions like "is this constraint satisfiable?" or "does it include any
+Python 3.7 release?" analytically, rather than by probing individual versions.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+from pkg_resources import parse_version
+
+from pants.util.memo import memoized
+
+# A release segment with trailing zeros stripped, so that e.g. `3.6` and `3.6.0` compare equal.
+Release = Tuple[int, ...]
+
+
+def _normalize(release: Iterable[int]) -> Release:
+    result = list(release)
+    while result and result[-1] == 0:
+        result.pop()
+    return tuple(result)
+
+
+def _parse_release(version: str) -> Optional[Tuple[int, ...]]:
+    """Parse the release segment of a final release version, or None for anything else.
+
+    Pre-, post- and dev-releases, local versions, and legacy versions are not supported.
+    """
+    parsed = parse_version(version)
+    if (
+        not hasattr(parsed, "release")
+        or parsed.pre is not None
+        or parsed.post is not None
+        or parsed.dev is not None
+        or parsed.local is not None
+    ):
+        return None
+    return tuple(parsed.release)
+
+
+def _bump(release: Tuple[int, ...]) -> Release:
+    """The first release which does not start with the given prefix, e.g. `3.6` -> `3.7`."""
+    return _normalize((*release[:-1], release[-1] + 1))
+
+
+@dataclass(frozen=True)
+class Interval:
+    """A contiguous range of versions. A bound of None is unbounded."""
+
+    lower: Optional[Release]
+    lower_inclusive: bool
+    upper: Optional[Release]
+    upper_inclusive: bool
+
+    @classmethod
+    def closed_open(cls, lower: Release, upper: Release) -> "Interval":
+        return cls(lower, True, upper, False)
+
+    def is_empty(self) -> bool:
+        if self.lower is None or self.upper is None or self.lower < self.upper:
+            return False
+        return not (self.lower == self.upper and self.lower_inclusive and self.upper_inclusive)
+
+    def intersection(self, other: "Interval") -> "Interval":
+        if self.lower is None or (other.lower is not None and other.lower > self.lower):
+            lower, lower_inclusive = other.lower, other.lower_inclusive
+        elif other.lower is None or other.lower < self.lower:
+            lower, lower_inclusive = self.lower, self.lower_inclusive
+        else:
+            lower, lower_inclusive = self.lower, self.lower_inclusive and other.lower_inclusive
+
+        if self.upper is None or (other.upper is not None and other.upper < self.upper):
+            upper, upper_inclusive = other.upper, other.upper_inclusive
+        elif other.upper is None or other.upper > self.upper:
+            upper, upper_inclusive = self.upper, self.upper_inclusive
+        else:
+            upper, upper_inclusive = self.upper, self.upper_inclusive and other.upper_inclusive
+
+        return Interval(lower, lower_inclusive, upper, upper_inclusive)
+
+
+_UNBOUNDED = Interval(None, False, None, False)
+
+
+@dataclass(frozen=True)
+class VersionRange:
+    """A union of disjoint, non-empty intervals of versions."""
+
+    intervals: Tuple[Interval, ...]
+
+    @classmethod
+    def unbounded(cls) -> "VersionRange":
+        return cls((_UNBOUNDED,))
+
+    @classmethod
+    def create(cls, intervals: Iterable[Interval]) -> "VersionRange":
+        return cls(tuple(interval for interval in intervals if not interval.is_empty()))
+
+    @classmethod
+    def for_major_minor(cls, major: int, minor: int) -> "VersionRange":
+        """All releases of the given Python version, e.g. `3.7.*`."""
+        return cls.create([Interval.closed_open(_normalize((major, minor)), _bump((major, minor)))])
+
+    @classmethod
+    def for_specifier(cls, operator: str, version: str) -> "VersionRange":
+        """The versions matched by a single PEP 440 specifier clause, such as `>=3.6`.
+
+        Clauses which cannot be represented as intervals of final releases, such as `===foo` or
+        `<3.8.0rc1`, are treated conservatively as matching every version.
+        """
+        if version.endswith(".*") and operator in ("==", "!="):
+            prefix = _parse_release(version[:-2])
+            if prefix is None:
+                return cls.unbounded()
+            lower, upper = _normalize(prefix), _bump(prefix)
+            if operator == "==":
+                return cls.create([Interval.closed_open(lower, upper)])
+            return cls.create(
+                [Interval(None, False, lower, False), Interval(upper, True, None, False)]
+            )
+
+        release = _parse_release(version)
+        if release is None:
+            return cls.unbounded()
+        normalized = _normalize(release)
+        if operator == "==":
+            return cls.create([Interval(normalized, True, normalized, True)])
+        if operator == "!=":
+            return cls.create(
+                [Interval(None, False, normalized, False), Interval(normalized, False, None, False)]
+            )
+        if operator == ">=":
+            return cls.create([Interval(normalized, True, None, False)])
+        if operator == ">":
+            return cls.create([Interval(normalized, False, None, False)])
+        if operator == "<=":
+            return cls.create([Interval(None, False, normalized, True)])
+        if operator == "<":
+            return cls.create([Interval(None, False, normalized, False)])
+        if operator == "~=" and len(release) >= 2:
+            return cls.create([Interval.closed_open(normalized, _bump(release[:-1]))])
+        return cls.unbounded()
+
+    @classmethod
+    def for_specs(cls, specs: Iterable[Tuple[str, str]]) -> "VersionRange":
+        """The versions matched by all of the given `(operator, version)` clauses."""
+        return _for_specs(frozenset(specs))
+
+    def intersection(self, other: "VersionRange") -> "VersionRange":
+        return VersionRange.create(
+            mine.intersection(theirs) for mine in self.intervals for theirs in other.intervals
+        )
+
+    def is_empty(self) -> bool:
+        return not self.intervals
+
+    def intersects(self, other: "VersionRange") -> bool:
+        return not self.intersection(other).is_empty()
+
+    def includes_major_minor(self, major_minor: str) -> bool:
+        """Whether any release of the given `major.minor` Python version is in the range."""
+        major, minor = (int(component) for component in major_minor.split("."))
+        return self.intersects(VersionRange.for_major_minor(major, minor))
+
+
+@memoized
+def _for_specs(specs: frozenset) -> VersionRange:
+    result = VersionRange.unbounded()
+    for operator, version in sorted(specs):
+        result = result.intersection(VersionRange.for_specifier(operator, version))
+    return result
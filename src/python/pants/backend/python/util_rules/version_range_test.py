@@ -0,0 +1,86 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from typing import List
+
+import pytest
+from pkg_resources import Requirement
+
+from pants.backend.python.util_rules.version_range import VersionRange
+
+
+def version_range(constraint: str) -> VersionRange:
+    return VersionRange.for_specs(Requirement.parse(f"CPython{constraint}").specs)
+
+
+def mismatches(constraint: str, versions: List[str]) -> List[str]:
+    """The versions for which the range disagrees with setuptools."""
+    specifier = Requirement.parse(f"CPython{constraint}").specifier
+    constraint_range = version_range(constraint)
+    return [
+        version
+        for version in versions
+        if specifier.contains(version)  # type: ignore[attr-defined]
+        != constraint_range.intersects(version_range(f"=={version}"))
+    ]
+
+
+@pytest.mark.parametrize(
+    "constraint",
+    [
+        "",
+        "==3.6.5",
+        "==3.6.*",
+        "==3.*",
+        "==3.0",
+        "!=3.6.5",
+        "!=3.6.*",
+        ">=3.6",
+        ">3.6",
+        ">3.6.0",
+        "<=3.6",
+        "<3.6",
+        "<3.6.1",
+        "~=3.6",
+        "~=3.6.2",
+        ">=2.7,<3",
+        ">=2.7,!=3.0.*,!=3.1.*,!=3.2.*,!=3.3.*,<4",
+        ">=3.5,!=3.6.*,<3.8",
+    ],
+)
+def test_matches_setuptools(constraint: str) -> None:
+    versions = [
+        f"{major}.{minor}{patch}"
+        for major in (2, 3, 4)
+        for minor in range(0, 11)
+        for patch in ("", ".0", ".1", ".2", ".5", ".12")
+    ]
+    assert mismatches(constraint, versions) == []
+
+
+def test_emptiness() -> None:
+    assert not version_range("").is_empty()
+    assert not version_range("==3.6.5,>=3.6").is_empty()
+    assert not version_range(">=3.6,<=3.6").is_empty()
+    assert not version_range(">=3.6,<3.6.0.1").is_empty()
+    assert version_range("==2.7.*,==3.6.*").is_empty()
+    assert version_range(">=3.6,<3.6").is_empty()
+    assert version_range(">3.6,<=3.6.0").is_empty()
+    assert version_range("==3.6.5,!=3.6.*").is_empty()
+    assert version_range(">=2.7,<3,>=3.5").is_empty()
+
+
+def test_unsupported_specifiers_are_unbounded() -> None:
+    assert version_range("===3.6.5") == VersionRange.unbounded()
+    assert version_range("<3.8.0rc1") == VersionRange.unbounded()
+    assert not version_range("<3.8.0rc1,>=3.9").is_empty()
+
+
+def test_includes_major_minor() -> None:
+    assert version_range(">=2.7.13,!=2.7.16").includes_major_minor("2.7")
+    assert version_range("==2.7.30").includes_major_minor("2.7")
+    assert not version_range(">=2.7.13,!=2.7.16").includes_major_minor("2.6")
+    assert version_range(">3.6.20").includes_major_minor("3.6")
+    assert not version_range("<3.6").includes_major_minor("3.6")
+    assert not version_range("!=3.7.*").includes_major_minor("3.7")
+    assert version_range("!=3.7.0").includes_major_minor("3.7")
@@ -19,7 +19,7 @@ from pants.init.logging import (
     setup_logging,
 )
 from pants.init.util import clean_global_runtime_state
-from pants.option.options_bootstrapper import OptionsBootstrapper
+from pants.option.options_bootstrapper_cache import OptionsBootstrapperCache
 from pants.pantsd.pants_daemon_core import PantsDaemonCore
 from pants.util.contextutil import argv_as, hermetic_environment_as, stdio_as
 
@@ -37,6 +37,7 @@ class DaemonPantsRunner(RawFdRunner):
         super().__init__()
         self._core = core
         self._run_lock = Lock()
+        self._options_bootstrapper_cache = OptionsBootstrapperCache()
 
     @staticmethod
     def _send_stderr(stderr_fd: int, msg: str) -> None:
@@ -132,7 +133,7 @@ class DaemonPantsRunner(RawFdRunner):
         # propagated down from the caller.
         #   see https://github.com/pantsbuild/pants/issues/7654
         clean_global_runtime_state(reset_subsystem=True)
-        options_bootstrapper = OptionsBootstrapper.create(
+        options_bootstrapper = self._options_bootstrapper_cache.create(
             env=os.environ, args=sys.argv, allow_pantsrc=True
         )
         bootstrap_options = options_bootstrapper.bootstrap_options
@@ -3,8 +3,9 @@
 
 import logging
 import os
+import time
 from dataclasses import dataclass, replace
-from typing import Mapping, Optional, Tuple
+from typing import Mapping, Optional, Set, Tuple
 
 from pants.base.build_environment import get_buildroot
 from pants.base.exception_sink import ExceptionSink
@@ -24,7 +25,7 @@ from pants.help.help_info_extracter import HelpInfoExtracter
 from pants.help.help_printer import HelpPrinter
 from pants.init.engine_initializer import EngineInitializer, GraphScheduler, GraphSession
 from pants.init.options_initializer import BuildConfigInitializer, OptionsInitializer
-from pants.init.specs_calculator import calculate_specs
+from pants.init.specs_calculator import calculate_specs, calculate_specs_for_changed_paths
 from pants.option.arg_splitter import HelpRequest
 from pants.option.errors import UnknownFlagsError
 from pants.option.options import Options
@@ -32,6 +33,7 @@ from pants.option.options_bootstrapper import OptionsBootstrapper
 from pants.option.subsystem import Subsystem
 from pants.reporting.streaming_workunit_handler import StreamingWorkunitHandler
 from pants.util.contextutil import maybe_profiled
+from pants.util.strutil import pluralize
 
 logger = logging.getLogger(__name__)
 
@@ -185,29 +187,76 @@ class LocalPantsRunner:
             return PANTS_SUCCEEDED_EXIT_CODE
         global_options = self.options.for_global_scope()
         if not global_options.get("loop", False):
-            return self._maybe_run_v2_body(goals, poll=False)
+            return self._maybe_run_v2_body(goals, self.specs)
+
+        scheduler_session = self.graph_session.scheduler_session
+        # Forget about any changes which happened before we started looping.
+        scheduler_session.drain_changed_paths()
 
         iterations = global_options.loop_max
+        specs = self.specs
         exit_code = PANTS_SUCCEEDED_EXIT_CODE
         while iterations:
             # NB: We generate a new "run id" per iteration of the loop in order to allow us to
             # observe fresh values for Goals. See notes in `scheduler.rs`.
-            self.graph_session.scheduler_session.new_run_id()
+            scheduler_session.new_run_id()
             try:
-                exit_code = self._maybe_run_v2_body(goals, poll=True)
+                exit_code = self._maybe_run_v2_body(goals, specs)
             except ExecutionError as e:
                 logger.warning(e)
             iterations -= 1
+            if iterations:
+                specs = self._wait_for_affected_specs(global_options.loop_debounce)
 
         return exit_code
 
-    def _maybe_run_v2_body(self, goals, poll: bool) -> ExitCode:
+    def _wait_for_changes(self, debounce: float) -> Tuple[str, ...]:
+        """Blocks until files have changed, and then until no more changes have arrived for
+        `debounce` seconds."""
+        changed_paths: Set[str] = set()
+        while True:
+            time.sleep(debounce)
+            newly_changed_paths = self.graph_session.scheduler_session.drain_changed_paths()
+            if newly_changed_paths:
+                changed_paths.update(newly_changed_paths)
+            elif changed_paths:
+                return tuple(sorted(changed_paths))
+
+    def _wait_for_affected_specs(self, debounce: float) -> Specs:
+        """Blocks until files have changed which affect at least one target of the original specs,
+        and then returns specs for only those targets."""
+        while True:
+            changed_paths = self._wait_for_changes(debounce)
+            try:
+                scoped_specs = calculate_specs_for_changed_paths(
+                    self.specs,
+                    changed_paths,
+                    session=self.graph_session.scheduler_session,
+                    build_root=self.build_root,
+                )
+            except ExecutionError as e:
+                # E.g. a BUILD file is in the middle of being edited: re-run everything, so that
+                # the goals will render the error.
+                logger.debug(f"Failed to compute the targets affected by {changed_paths}: {e}")
+                return self.specs
+
+            if self.specs.provided and not scoped_specs.affected:
+                logger.info(
+                    f"{pluralize(len(changed_paths), 'changed path')} did not affect any "
+                    "targets: waiting for further changes."
+                )
+                continue
+            if scoped_specs.skipped:
+                logger.info(
+                    f"{pluralize(len(changed_paths), 'changed path')} affected "
+                    f"{pluralize(len(scoped_specs.affected), 'target')}: skipping the "
+                    f"{pluralize(len(scoped_specs.skipped), 'unaffected target')}."
+                )
+            return scoped_specs.specs
+
+    def _maybe_run_v2_body(self, goals, specs: Specs) -> ExitCode:
         return self.graph_session.run_goal_rules(
-            union_membership=self.union_membership,
-            goals=goals,
-            specs=self.specs,
-            poll=poll,
-            poll_delay=(0.1 if poll else None),
+            union_membership=self.union_membership, goals=goals, specs=specs
         )
 
     def _finish_run(self, run_tracker: RunTracker, code: ExitCode) -> None:
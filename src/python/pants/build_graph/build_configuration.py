@@ -192,8 +192,12 @@ class BuildConfiguration:
             self._rules.update(rule_index.rules)
             self._rules.update(rule_index.queries)
             self._union_rules.update(rule_index.union_rules)
+            # NB: Only the newly indexed rules can contribute new optionables, so we avoid
+            # rescanning every previously registered rule once per backend.
             self.register_optionables(
-                rule.output_type for rule in self._rules if issubclass(rule.output_type, Optionable)
+                rule.output_type
+                for rule in (*rule_index.rules, *rule_index.queries)
+                if issubclass(rule.output_type, Optionable)
             )
 
         # NB: We expect the parameter to be Iterable[Type[Target]], but we can't be confident in
@@ -4,7 +4,7 @@
 import itertools
 import logging
 from dataclasses import dataclass
-from typing import Iterable, Optional, Tuple, cast
+from typing import Iterable, Optional, Tuple, Union, cast
 
 from pants.base.deprecated import resolve_conflicting_options
 from pants.core.goals.style_request import StyleRequest
@@ -16,14 +16,13 @@ from pants.engine.console import Console
 from pants.engine.engine_aware import EngineAwareReturnType
 from pants.engine.fs import Digest, MergeDigests, Workspace
 from pants.engine.goal import Goal, GoalSubsystem
-from pants.engine.process import FallibleProcessResult
+from pants.engine.process import FallibleProcessResult, ProcessOutput
 from pants.engine.rules import Get, MultiGet, collect_rules, goal_rule
 from pants.engine.target import Targets
 from pants.engine.unions import UnionMembership, union
 from pants.util.logging import LogLevel
 from pants.util.memo import memoized_property
 from pants.util.meta import frozen_after_init
-from pants.util.strutil import strip_v2_chroot_path
 
 logger = logging.getLogger(__name__)
 
@@ -38,13 +37,37 @@ class InvalidLinterReportsError(Exception):
     pass
 
 
-@dataclass(frozen=True)
+@frozen_after_init
+@dataclass(unsafe_hash=True)
 class LintResult:
     exit_code: int
-    stdout: str
-    stderr: str
-    partition_description: Optional[str] = None
-    report: Optional[LintReport] = None
+    # NB: The output is only decoded when it is read, via `stdout` and `stderr`.
+    stdout_output: ProcessOutput
+    stderr_output: ProcessOutput
+    partition_description: Optional[str]
+    report: Optional[LintReport]
+
+    def __init__(
+        self,
+        exit_code: int,
+        stdout: Union[ProcessOutput, str],
+        stderr: Union[ProcessOutput, str],
+        partition_description: Optional[str] = None,
+        report: Optional[LintReport] = None,
+    ) -> None:
+        self.exit_code = exit_code
+        self.stdout_output = ProcessOutput.coerce(stdout)
+        self.stderr_output = ProcessOutput.coerce(stderr)
+        self.partition_description = partition_description
+        self.report = report
+
+    @property
+    def stdout(self) -> str:
+        return self.stdout_output.text
+
+    @property
+    def stderr(self) -> str:
+        return self.stderr_output.text
 
     @classmethod
     def from_fallible_process_result(
@@ -55,13 +78,10 @@ class LintResult:
         strip_chroot_path: bool = False,
         report: Optional[LintReport] = None,
     ) -> "LintResult":
-        def prep_output(s: bytes) -> str:
-            return strip_v2_chroot_path(s) if strip_chroot_path else s.decode()
-
         return cls(
             exit_code=process_result.exit_code,
-            stdout=prep_output(process_result.stdout),
-            stderr=prep_output(process_result.stderr),
+            stdout=process_result.stdout_output(strip_chroot_path=strip_chroot_path),
+            stderr=process_result.stderr_output(strip_chroot_path=strip_chroot_path),
             partition_description=partition_description,
             report=report,
         )
@@ -108,9 +128,9 @@ class LintResults(EngineAwareReturnType):
 
         def msg_for_result(result: LintResult) -> str:
             msg = ""
-            if result.stdout:
+            if result.stdout_output:
                 msg += f"\n{result.stdout}"
-            if result.stderr:
+            if result.stderr_output:
                 msg += f"\n{result.stderr}"
             if msg:
                 msg = f"{msg.rstrip()}\n\n"
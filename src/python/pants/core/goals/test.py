@@ -1,14 +1,18 @@
 # Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import dataclasses
 import itertools
 import logging
+import os
 from abc import ABC, ABCMeta
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import PurePath
 from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, Union, cast
 
+from pants.core.util_rules.coverage_index import CoverageIndex, coverage_index_path
+from pants.core.util_rules.duration_history import DurationHistory, parse_shard, shard_by_address
 from pants.core.util_rules.filter_empty_sources import (
     FieldSetsWithSources,
     FieldSetsWithSourcesRequest,
@@ -21,7 +25,13 @@ from pants.engine.desktop import OpenFiles, OpenFilesRequest
 from pants.engine.engine_aware import EngineAwareReturnType
 from pants.engine.fs import Digest, MergeDigests, Snapshot, Workspace
 from pants.engine.goal import Goal, GoalSubsystem
-from pants.engine.process import FallibleProcessResult, InteractiveProcess, InteractiveRunner
+from pants.engine.process import (
+    FallibleProcessResult,
+    InteractiveProcess,
+    InteractiveRunner,
+    ProcessOutput,
+    ProcessResultMetadata,
+)
 from pants.engine.rules import Get, MultiGet, collect_rules, goal_rule, rule
 from pants.engine.target import (
     FieldSet,
@@ -30,24 +40,60 @@ from pants.engine.target import (
     TargetRootsToFieldSetsRequest,
 )
 from pants.engine.unions import UnionMembership, union
+from pants.option.global_options import GlobalOptions
 from pants.util.frozendict import FrozenDict
 from pants.util.logging import LogLevel
+from pants.util.meta import frozen_after_init
+from pants.util.strutil import pluralize
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass(frozen=True)
+@frozen_after_init
+@dataclass(unsafe_hash=True)
 class TestResult:
     exit_code: Optional[int]
-    stdout: str
-    stderr: str
+    # NB: The output is only decoded when it is read, via `stdout` and `stderr`.
+    stdout_output: ProcessOutput
+    stderr_output: ProcessOutput
     address: Address
     coverage_data: Optional["CoverageData"] = None
     xml_results: Optional[Snapshot] = None
+    # This field doesn't participate in comparison (and therefore hashing), as it doesn't affect
+    # the result.
+    result_metadata: Optional[ProcessResultMetadata] = dataclasses.field(
+        default=None, compare=False
+    )
 
     # Prevent this class from being detected by pytest as a test class.
     __test__ = False
 
+    def __init__(
+        self,
+        exit_code: Optional[int],
+        stdout: Union[ProcessOutput, str],
+        stderr: Union[ProcessOutput, str],
+        address: Address,
+        coverage_data: Optional["CoverageData"] = None,
+        xml_results: Optional[Snapshot] = None,
+        result_metadata: Optional[ProcessResultMetadata] = None,
+    ) -> None:
+        self.exit_code = exit_code
+        self.stdout_output = ProcessOutput.coerce(stdout)
+        self.stderr_output = ProcessOutput.coerce(stderr)
+        self.address = address
+        self.coverage_data = coverage_data
+        self.xml_results = xml_results
+        self.result_metadata = result_metadata
+
+    @property
+    def stdout(self) -> str:
+        return self.stdout_output.text
+
+    @property
+    def stderr(self) -> str:
+        return self.stderr_output.text
+
     @classmethod
     def skip(cls, address: Address) -> "TestResult":
         return cls(exit_code=None, stdout="", stderr="", address=address)
@@ -63,30 +109,63 @@ class TestResult:
     ) -> "TestResult":
         return cls(
             exit_code=process_result.exit_code,
-            stdout=process_result.stdout.decode(),
-            stderr=process_result.stderr.decode(),
+            stdout=process_result.stdout_output(),
+            stderr=process_result.stderr_output(),
             address=address,
             coverage_data=coverage_data,
             xml_results=xml_results,
+            result_metadata=process_result.metadata,
         )
 
 
-@dataclass(frozen=True)
+@frozen_after_init
+@dataclass(unsafe_hash=True)
 class EnrichedTestResult(EngineAwareReturnType):
     exit_code: Optional[int]
-    stdout: str
-    stderr: str
+    stdout_output: ProcessOutput
+    stderr_output: ProcessOutput
     address: Address
     output_setting: "ShowOutput"
     coverage_data: Optional["CoverageData"] = None
     xml_results: Optional[Snapshot] = None
+    result_metadata: Optional[ProcessResultMetadata] = dataclasses.field(
+        default=None, compare=False
+    )
+
+    def __init__(
+        self,
+        exit_code: Optional[int],
+        stdout: Union[ProcessOutput, str],
+        stderr: Union[ProcessOutput, str],
+        address: Address,
+        output_setting: "ShowOutput",
+        coverage_data: Optional["CoverageData"] = None,
+        xml_results: Optional[Snapshot] = None,
+        result_metadata: Optional[ProcessResultMetadata] = None,
+    ) -> None:
+        self.exit_code = exit_code
+        self.stdout_output = ProcessOutput.coerce(stdout)
+        self.stderr_output = ProcessOutput.coerce(stderr)
+        self.address = address
+        self.output_setting = output_setting
+        self.coverage_data = coverage_data
+        self.xml_results = xml_results
+        self.result_metadata = result_metadata
+
+    @property
+    def stdout(self) -> str:
+        return self.stdout_output.text
+
+    @property
+    def stderr(self) -> str:
+        return self.stderr_output.text
 
     @property
     def skipped(self) -> bool:
         return (
             self.exit_code is None
-            and not self.stdout
-            and not self.stderr
+            and not self.stdout_output
+            and not self.stderr_output
             and not self.coverage_data
             and not self.xml_results
         )
@@ -111,9 +190,9 @@ class EnrichedTestResult(EngineAwareReturnType):
         ):
             return message
         output = ""
-        if self.stdout:
+        if self.stdout_output:
             output += f"\n{self.stdout}"
-        if self.stderr:
+        if self.stderr_output:
             output += f"\n{self.stderr}"
         if output:
             output = f"{output.rstrip()}\n\n"
@@ -166,6 +245,16 @@ class CoverageDataCollection(Collection[_CD]):
     element_type: Type[_CD]
 
 
+@dataclass(frozen=True)
+class CoveredFiles:
+    """The files which each test covered, according to its coverage data.
+
+    Each `CoverageDataCollection` implementation should provide a rule to compute this.
+    """
+
+    by_address: FrozenDict[Address, Tuple[str, ...]]
+
+
 class CoverageReport(ABC):
     """Represents a code coverage report that can be materialized to the terminal or disk."""
 
@@ -280,6 +369,74 @@ class TestSubsystem(GoalSubsystem):
             default=ShowOutput.FAILED,
             help="Show stdout/stderr for these tests.",
         )
+        register(
+            "--stream",
+            type=bool,
+            default=False,
+            help=(
+                "Run tests in batches, reporting the results and writing the XML results of each "
+                "batch as soon as it completes, rather than once every test has completed. This "
+                "also avoids holding the output of every test in memory until the end of the run. "
+                "But each batch must complete before the next one starts, so cores sit idle while "
+                "the slowest test of each batch finishes: streaming gives earlier feedback, but "
+                "the run as a whole may take longer than without it. A larger "
+                "`--stream-batch-size` reduces this cost, at the expense of less frequent feedback."
+            ),
+        )
+        register(
+            "--stream-batch-size",
+            type=int,
+            default=None,
+            advanced=True,
+            help=(
+                "The number of tests to run in each batch when streaming results. Defaults to "
+                "`--process-execution-local-parallelism`. See `--stream` for the trade-off."
+            ),
+        )
+        register(
+            "--fail-fast",
+            type=int,
+            default=None,
+            help=(
+                "Stop running further tests once this many (at least 1) tests have failed. Tests "
+                "which are already running will finish, but the rest will be skipped. Implies "
+                "`--stream`, and so shares its trade-off between feedback and total run time."
+            ),
+        )
+        register(
+            "--longest-first",
+            type=bool,
+            default=False,
+            help=(
+                "Start the tests which are expected to take the longest first, based on how long "
+                "they took in previous runs. This avoids a long test which starts last dominating "
+                "the total time taken."
+            ),
+        )
+        register(
+            "--shard",
+            type=str,
+            default="",
+            help=(
+                "A shard specification of the form `k/N`, where `0 <= k < N`. If set, run only "
+                "the `k`th of `N` shards of the tests. Tests are assigned to shards by a hash of "
+                "their address, unless `--duration-history` is set explicitly: then the shards "
+                "are balanced by how long the tests took according to that history, which every "
+                "shard must share, and which sharded runs only read."
+            ),
+        )
+        register(
+            "--duration-history",
+            type=str,
+            default=None,
+            advanced=True,
+            help=(
+                "The path of the file in which to record how long each test took, and from which to "
+                "read those durations for `--longest-first` and `--shard`. Defaults to a file in "
+                "the `--pants-workdir`. When running with `--shard`, this file is not written to, "
+                "so that every shard reads the same history."
+            ),
+        )
         register(
             "--use-coverage",
             type=bool,
@@ -325,6 +482,35 @@ class TestSubsystem(GoalSubsystem):
     def output(self) -> ShowOutput:
         return cast(ShowOutput, self.options.output)
 
+    @property
+    def stream(self) -> bool:
+        return cast(bool, self.options.stream) or self.fail_fast is not None
+
+    @property
+    def stream_batch_size(self) -> Optional[int]:
+        return cast(Optional[int], self.options.stream_batch_size)
+
+    @property
+    def fail_fast(self) -> Optional[int]:
+        fail_fast = cast(Optional[int], self.options.fail_fast)
+        # NB: Otherwise, every test would be skipped, and the run would succeed.
+        if fail_fast is not None and fail_fast < 1:
+            raise ValueError(f"--{self.name}-fail-fast must be at least 1, but was {fail_fast}.")
+        return fail_fast
+
+    @property
+    def longest_first(self) -> bool:
+        return cast(bool, self.options.longest_first)
+
+    @property
+    def shard(self) -> Optional[Tuple[int, int]]:
+        """The index and count of the shard to run, if any."""
+        return parse_shard(self.options.shard) if self.options.shard else None
+
+    @property
+    def duration_history(self) -> Optional[str]:
+        return cast(Optional[str], self.options.duration_history)
+
     @property
     def use_coverage(self) -> bool:
         return cast(bool, self.options.use_coverage)
@@ -352,6 +538,7 @@ async def run_tests(
     interactive_runner: InteractiveRunner,
     workspace: Workspace,
     union_membership: UnionMembership,
+    global_options: GlobalOptions,
 ) -> Test:
     if test_subsystem.debug:
         targets_to_valid_field_sets = await Get(
@@ -385,39 +572,91 @@ async def run_tests(
         FieldSetsWithSources, FieldSetsWithSourcesRequest(targets_to_valid_field_sets.field_sets)
     )
 
-    results = await MultiGet(
-        Get(EnrichedTestResult, TestFieldSet, field_set) for field_set in field_sets_with_sources
+    field_sets = tuple(field_sets_with_sources)
+    duration_history = DurationHistory.load(
+        test_subsystem.duration_history
+        or os.path.join(global_options.options.pants_workdir, test_subsystem.name, "durations.json")
     )
+    # Only an explicitly shared history is the same for every shard, and only if no shard writes
+    # to it: otherwise, the shards might partition the tests differently, and so skip some tests
+    # and run others more than once.
+    record_durations = not (test_subsystem.shard and test_subsystem.duration_history)
+    if test_subsystem.shard:
+        shard_index, shard_count = test_subsystem.shard
+        shard = duration_history.shard if test_subsystem.duration_history else shard_by_address
+        field_sets = tuple(
+            shard(field_sets, lambda fs: fs.address, index=shard_index, count=shard_count)
+        )
+    if test_subsystem.longest_first:
+        field_sets = tuple(duration_history.longest_first(field_sets, lambda fs: fs.address))
+
+    # When streaming, we run the tests in batches so that we can report (and stop early) as they
+    # complete: otherwise, we run them all at once and report at the end.
+    batch_size = len(field_sets) or 1
+    if test_subsystem.stream:
+        batch_size = max(
+            1,
+            test_subsystem.stream_batch_size
+            or global_options.options.process_execution_local_parallelism,
+        )
 
-    # Print summary.
     exit_code = 0
-    if results:
+    failures = 0
+    # Only the coverage data of each result outlives its batch, so that we don't hold the output
+    # of every test in memory.
+    all_coverage_data: List[CoverageData] = []
+    if field_sets:
         console.print_stderr("")
-    for result in sorted(results):
-        if result.skipped:
-            continue
-        if result.exit_code == 0:
-            sigil = console.green("✓")
-            status = "succeeded"
-        else:
-            sigil = console.red("𐄂")
-            status = "failed"
-            exit_code = cast(int, result.exit_code)
-        console.print_stderr(f"{sigil} {result.address} {status}.")
-
-    merged_xml_results = await Get(
-        Digest,
-        MergeDigests(result.xml_results.digest for result in results if result.xml_results),
-    )
-    workspace.write_digest(merged_xml_results)
+    for start in range(0, len(field_sets), batch_size):
+        if test_subsystem.fail_fast is not None and failures >= test_subsystem.fail_fast:
+            console.print_stderr(
+                f"\nSkipped {pluralize(len(field_sets) - start, 'remaining test')} after "
+                f"{pluralize(failures, 'failure')} (`--{test_subsystem.name}-fail-fast`)."
+            )
+            break
+        results = await MultiGet(
+            Get(EnrichedTestResult, TestFieldSet, field_set)
+            for field_set in field_sets[start : start + batch_size]
+        )
+
+        # Print summary.
+        for result in sorted(results):
+            if result.skipped:
+                continue
+            if result.exit_code == 0:
+                sigil = console.green("✓")
+                status = "succeeded"
+            else:
+                sigil = console.red("𐄂")
+                status = "failed"
+                exit_code = cast(int, result.exit_code)
+                failures += 1
+            console.print_stderr(f"{sigil} {result.address} {status}.")
+
+        merged_xml_results = await Get(
+            Digest,
+            MergeDigests(result.xml_results.digest for result in results if result.xml_results),
+        )
+        workspace.write_digest(merged_xml_results)
+        all_coverage_data.extend(
+            result.coverage_data for result in results if result.coverage_data is not None
+        )
+        # NB: Only tests which actually ran (rather than e.g. hitting the cache) have a duration.
+        for result in results:
+            if (
+                record_durations
+                and result.result_metadata
+                and result.result_metadata.total_elapsed_ms is not None
+            ):
+                duration_history.record(
+                    result.address, result.result_metadata.total_elapsed_ms / 1000
+                )
+    duration_history.save()
 
     if test_subsystem.use_coverage:
         # NB: We must pre-sort the data for itertools.groupby() to work properly, using the same
         # key function for both. However, you can't sort by `types`, so we call `str()` on it.
-        all_coverage_data = sorted(
-            (result.coverage_data for result in results if result.coverage_data is not None),
-            key=lambda cov_data: str(type(cov_data)),
-        )
+        all_coverage_data = sorted(all_coverage_data, key=lambda cov_data: str(type(cov_data)))
 
         coverage_types_to_collection_types: Dict[
             Type[CoverageData], Type[CoverageDataCollection]
@@ -435,6 +674,19 @@ async def run_tests(
             for coverage_collection in coverage_collections
         )
 
+        # Record which files each test covered, for use by `--changed-test-impact`.
+        covered_files_collections = await MultiGet(
+            Get(CoveredFiles, CoverageDataCollection, coverage_collection)
+            for coverage_collection in coverage_collections
+        )
+        coverage_index = CoverageIndex.load(
+            coverage_index_path(global_options.options.pants_workdir)
+        )
+        for covered_files in covered_files_collections:
+            for address, files in covered_files.by_address.items():
+                coverage_index.record(address, files)
+        coverage_index.save()
+
         coverage_report_files: List[PurePath] = []
         for coverage_reports in coverage_reports_collections:
             report_files = coverage_reports.materialize(console, workspace)
@@ -468,12 +720,13 @@ def enrich_test_result(
 ) -> EnrichedTestResult:
     return EnrichedTestResult(
         exit_code=test_result.exit_code,
-        stdout=test_result.stdout,
-        stderr=test_result.stderr,
+        stdout=test_result.stdout_output,
+        stderr=test_result.stderr_output,
         address=test_result.address,
         coverage_data=test_result.coverage_data,
         xml_results=test_result.xml_results,
         output_setting=test_subsystem.output,
+        result_metadata=test_result.result_metadata,
     )
 
 
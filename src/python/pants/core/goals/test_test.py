@@ -4,6 +4,7 @@
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
 from functools import partial
+from pathlib import Path
 from textwrap import dedent
 from typing import List, Optional, Tuple, Type
 
@@ -15,6 +16,7 @@ from pants.core.goals.test import (
     CoverageData,
     CoverageDataCollection,
     CoverageReports,
+    CoveredFiles,
     EnrichedTestResult,
     ShowOutput,
     Test,
@@ -23,6 +25,7 @@ from pants.core.goals.test import (
     TestSubsystem,
     run_tests,
 )
+from pants.core.util_rules.coverage_index import CoverageIndex, coverage_index_path
 from pants.core.util_rules.filter_empty_sources import (
     FieldSetsWithSources,
     FieldSetsWithSourcesRequest,
@@ -39,8 +42,10 @@ from pants.engine.target import (
     TargetWithOrigin,
 )
 from pants.engine.unions import UnionMembership
-from pants.testutil.option_util import create_goal_subsystem
+from pants.option.global_options import GlobalOptions
+from pants.testutil.option_util import create_goal_subsystem, create_subsystem
 from pants.testutil.rule_runner import MockConsole, MockGet, RuleRunner, run_rule_with_mocks
+from pants.util.frozendict import FrozenDict
 from pants.util.logging import LogLevel
 
 
@@ -114,6 +119,12 @@ def run_test_rule(
     output: ShowOutput = ShowOutput.ALL,
     include_sources: bool = True,
     valid_targets: bool = True,
+    stream: bool = False,
+    stream_batch_size: Optional[int] = None,
+    fail_fast: Optional[int] = None,
+    longest_first: bool = False,
+    shard: str = "",
+    duration_history: Optional[str] = None,
 ) -> Tuple[int, str]:
     console = MockConsole(use_colors=False)
     test_subsystem = create_goal_subsystem(
@@ -122,6 +133,17 @@ def run_test_rule(
         use_coverage=use_coverage,
         output=output,
         extra_env_vars=[],
+        stream=stream,
+        stream_batch_size=stream_batch_size,
+        fail_fast=fail_fast,
+        longest_first=longest_first,
+        shard=shard,
+        duration_history=duration_history,
+    )
+    global_options = create_subsystem(
+        GlobalOptions,
+        pants_workdir=rule_runner.pants_workdir,
+        process_execution_local_parallelism=2,
     )
     interactive_runner = InteractiveRunner(rule_runner.scheduler)
     workspace = Workspace(rule_runner.scheduler)
@@ -165,6 +187,7 @@ def run_test_rule(
             interactive_runner,
             workspace,
             union_membership,
+            global_options,
         ],
         mock_gets=[
             MockGet(
@@ -198,6 +221,13 @@ def run_test_rule(
                 input_type=CoverageDataCollection,
                 mock=mock_coverage_report_generation,
             ),
+            MockGet(
+                output_type=CoveredFiles,
+                input_type=CoverageDataCollection,
+                mock=lambda collection: CoveredFiles(
+                    FrozenDict({data.address: ("f.py",) for data in collection})
+                ),
+            ),
             MockGet(
                 output_type=OpenFiles,
                 input_type=OpenFilesRequest,
@@ -251,6 +281,94 @@ def test_summary(rule_runner: RuleRunner) -> None:
     )
 
 
+def test_streaming_summary(rule_runner: RuleRunner) -> None:
+    addresses = [Address("", target_name=name) for name in ("a", "bad", "c")]
+    exit_code, stderr = run_test_rule(
+        rule_runner,
+        field_set=ConditionallySucceedsFieldSet,
+        targets=[make_target_with_origin(address) for address in addresses],
+        stream=True,
+    )
+    assert exit_code == ConditionallySucceedsFieldSet.exit_code(addresses[1])
+    # Results are reported per batch (of `--process-execution-local-parallelism` tests), rather
+    # than sorted across all tests.
+    assert stderr == dedent(
+        """\
+
+        ✓ //:a succeeded.
+        𐄂 //:bad failed.
+        ✓ //:c succeeded.
+        """
+    )
+
+
+def test_fail_fast(rule_runner: RuleRunner) -> None:
+    addresses = [Address("", target_name=name) for name in ("bad", "b", "c", "d")]
+    exit_code, stderr = run_test_rule(
+        rule_runner,
+        field_set=ConditionallySucceedsFieldSet,
+        targets=[make_target_with_origin(address) for address in addresses],
+        stream_batch_size=1,
+        fail_fast=1,
+    )
+    assert exit_code == ConditionallySucceedsFieldSet.exit_code(addresses[0])
+    assert stderr == dedent(
+        """\
+
+        𐄂 //:bad failed.
+
+        Skipped 3 remaining tests after 1 failure (`--test-fail-fast`).
+        """
+    )
+
+
+@pytest.mark.parametrize("fail_fast", [0, -1])
+def test_invalid_fail_fast(fail_fast: int) -> None:
+    test_subsystem = create_goal_subsystem(TestSubsystem, fail_fast=fail_fast)
+    with pytest.raises(ValueError, match="fail-fast must be at least 1"):
+        test_subsystem.fail_fast
+
+
+def test_shard(rule_runner: RuleRunner) -> None:
+    # Without an explicit history, tests are assigned to shards by a hash of their address.
+    addresses = [Address("", target_name=name) for name in ("a", "b", "c")]
+    _, stderr = run_test_rule(
+        rule_runner,
+        field_set=SuccessfulFieldSet,
+        targets=[make_target_with_origin(address) for address in addresses],
+        shard="1/2",
+    )
+    assert stderr == dedent(
+        """\
+
+        ✓ //:a succeeded.
+        ✓ //:b succeeded.
+        """
+    )
+
+
+def test_shard_with_duration_history(rule_runner: RuleRunner, tmp_path: Path) -> None:
+    # With an explicit history, the shards are balanced by it, and it is not written to, so that
+    # every shard keeps reading the same history.
+    history_path = tmp_path / "durations.json"
+    history_path.write_text('{"//:a": 10.0, "//:b": 6.0, "//:c": 5.0}')
+    addresses = [Address("", target_name=name) for name in ("a", "b", "c")]
+    _, stderr = run_test_rule(
+        rule_runner,
+        field_set=SuccessfulFieldSet,
+        targets=[make_target_with_origin(address) for address in addresses],
+        shard="0/2",
+        duration_history=str(history_path),
+    )
+    assert stderr == dedent(
+        """\
+
+        ✓ //:a succeeded.
+        """
+    )
+    assert history_path.read_text() == '{"//:a": 10.0, "//:b": 6.0, "//:c": 5.0}'
+
+
 def test_debug_target(rule_runner: RuleRunner) -> None:
     exit_code, _ = run_test_rule(
         rule_runner,
@@ -273,6 +391,11 @@ def test_coverage(rule_runner: RuleRunner) -> None:
     assert exit_code == 0
     assert stderr.strip().endswith(f"Ran coverage on {addr1.spec}, {addr2.spec}")
 
+    coverage_index = CoverageIndex.load(coverage_index_path(rule_runner.pants_workdir))
+    assert coverage_index.covers("f.py")
+    assert coverage_index.select([addr1, addr2], changed_files=["f.py"]) == [addr1, addr2]
+    assert coverage_index.select([addr1, addr2], changed_files=["g.py"]) == []
+
 
 def sort_results() -> None:
     create_test_result = partial(
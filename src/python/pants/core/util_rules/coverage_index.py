@@ -0,0 +1,113 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pants.engine.addresses import Address
+from pants.util.dirutil import safe_file_dump
+
+logger = logging.getLogger(__name__)
+
+
+def coverage_index_path(pants_workdir: str) -> str:
+    """The default location of the coverage index, which is shared by `test` and `--changed-*`."""
+    return os.path.join(pants_workdir, "test", "coverage_index.json")
+
+
+class CoverageIndex:
+    """A local record of which files each test covered, the last time it ran with coverage.
+
+    This allows `--changed-*` to select only the tests which could have been affected by a change,
+    rather than every transitive dependee of the changed files.
+    """
+
+    def __init__(
+        self, path: str, entries: Optional[Dict[str, Tuple[str, Tuple[str, ...]]]] = None
+    ) -> None:
+        self._path = path
+        # The test's address spec -> (the spec of its base target, the files it covered).
+        self._entries: Dict[str, Tuple[str, Tuple[str, ...]]] = dict(entries or {})
+        self._dirty = False
+        self._covering_tests_cache: Optional[Dict[str, Set[str]]] = None
+
+    @classmethod
+    def load(cls, path: str) -> "CoverageIndex":
+        try:
+            with open(path, "r") as f:
+                raw_entries = json.load(f)
+            entries = {
+                spec: (entry["base"], tuple(entry["covered"]))
+                for spec, entry in raw_entries.items()
+            }
+        except FileNotFoundError:
+            entries = {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring the unreadable coverage index at {path}: {e}")
+            entries = {}
+        return cls(path, entries)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        raw_entries = {
+            spec: {"base": base, "covered": list(covered)}
+            for spec, (base, covered) in self._entries.items()
+        }
+        safe_file_dump(self._path, json.dumps(raw_entries, indent=2, sort_keys=True))
+        self._dirty = False
+
+    def record(self, address: Address, covered_files: Iterable[str]) -> None:
+        self._entries[address.spec] = (
+            address.maybe_convert_to_base_target().spec,
+            tuple(sorted(set(covered_files))),
+        )
+        self._dirty = True
+        self._covering_tests_cache = None
+
+    def _covering_tests(self) -> Dict[str, Set[str]]:
+        """The covered file -> the specs of the tests which covered it."""
+        if self._covering_tests_cache is None:
+            self._covering_tests_cache = {}
+            for spec, (_, covered) in self._entries.items():
+                for path in covered:
+                    self._covering_tests_cache.setdefault(path, set()).add(spec)
+        return self._covering_tests_cache
+
+    def covers(self, path: str) -> bool:
+        return path in self._covering_tests()
+
+    def select(
+        self,
+        addresses: Iterable[Address],
+        *,
+        changed_files: Iterable[str],
+        fallback: Iterable[Address] = (),
+    ) -> List[Address]:
+        """Narrow `addresses` (e.g. the dependees of `changed_files`) to the tests whose recorded
+        coverage includes at least one of `changed_files`.
+
+        Addresses which are not indexed tests (e.g. libraries, or tests which have never run with
+        coverage) are kept, as are any in `fallback`: typically the dependees of the changed files
+        which no test has covered, such as new files.
+        """
+        covering_tests = self._covering_tests()
+        impacted: Set[str] = set()
+        for path in changed_files:
+            impacted.update(covering_tests.get(path, ()))
+        impacted_bases = {self._entries[spec][0] for spec in impacted}
+        indexed_bases = {base for base, _ in self._entries.values()}
+        fallback_set = set(fallback)
+
+        def is_selected(address: Address) -> bool:
+            if address in fallback_set:
+                return True
+            if address.spec in self._entries:
+                return address.spec in impacted
+            if address.spec in indexed_bases:
+                return address.spec in impacted_bases
+            return True
+
+        return [address for address in addresses if is_selected(address)]
@@ -0,0 +1,67 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import os
+from pathlib import Path
+
+from pants.core.util_rules.coverage_index import CoverageIndex
+from pants.engine.addresses import Address
+
+
+def test_record_and_load(tmp_path: Path) -> None:
+    path = str(tmp_path / "test" / "coverage_index.json")
+    index = CoverageIndex.load(path)
+    assert not index.covers("src/a.py")
+
+    index.record(Address("tests", target_name="t"), ["src/a.py", "src/b.py", "src/a.py"])
+    index.save()
+
+    loaded = CoverageIndex.load(path)
+    assert loaded.covers("src/a.py")
+    assert loaded.covers("src/b.py")
+    assert not loaded.covers("src/c.py")
+
+
+def test_save_only_when_changed(tmp_path: Path) -> None:
+    path = str(tmp_path / "coverage_index.json")
+    CoverageIndex.load(path).save()
+    assert not os.path.exists(path)
+
+
+def test_unreadable_index(tmp_path: Path) -> None:
+    path = tmp_path / "coverage_index.json"
+    path.write_text('{"tests:t": {"covered": []}}')
+    assert not CoverageIndex.load(str(path)).covers("src/a.py")
+
+
+def test_select(tmp_path: Path) -> None:
+    test_a = Address("tests", target_name="a")
+    test_b = Address("tests", target_name="b")
+    test_c_file = Address("tests", relative_file_path="c_test.py", target_name="c")
+    test_c_base = Address("tests", target_name="c")
+    never_indexed = Address("tests", target_name="new")
+    library = Address("src", target_name="lib")
+
+    index = CoverageIndex(str(tmp_path / "coverage_index.json"))
+    index.record(test_a, ["src/a.py"])
+    index.record(test_b, ["src/b.py"])
+    index.record(test_c_file, ["src/a.py"])
+
+    candidates = [test_a, test_b, test_c_base, never_indexed, library]
+    assert index.select(candidates, changed_files=["src/a.py"]) == [
+        test_a,
+        test_c_base,
+        never_indexed,
+        library,
+    ]
+    assert index.select(candidates, changed_files=["src/b.py"]) == [
+        test_b,
+        never_indexed,
+        library,
+    ]
+    # Addresses in the fallback (e.g. the dependees of uncovered files) are always kept.
+    assert index.select(candidates, changed_files=["src/new.py"], fallback=[test_a]) == [
+        test_a,
+        never_indexed,
+        library,
+    ]
@@ -0,0 +1,134 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import hashlib
+import json
+import logging
+import statistics
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, TypeVar
+
+from pants.engine.addresses import Address
+from pants.util.dirutil import safe_file_dump
+
+logger = logging.getLogger(__name__)
+
+
+_T = TypeVar("_T")
+
+
+class DurationHistory:
+    """A local record of how long the work for each address (e.g. its tests) took to run.
+
+    Durations are smoothed with an exponential moving average, so that one slow or fast run does
+    not dominate the expectation.
+    """
+
+    # The weight of the newest observation in the moving average.
+    SMOOTHING = 0.5
+
+    def __init__(self, path: str, durations: Optional[Dict[str, float]] = None) -> None:
+        self._path = path
+        self._durations: Dict[str, float] = dict(durations or {})
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str) -> "DurationHistory":
+        try:
+            with open(path, "r") as f:
+                durations = json.load(f)
+        except FileNotFoundError:
+            durations = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring the unreadable duration history at {path}: {e}")
+            durations = {}
+        return cls(path, durations)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        safe_file_dump(self._path, json.dumps(self._durations, indent=2, sort_keys=True))
+        self._dirty = False
+
+    def record(self, address: Address, seconds: float) -> None:
+        previous = self._durations.get(address.spec)
+        if previous is not None:
+            seconds = self.SMOOTHING * seconds + (1 - self.SMOOTHING) * previous
+        self._durations[address.spec] = seconds
+        self._dirty = True
+
+    def expected(self, address: Address) -> Optional[float]:
+        return self._durations.get(address.spec)
+
+    def _sorted_by_expectation(
+        self, items: Sequence[_T], address_of: Callable[[_T], Address]
+    ) -> List[Tuple[float, int]]:
+        """The expected duration and index of each item, longest first.
+
+        Unknown durations default to the median of the known ones. Ties are broken by address, so
+        that the order is deterministic.
+        """
+        addresses = [address_of(item) for item in items]
+        known = [self.expected(address) for address in addresses]
+        known_durations = [duration for duration in known if duration is not None]
+        default = statistics.median(known_durations) if known_durations else 1.0
+        expectations = [default if duration is None else duration for duration in known]
+        order = sorted(range(len(items)), key=lambda i: (-expectations[i], addresses[i].spec))
+        return [(expectations[i], i) for i in order]
+
+    def longest_first(self, items: Sequence[_T], address_of: Callable[[_T], Address]) -> List[_T]:
+        """Order the items by decreasing expected duration (i.e. LPT scheduling), so that a long
+        item which starts last does not dominate the wall time."""
+        return [items[i] for _, i in self._sorted_by_expectation(items, address_of)]
+
+    def shard(
+        self,
+        items: Sequence[_T],
+        address_of: Callable[[_T], Address],
+        *,
+        index: int,
+        count: int,
+    ) -> List[_T]:
+        """Return the items of shard `index` (of `count`), balancing the expected duration of each.
+
+        This is deterministic for the same items and history, so that each shard (e.g. each CI
+        machine) may compute its own portion independently, but only if every shard reads the
+        same history: see `shard_by_address` otherwise.
+        """
+        totals = [0.0] * count
+        selected: Set[int] = set()
+        for duration, i in self._sorted_by_expectation(items, address_of):
+            lightest = min(range(count), key=lambda shard: (totals[shard], shard))
+            totals[lightest] += duration
+            if lightest == index:
+                selected.add(i)
+        # Preserve the original relative order of the selected items.
+        return [item for i, item in enumerate(items) if i in selected]
+
+
+def shard_by_address(
+    items: Sequence[_T], address_of: Callable[[_T], Address], *, index: int, count: int
+) -> List[_T]:
+    """Return the items of shard `index` (of `count`), assigned by a hash of their address.
+
+    Unlike `DurationHistory.shard`, this does not depend on any local state, so that shards which
+    don't share a history still run each item exactly once.
+    """
+    return [
+        item
+        for item in items
+        if int(hashlib.sha256(address_of(item).spec.encode()).hexdigest(), 16) % count == index
+    ]
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard specification of the form `k/N`, where `0 <= k < N`."""
+    try:
+        index_str, count_str = value.split("/")
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise ValueError(f"Invalid shard specification {value!r}: expected the form `k/N`.")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(
+            f"Invalid shard specification {value!r}: expected `k/N` with `0 <= k < N`."
+        )
+    return index, count
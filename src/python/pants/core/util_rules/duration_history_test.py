@@ -0,0 +1,87 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import os
+from pathlib import Path
+
+import pytest
+
+from pants.core.util_rules.duration_history import DurationHistory, parse_shard, shard_by_address
+from pants.engine.addresses import Address
+
+
+def addr(name: str) -> Address:
+    return Address("", target_name=name)
+
+
+def make_history(tmp_path: Path, **durations: float) -> DurationHistory:
+    return DurationHistory(
+        str(tmp_path / "durations.json"),
+        {addr(name).spec: duration for name, duration in durations.items()},
+    )
+
+
+def test_record_and_load(tmp_path: Path) -> None:
+    path = str(tmp_path / "test" / "durations.json")
+    history = DurationHistory.load(path)
+    assert history.expected(addr("a")) is None
+
+    history.record(addr("a"), 10.0)
+    history.record(addr("a"), 20.0)
+    history.save()
+
+    loaded = DurationHistory.load(path)
+    assert loaded.expected(addr("a")) == 15.0
+    assert loaded.expected(addr("b")) is None
+
+
+def test_save_only_when_changed(tmp_path: Path) -> None:
+    path = str(tmp_path / "durations.json")
+    DurationHistory.load(path).save()
+    assert not os.path.exists(path)
+
+
+def test_unreadable_history(tmp_path: Path) -> None:
+    path = tmp_path / "durations.json"
+    path.write_text("not json")
+    assert DurationHistory.load(str(path)).expected(addr("a")) is None
+
+
+def test_longest_first(tmp_path: Path) -> None:
+    history = make_history(tmp_path, a=1.0, b=10.0, c=5.0)
+    # `d` has no history, and so is expected to take the median duration: ties are broken by
+    # address.
+    items = [addr(name) for name in ("a", "b", "c", "d")]
+    assert history.longest_first(items, lambda a: a) == [addr("b"), addr("c"), addr("d"), addr("a")]
+
+
+def test_shard(tmp_path: Path) -> None:
+    history = make_history(tmp_path, a=10.0, b=6.0, c=5.0, d=4.0, e=1.0)
+    items = [addr(name) for name in ("a", "b", "c", "d", "e")]
+    shards = [history.shard(items, lambda a: a, index=i, count=2) for i in range(2)]
+    # Each item is in exactly one shard, in its original order, and the expected durations of the
+    # shards are balanced.
+    assert shards == [[addr("a"), addr("d")], [addr("b"), addr("c"), addr("e")]]
+
+    assert history.shard(items, lambda a: a, index=0, count=1) == items
+    assert history.shard([], lambda a: a, index=0, count=3) == []
+
+
+def test_shard_by_address() -> None:
+    items = [addr(name) for name in "abcdefghij"]
+    shards = [shard_by_address(items, lambda a: a, index=i, count=3) for i in range(3)]
+    # Each item is in exactly one shard, in its original order, no matter what any history says.
+    assert sorted(item for shard in shards for item in shard) == items
+    assert all(shard == [item for item in items if item in shard] for shard in shards)
+    assert shard_by_address(items[:5], lambda a: a, index=0, count=3) == [
+        item for item in shards[0] if item in items[:5]
+    ]
+    assert shard_by_address(items, lambda a: a, index=0, count=1) == items
+
+
+def test_parse_shard() -> None:
+    assert parse_shard("0/1") == (0, 1)
+    assert parse_shard("2/3") == (2, 3)
+    for invalid in ("", "1", "a/b", "3/3", "-1/3", "0/0", "1/2/3"):
+        with pytest.raises(ValueError):
+            parse_shard(invalid)
@@ -269,6 +269,9 @@ class Workspace:
     def write_digest(self, digest: Digest, *, path_prefix: Optional[str] = None) -> None:
         """Write a digest to disk, relative to the build root.
 
+        Files which already exist with the same content and permissions are not rewritten, so it is
+        cheap to repeatedly write large outputs (e.g. to the dist dir) which have not changed.
+
         You should not use this in a `for` loop due to slow performance. Instead, call `await
         Get(Digest, MergeDigests)` beforehand.
         """
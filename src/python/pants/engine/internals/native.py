@@ -260,6 +260,7 @@ class Native(metaclass=SingletonMetaclass):
             speculation_strategy=execution_options.process_execution_speculation_strategy,
             use_local_cache=execution_options.process_execution_use_local_cache,
             local_enable_nailgun=execution_options.process_execution_local_enable_nailgun,
+            local_memory_mb=execution_options.process_execution_local_memory_mb or 0,
         )
 
         return cast(
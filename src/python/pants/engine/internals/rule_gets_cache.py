@@ -0,0 +1,115 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
+
+from pants.base.build_environment import get_pants_cachedir
+
+logger = logging.getLogger(__name__)
+
+# The (output type name, input type name) of each `Get` in a rule body, in order.
+GetTypeNames = List[Tuple[str, str]]
+
+
+class RuleGetsCache:
+    """A persistent cache of the `Get`s used by each @rule, as extracted from its source.
+
+    Declaring an @rule requires parsing its source to find the `Get`s in its body, which is
+    relatively expensive when repeated for every rule on every startup. Since the result depends
+    only on the source of the module declaring the rule, we cache it keyed by the hash of that
+    source and the rule's name within it. Only the names of the types are cached: they are
+    resolved against the declaring module after each load.
+    """
+
+    # Bump this to invalidate all existing cache entries if the extraction logic changes.
+    VERSION = 1
+
+    def __init__(self, cache_dir: Optional[str]) -> None:
+        self._cache_dir = cache_dir
+        # Source file path -> (cache file path, entries).
+        self._loaded: Dict[str, Tuple[str, Dict[str, GetTypeNames]]] = {}
+        # Source files with entries which have not yet been written.
+        self._dirty: Set[str] = set()
+        self._registered_atexit = False
+
+    def _entries_for(self, source_file: str) -> Optional[Tuple[str, Dict[str, GetTypeNames]]]:
+        if self._cache_dir is None:
+            return None
+        loaded = self._loaded.get(source_file)
+        if loaded is not None:
+            return loaded
+        try:
+            with open(source_file, "rb") as fp:
+                source_hash = hashlib.sha1(fp.read()).hexdigest()
+        except OSError:
+            return None
+        cache_file = os.path.join(self._cache_dir, f"v{self.VERSION}-{source_hash}.json")
+        entries: Dict[str, GetTypeNames] = {}
+        try:
+            with open(cache_file, "r") as fp:
+                entries = {
+                    key: [(output_type, input_type) for output_type, input_type in names]
+                    for key, names in json.load(fp).items()
+                }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable rule cache {cache_file}: {e!r}")
+        loaded = (cache_file, entries)
+        self._loaded[source_file] = loaded
+        # The rules in a module are declared together while it is imported, so once we move on to
+        # another module, the entries of the previous ones are complete.
+        self.flush()
+        return loaded
+
+    def get(self, source_file: str, key: str) -> Optional[GetTypeNames]:
+        loaded = self._entries_for(source_file)
+        return loaded[1].get(key) if loaded else None
+
+    def put(self, source_file: str, key: str, names: GetTypeNames) -> None:
+        loaded = self._entries_for(source_file)
+        if not loaded:
+            return
+        loaded[1][key] = names
+        self._dirty.add(source_file)
+        if not self._registered_atexit:
+            atexit.register(self.flush)
+            self._registered_atexit = True
+
+    def flush(self) -> None:
+        """Write any new entries to disk."""
+        for source_file in sorted(self._dirty):
+            cache_file, entries = self._loaded[source_file]
+            tmp_file = f"{cache_file}.{uuid.uuid4().hex}.tmp"
+            try:
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                with open(tmp_file, "w") as fp:
+                    json.dump(entries, fp)
+                os.replace(tmp_file, cache_file)
+            except OSError as e:
+                # The cache is purely an optimization, so e.g. a read-only cache dir is not an
+                # error.
+                logger.debug(f"Failed to write rule cache {cache_file}: {e!r}")
+        self._dirty.clear()
+
+
+_rule_gets_cache: Optional[RuleGetsCache] = None
+
+
+def rule_gets_cache() -> RuleGetsCache:
+    """The process-wide cache, which is stored under the Pants cache dir."""
+    global _rule_gets_cache
+    if _rule_gets_cache is None:
+        _rule_gets_cache = RuleGetsCache(os.path.join(get_pants_cachedir(), "rule_gets"))
+    return _rule_gets_cache
+
+
+def set_rule_gets_cache(cache: RuleGetsCache) -> None:
+    global _rule_gets_cache
+    _rule_gets_cache = cache
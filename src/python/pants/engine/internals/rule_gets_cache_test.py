@@ -0,0 +1,131 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import importlib
+import sys
+import time
+from pathlib import Path
+from textwrap import dedent
+from typing import Iterator
+
+import pytest
+
+from pants.engine.internals import rule_gets_cache as rule_gets_cache_module
+from pants.engine.internals.rule_gets_cache import RuleGetsCache, set_rule_gets_cache
+from pants.engine.internals.selectors import GetConstraints
+
+
+@pytest.fixture
+def restore_cache() -> Iterator[None]:
+    original = rule_gets_cache_module._rule_gets_cache
+    try:
+        yield
+    finally:
+        rule_gets_cache_module._rule_gets_cache = original
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    source = tmp_path / "module.py"
+    source.write_text("async def rule(): ...\n")
+    cache_dir = str(tmp_path / "cache")
+
+    cache = RuleGetsCache(cache_dir)
+    assert cache.get(str(source), "rule:1") is None
+    cache.put(str(source), "rule:1", [("A", "B"), ("C", "D")])
+    assert cache.get(str(source), "rule:1") == [("A", "B"), ("C", "D")]
+    cache.flush()
+
+    # A new process sees the persisted entry...
+    assert RuleGetsCache(cache_dir).get(str(source), "rule:1") == [("A", "B"), ("C", "D")]
+    # ...until the source changes.
+    source.write_text("async def rule(): return 42\n")
+    assert RuleGetsCache(cache_dir).get(str(source), "rule:1") is None
+
+    # A disabled cache never hits.
+    disabled = RuleGetsCache(None)
+    disabled.put(str(source), "rule:1", [("A", "B")])
+    assert disabled.get(str(source), "rule:1") is None
+
+
+def _write_rules_module(path: Path, rule_count: int) -> None:
+    rules = "\n\n".join(
+        dedent(
+            f"""\
+            @rule
+            async def rule_{i}(a: A) -> R{i}:
+                b = await Get(B, A, a)
+                c, d = await MultiGet(Get(C, B, b), Get(D, A(42)))
+                return R{i}()
+            """
+        )
+        for i in range(rule_count)
+    )
+    classes = "\n".join(f"class R{i}: pass" for i in range(rule_count))
+    path.write_text(
+        dedent(
+            """\
+            from pants.engine.rules import Get, MultiGet, rule
+
+
+            class A:
+                def __init__(self, *args): ...
+
+
+            class B: pass
+            class C: pass
+            class D: pass
+            """
+        )
+        + classes
+        + "\n\n\n"
+        + rules
+    )
+
+
+def test_import_time_benchmark(tmp_path: Path, restore_cache) -> None:
+    """Compare declaring rules with and without a warm cache.
+
+    Run with `-s` to see the timings.
+    """
+    rule_count = 300
+    module_name = "__rule_gets_cache_benchmark"
+    _write_rules_module(tmp_path / f"{module_name}.py", rule_count)
+    cache_dir = str(tmp_path / "cache")
+
+    def import_rules():
+        sys.modules.pop(module_name, None)
+        start = time.time()
+        module = importlib.import_module(module_name)
+        elapsed = time.time() - start
+        return module, elapsed
+
+    sys.path.insert(0, str(tmp_path))
+    try:
+        # NB: The first import also compiles the module, so we measure the uncached case second.
+        cold_cache = RuleGetsCache(cache_dir)
+        set_rule_gets_cache(cold_cache)
+        cold_module, _ = import_rules()
+        cold_cache.flush()
+        set_rule_gets_cache(RuleGetsCache(None))
+        _, uncached_secs = import_rules()
+        set_rule_gets_cache(RuleGetsCache(cache_dir))
+        warm_module, warm_secs = import_rules()
+    finally:
+        sys.path.remove(str(tmp_path))
+        sys.modules.pop(module_name, None)
+
+    print(
+        f"Declared {rule_count} rules in {uncached_secs:.3f}s without a cache, and in "
+        f"{warm_secs:.3f}s with a warm cache."
+    )
+    for i in range(rule_count):
+        cold_rule = getattr(cold_module, f"rule_{i}").rule
+        warm_rule = getattr(warm_module, f"rule_{i}").rule
+        assert [(g.output_type.__name__, g.input_type.__name__) for g in warm_rule.input_gets] == [
+            ("B", "A"),
+            ("C", "B"),
+            ("D", "A"),
+        ]
+        assert len(cold_rule.input_gets) == len(warm_rule.input_gets)
+        # Types are resolved against the newly imported module, rather than being cached.
+        assert GetConstraints(warm_module.B, warm_module.A) in warm_rule.input_gets
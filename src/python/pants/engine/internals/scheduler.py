@@ -274,6 +274,9 @@ class Scheduler:
     def invalidate_all_files(self):
         return self._native.lib.graph_invalidate_all_paths(self._scheduler)
 
+    def drain_changed_paths(self) -> Tuple[str, ...]:
+        return tuple(self._native.lib.graph_drain_changed_paths(self._scheduler))
+
     def check_invalidation_watcher_liveness(self):
         self._native.lib.check_invalidation_watcher_liveness(self._scheduler)
 
@@ -474,6 +477,14 @@ class SchedulerSession:
         self._maybe_visualize()
         return invalidated
 
+    def drain_changed_paths(self) -> Tuple[str, ...]:
+        """Returns the paths which have invalidated the Graph since the previous call.
+
+        This is shared by all sessions of the Scheduler, so should only be consumed by one
+        session at a time (e.g. the one running `--loop`).
+        """
+        return self._scheduler.drain_changed_paths()
+
     def node_count(self):
         return self._scheduler.graph_len()
 
@@ -543,14 +554,10 @@ class SchedulerSession:
         self,
         product: Type,
         subject: Union[Any, Params],
-        poll: bool = False,
-        poll_delay: Optional[float] = None,
     ) -> int:
         """
         :param product: A Goal subtype.
         :param subject: subject for the request.
-        :param poll: See self.execution_request.
-        :param poll_delay: See self.execution_request.
         :returns: An exit_code for the given Goal.
         """
         if self._scheduler.visualize_to_dir is not None:
@@ -562,7 +569,7 @@ class SchedulerSession:
                 product,
             )
 
-        request = self.execution_request([product], [subject], poll=poll, poll_delay=poll_delay)
+        request = self.execution_request([product], [subject])
         returns, throws = self.execute(request)
 
         if throws:
@@ -654,7 +661,7 @@ class SchedulerSession:
         return result
 
     def write_digest(self, digest: Digest, *, path_prefix: Optional[str] = None) -> None:
-        """Write a digest to disk, relative to the build root."""
+        """Write a digest to disk, relative to the build root, skipping unchanged files."""
         if path_prefix and PurePath(path_prefix).is_absolute():
             raise ValueError(
                 f"The `path_prefix` {path_prefix} must be a relative path, as the engine writes "
@@ -1,18 +1,19 @@
 # Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import codecs
 import dataclasses
 import hashlib
 import logging
 from dataclasses import dataclass
 from enum import Enum
 from textwrap import dedent
-from typing import TYPE_CHECKING, Dict, Iterable, Mapping, Optional, Tuple, Union, cast
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union, cast
 from uuid import UUID
 
 from pants.base.exception_sink import ExceptionSink
 from pants.engine.engine_aware import EngineAwareReturnType
-from pants.engine.fs import EMPTY_DIGEST, CreateDigest, Digest, FileContent
+from pants.engine.fs import EMPTY_DIGEST, CreateDigest, Digest, FileContent, FileDigest
 from pants.engine.internals.selectors import MultiGet
 from pants.engine.internals.uuid import UUIDRequest, UUIDScope
 from pants.engine.platform import Platform, PlatformConstraint
@@ -21,7 +22,7 @@ from pants.util.frozendict import FrozenDict
 from pants.util.logging import LogLevel
 from pants.util.meta import frozen_after_init
 from pants.util.ordered_set import OrderedSet
-from pants.util.strutil import create_path_env_var, pluralize
+from pants.util.strutil import create_path_env_var, pluralize, strip_v2_chroot_path
 
 if TYPE_CHECKING:
     from pants.engine.internals.scheduler import SchedulerSession
@@ -55,6 +56,9 @@ class Process:
     is_nailgunnable: bool
     execution_slot_variable: Optional[str]
     cache_failures: bool
+    # These are scheduling hints which don't affect the result.
+    cpu_weight: int = dataclasses.field(compare=False)
+    memory_mb: int = dataclasses.field(compare=False)
 
     def __init__(
         self,
@@ -73,6 +77,8 @@ class Process:
         is_nailgunnable: bool = False,
         execution_slot_variable: Optional[str] = None,
         cache_failures: bool = False,
+        cpu_weight: int = 1,
+        memory_mb: Optional[int] = None,
     ) -> None:
         """Request to run a subprocess, similar to subprocess.Popen.
 
@@ -96,6 +102,11 @@ class Process:
 
             result = await Get(ProcessResult, Process(["/bin/echo", "hello world"], description="demo"))
             assert result.stdout == b"hello world"
+
+        When running locally, processes are admitted based on the number of CPUs (`cpu_weight`) and
+        the peak memory in MiB (`memory_mb`) they are expected to use, relative to
+        `--process-execution-local-parallelism` and `--process-execution-local-memory-mb`. These
+        are hints for scheduling only, and are not enforced.
         """
         self.argv = tuple(argv)
         self.description = description
@@ -112,6 +123,11 @@ class Process:
         self.is_nailgunnable = is_nailgunnable
         self.execution_slot_variable = execution_slot_variable
         self.cache_failures = cache_failures
+        if cpu_weight < 1:
+            raise ValueError(f"The `cpu_weight` of a Process must be at least 1, got {cpu_weight}.")
+        self.cpu_weight = cpu_weight
+        # NB: An unknown memory requirement is normalized to 0 to ease the transfer to Rust.
+        self.memory_mb = memory_mb if memory_mb and memory_mb > 0 else 0
 
 
 @frozen_after_init
@@ -163,6 +179,85 @@ class ProcessResult:
     output_digest: Digest
 
 
+class ProcessOutput:
+    """A handle to the stdout or stderr of a process, which is only decoded when it is read.
+
+    The handle shares the bytes of the process result rather than copying them, and is compared by
+    the digest of those bytes when it is known, so that results which hold large outputs are cheap
+    to hash and compare. The decoded text is never retained: use `iter_lines()` rather than `text`
+    to avoid holding a decoded copy of a large output in memory at all.
+    """
+
+    def __init__(
+        self,
+        content: Union[bytes, str] = b"",
+        digest: Optional[FileDigest] = None,
+        *,
+        strip_chroot_path: bool = False,
+    ) -> None:
+        self._content = content.encode() if isinstance(content, str) else content
+        self._digest = digest
+        self._strip_chroot_path = strip_chroot_path
+
+    @classmethod
+    def coerce(cls, output: Union["ProcessOutput", bytes, str]) -> "ProcessOutput":
+        return output if isinstance(output, ProcessOutput) else cls(output)
+
+    @property
+    def digest(self) -> Optional[FileDigest]:
+        return self._digest
+
+    @property
+    def text(self) -> str:
+        text = self._content.decode()
+        return strip_v2_chroot_path(text) if self._strip_chroot_path else text
+
+    def iter_lines(self) -> Iterator[str]:
+        """Decode the output one line (including its line ending) at a time."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        start = 0
+        while start < len(self._content):
+            end = self._content.find(b"\n", start)
+            end = len(self._content) if end == -1 else end + 1
+            line = decoder.decode(self._content[start:end], final=end == len(self._content))
+            yield strip_v2_chroot_path(line) if self._strip_chroot_path else line
+            start = end
+
+    def __len__(self) -> int:
+        return len(self._content)
+
+    def __bool__(self) -> bool:
+        return bool(self._content)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ProcessOutput):
+            return NotImplemented
+        if self._strip_chroot_path != other._strip_chroot_path:
+            return False
+        if self._digest is not None and other._digest is not None:
+            return self._digest == other._digest
+        return self._content == other._content
+
+    def __hash__(self) -> int:
+        # NB: Equal outputs always have equal lengths, and the length avoids hashing the content.
+        return hash((len(self._content), self._strip_chroot_path))
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"ProcessOutput({pluralize(len(self._content), 'byte')}, digest={self._digest})"
+
+
+@dataclass(frozen=True)
+class ProcessResultMetadata:
+    """Information about how a process was run, which does not affect its result."""
+
+    # The time taken to run the process, or None if it did not actually run (e.g. because it was a
+    # cache hit).
+    total_elapsed_ms: Optional[int] = None
+
+
 @dataclass(frozen=True)
 class FallibleProcessResult:
     """Result of executing a process which might fail.
@@ -174,6 +269,21 @@ class FallibleProcessResult:
     stderr: bytes
     exit_code: int
     output_digest: Digest
+    # This field doesn't participate in comparison (and therefore hashing), as it doesn't affect
+    # the result.
+    metadata: ProcessResultMetadata = dataclasses.field(
+        default=ProcessResultMetadata(), compare=False
+    )
+    # The digests of `stdout` and `stderr` in the store, if known. Like `metadata`, these don't
+    # participate in comparison, as they are redundant with the content.
+    stdout_digest: Optional[FileDigest] = dataclasses.field(default=None, compare=False)
+    stderr_digest: Optional[FileDigest] = dataclasses.field(default=None, compare=False)
+
+    def stdout_output(self, *, strip_chroot_path: bool = False) -> ProcessOutput:
+        return ProcessOutput(self.stdout, self.stdout_digest, strip_chroot_path=strip_chroot_path)
+
+    def stderr_output(self, *, strip_chroot_path: bool = False) -> ProcessOutput:
+        return ProcessOutput(self.stderr, self.stderr_digest, strip_chroot_path=strip_chroot_path)
 
 
 @dataclass(frozen=True)
@@ -185,6 +295,9 @@ class FallibleProcessResultWithPlatform:
     exit_code: int
     output_digest: Digest
     platform: Platform
+    total_elapsed_ms: Optional[int] = dataclasses.field(default=None, compare=False)
+    stdout_digest: Optional[FileDigest] = dataclasses.field(default=None, compare=False)
+    stderr_digest: Optional[FileDigest] = dataclasses.field(default=None, compare=False)
 
 
 class ProcessExecutionFailure(Exception):
@@ -253,6 +366,9 @@ def remove_platform_information(res: FallibleProcessResultWithPlatform) -> Falli
         stdout=res.stdout,
         stderr=res.stderr,
         output_digest=res.output_digest,
+        metadata=ProcessResultMetadata(total_elapsed_ms=res.total_elapsed_ms),
+        stdout_digest=res.stdout_digest,
+        stderr_digest=res.stderr_digest,
     )
 
 
@@ -13,6 +13,7 @@ from pants.engine.fs import (
     Digest,
     DigestContents,
     FileContent,
+    FileDigest,
     PathGlobs,
     Snapshot,
 )
@@ -24,6 +25,7 @@ from pants.engine.process import (
     InteractiveProcess,
     Process,
     ProcessExecutionFailure,
+    ProcessOutput,
     ProcessResult,
 )
 from pants.engine.rules import Get, rule
@@ -464,6 +466,38 @@ def test_running_interactive_process_in_workspace_cannot_have_input_files() -> N
         InteractiveProcess(argv=["/bin/echo"], input_digest=mock_digest, run_in_workspace=True)
 
 
+def test_resource_hints() -> None:
+    process = Process(["/bin/echo"], description="echo")
+    assert process.cpu_weight == 1
+    assert process.memory_mb == 0
+
+    # Hints don't affect the identity of the process.
+    hinted = Process(["/bin/echo"], description="echo", cpu_weight=4, memory_mb=2048)
+    assert (hinted.cpu_weight, hinted.memory_mb) == (4, 2048)
+    assert hinted == process
+
+    with pytest.raises(ValueError):
+        Process(["/bin/echo"], description="echo", cpu_weight=0)
+
+
+def test_process_output() -> None:
+    chroot = "/tmp/process-executionAbC123/"
+    content = f"{chroot}src/a.py: ok\nstrasse: stra\u00dfe\n{chroot}src/b.py".encode()
+    output = ProcessOutput(content, strip_chroot_path=True)
+    assert len(output) == len(content)
+    assert output.text == "src/a.py: ok\nstrasse: stra\u00dfe\nsrc/b.py"
+    assert list(output.iter_lines()) == ["src/a.py: ok\n", "strasse: stra\u00dfe\n", "src/b.py"]
+    assert not ProcessOutput()
+    assert ProcessOutput.coerce("a") == ProcessOutput(b"a")
+
+    # Outputs with known digests are compared by them, rather than by their content.
+    digest = FileDigest("a" * 64, 1)
+    assert ProcessOutput(b"a", digest) == ProcessOutput(b"a", digest)
+    assert ProcessOutput(b"a", digest) != ProcessOutput(b"b", FileDigest("b" * 64, 1))
+    assert ProcessOutput(b"a") != ProcessOutput(b"a", strip_chroot_path=True)
+    assert hash(ProcessOutput(b"a", digest)) == hash(ProcessOutput(b"a"))
+
+
 def test_find_binary_non_existent(rule_runner: RuleRunner) -> None:
     with temporary_dir() as tmpdir:
         search_path = [tmpdir]
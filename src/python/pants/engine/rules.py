@@ -24,6 +24,7 @@ from typing import (
 )
 
 from pants.engine.goal import Goal
+from pants.engine.internals.rule_gets_cache import rule_gets_cache
 from pants.engine.internals.selectors import Get as Get  # noqa: F401
 from pants.engine.internals.selectors import GetConstraints
 from pants.engine.internals.selectors import MultiGet as MultiGet  # noqa: F401
@@ -51,6 +52,7 @@ class _RuleVisitor(ast.NodeVisitor):
         self.source_file_name = source_file_name
         self.resolve_type = resolve_type
         self.gets: List[GetConstraints] = []
+        self.get_type_names: List[Tuple[str, str]] = []
 
     @staticmethod
     def maybe_extract_get_args(call_node: ast.Call) -> Optional[List[ast.expr]]:
@@ -69,6 +71,7 @@ class _RuleVisitor(ast.NodeVisitor):
             )
             get = GetConstraints(self.resolve_type(product_str), self.resolve_type(subject_str))
             self.gets.append(get)
+            self.get_type_names.append((product_str, subject_str))
         # Ensure we descend into e.g. MultiGet(Get(...)...) calls.
         self.generic_visit(call_node)
 
@@ -135,12 +138,7 @@ def _make_rule(
             raise ValueError("The @rule decorator must be applied innermost of all decorators.")
 
         owning_module = sys.modules[func.__module__]
-        source = inspect.getsource(func) or "<string>"
         source_file = inspect.getsourcefile(func)
-        beginning_indent = _get_starting_indent(source)
-        if beginning_indent:
-            source = "\n".join(line[beginning_indent:] for line in source.split("\n"))
-        module_ast = ast.parse(source)
 
         def resolve_type(name):
             resolved = getattr(owning_module, name, None) or owning_module.__builtins__.get(
@@ -158,22 +156,37 @@ def _make_rule(
                 )
             return resolved
 
-        rule_func_node = assert_single_element(
-            node
-            for node in ast.iter_child_nodes(module_ast)
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
-            and node.name == func.__name__
+        # Extracting the `Get`s requires parsing the rule's source, so we cache the result
+        # persistently, keyed by the content of the source file.
+        cache_key = f"{func.__qualname__}:{func.__code__.co_firstlineno}"
+        cached_get_type_names = (
+            rule_gets_cache().get(source_file, cache_key) if source_file else None
         )
+        if cached_get_type_names is not None:
+            gets = FrozenOrderedSet(
+                GetConstraints(resolve_type(product_str), resolve_type(subject_str))
+                for product_str, subject_str in cached_get_type_names
+            )
+        else:
+            source = inspect.getsource(func) or "<string>"
+            beginning_indent = _get_starting_indent(source)
+            if beginning_indent:
+                source = "\n".join(line[beginning_indent:] for line in source.split("\n"))
+            module_ast = ast.parse(source)
+
+            rule_func_node = assert_single_element(
+                node
+                for node in ast.iter_child_nodes(module_ast)
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+                and node.name == func.__name__
+            )
 
-        parents_table = {}
-        for parent in ast.walk(rule_func_node):
-            for child in ast.iter_child_nodes(parent):
-                parents_table[child] = parent
-
-        rule_visitor = _RuleVisitor(source_file_name=source_file, resolve_type=resolve_type)
-        rule_visitor.visit(rule_func_node)
+            rule_visitor = _RuleVisitor(source_file_name=source_file, resolve_type=resolve_type)
+            rule_visitor.visit(rule_func_node)
 
-        gets = FrozenOrderedSet(rule_visitor.gets)
+            gets = FrozenOrderedSet(rule_visitor.gets)
+            if source_file:
+                rule_gets_cache().put(source_file, cache_key, rule_visitor.get_type_names)
 
         # Set our own custom `__line_number__` dunder so that the engine may visualize the line number.
         func.__line_number__ = func.__code__.co_firstlineno
@@ -12,7 +12,7 @@ import time
 import uuid
 from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 import requests
 
@@ -22,6 +22,13 @@ from pants.base.run_info import RunInfo
 from pants.base.worker_pool import SubprocPool
 from pants.base.workunit import WorkUnit, WorkUnitLabel
 from pants.goal.aggregated_timings import AggregatedTimings
+from pants.goal.stats_uploader import (
+    StatsSpool,
+    StatsUploader,
+    daemon_uploader_active,
+    spawn_uploader_process,
+    stats_spool_dir,
+)
 from pants.option.config import Config
 from pants.option.options import Options
 from pants.option.options_fingerprinter import CoercingOptionEncoder
@@ -98,6 +105,24 @@ class RunTracker(Subsystem):
             default=2,
             help="Wait at most this many seconds for the stats upload to complete.",
         )
+        register(
+            "--stats-upload-async",
+            advanced=True,
+            type=bool,
+            default=False,
+            help="Rather than uploading stats before the run exits, spool them to disk and upload "
+            "them in the background: from pantsd when it is running, or else from a detached "
+            "process. Uploads to the same URL are batched (with `--stats-version=2`), and failed "
+            "uploads are retried with exponential backoff.",
+        )
+        register(
+            "--stats-upload-max-attempts",
+            advanced=True,
+            type=int,
+            default=5,
+            help="With `--stats-upload-async`, give up on uploading a run's stats after this many "
+            "failed attempts.",
+        )
         register(
             "--stats-version",
             advanced=True,
@@ -386,6 +411,38 @@ class RunTracker(Subsystem):
     ):
         """POST stats to the given url.
 
+        :return: True if upload was successful, False otherwise.
+        """
+        if stats_version not in cls.SUPPORTED_STATS_VERSIONS:
+            raise ValueError("Invalid stats version")
+
+        auth_data = BasicAuth.global_instance().get_auth_for_provider(auth_provider)
+        return cls.post_stats_batch(
+            stats_url,
+            [stats],
+            timeout=timeout,
+            auth_provider=auth_provider,
+            stats_version=stats_version,
+            headers=auth_data.headers,
+            request_args=auth_data.request_args,
+        )
+
+    @classmethod
+    def post_stats_batch(
+        cls,
+        stats_url: str,
+        stats_batch: Sequence[Dict[str, Any]],
+        *,
+        timeout: int = 2,
+        auth_provider: Optional[str] = None,
+        stats_version: int = 1,
+        headers: Optional[Dict[str, str]] = None,
+        request_args: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """POST the stats of one or more runs to the given url in a single request.
+
+        Only stats version 2 supports uploading more than one run at a time.
+
         :return: True if upload was successful, False otherwise.
         """
 
@@ -396,19 +453,20 @@ class RunTracker(Subsystem):
 
         if stats_version not in cls.SUPPORTED_STATS_VERSIONS:
             raise ValueError("Invalid stats version")
+        if stats_version != 2 and len(stats_batch) != 1:
+            raise ValueError(f"Stats version {stats_version} can only upload one run at a time.")
 
-        auth_data = BasicAuth.global_instance().get_auth_for_provider(auth_provider)
-        headers = cls._get_headers(stats_version=stats_version)
-        headers.update(auth_data.headers)
+        all_headers = cls._get_headers(stats_version=stats_version)
+        all_headers.update(headers or {})
 
         if stats_version == 2:
-            params = cls._json_dump_options({"builds": [stats]})
-            headers["Content-Type"] = "application/json"
+            params = cls._json_dump_options({"builds": list(stats_batch)})
+            all_headers["Content-Type"] = "application/json"
         else:
             # TODO(benjy): The upload protocol currently requires separate top-level params, with JSON
             # values.  Probably better for there to be one top-level JSON value, namely json.dumps(stats).
             # But this will first require changing the upload receiver at every shop that uses this.
-            params = {k: cls._json_dump_options(v) for (k, v) in stats.items()}  # type: ignore[assignment]
+            params = {k: cls._json_dump_options(v) for (k, v) in stats_batch[0].items()}  # type: ignore[assignment]
 
         # We can't simply let requests handle redirects, as we only allow them for specific codes:
         # 307 and 308 indicate that the redirected request must use the same method, POST in this case.
@@ -423,9 +481,9 @@ class RunTracker(Subsystem):
                 url,
                 data=params,
                 timeout=timeout,
-                headers=headers,
+                headers=all_headers,
                 allow_redirects=False,
-                **auth_data.request_args,
+                **(request_args or {}),
             )
             if res.status_code in {307, 308}:
                 return do_post(res.headers["location"], num_redirects_allowed - 1)
@@ -500,6 +558,9 @@ class RunTracker(Subsystem):
         # Upload to remote stats db.
         stats_upload_urls = copy.copy(self.options.stats_upload_urls)
         timeout = self.options.stats_upload_timeout
+        if stats_upload_urls and self.options.stats_upload_async:
+            self._spool_stats(stats, stats_upload_urls, timeout)
+            return
         for stats_url, auth_provider in stats_upload_urls.items():
             self.post_stats(
                 stats_url,
@@ -509,6 +570,46 @@ class RunTracker(Subsystem):
                 stats_version=self._stats_version,
             )
 
+    def _spool_stats(
+        self, stats: Dict[str, Any], stats_upload_urls: Dict[str, Optional[str]], timeout: int
+    ) -> None:
+        """Queue stats for upload by a background uploader, rather than uploading them now."""
+        spool_dir = stats_spool_dir(self.options.pants_workdir)
+        spool = StatsSpool(spool_dir)
+        max_attempts = self.options.stats_upload_max_attempts
+        for stats_url, auth_provider in stats_upload_urls.items():
+            # NB: Auth is resolved now, as the subsystem may not be available to the uploader.
+            # We only need the cookies relevant to this URL.
+            auth_data = BasicAuth.global_instance().get_auth_for_provider(auth_provider)
+            headers = dict(auth_data.headers)
+            cookies = auth_data.request_args.get("cookies")
+            if cookies is not None:
+                prepared = requests.Request("POST", stats_url, cookies=cookies).prepare()
+                cookie_header = prepared.headers.get("Cookie")
+                if cookie_header:
+                    headers["Cookie"] = cookie_header
+            try:
+                spool.enqueue(
+                    url=stats_url,
+                    stats=stats,
+                    stats_version=self._stats_version,
+                    timeout=timeout,
+                    max_attempts=max_attempts,
+                    auth_provider=auth_provider,
+                    headers=headers,
+                    encoder=self._json_dump_options,
+                )
+            except Exception as e:  # Broad catch - we don't want to fail in stats related failure.
+                print(
+                    f"WARNING: Failed to spool stats for {stats_url} due to Error: {e!r}",
+                    file=sys.stderr,
+                )
+                return
+        if not daemon_uploader_active():
+            # Stick around for the full backoff schedule of the entries we just spooled.
+            max_wait_secs = sum(StatsUploader.backoff_secs(i) for i in range(max_attempts))
+            spawn_uploader_process(spool_dir, max_wait_secs=max_wait_secs)
+
     _log_levels = [Report.ERROR, Report.ERROR, Report.WARN, Report.INFO, Report.INFO]
 
     def has_ended(self) -> bool:
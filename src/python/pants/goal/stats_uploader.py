@@ -0,0 +1,309 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Background upload of run stats.
+
+Rather than POSTing stats synchronously at the end of every run, the RunTracker may spool them to
+an on-disk queue. The queue is drained by a `StatsUploader`, which batches entries per endpoint and
+retries failed uploads with exponential backoff. When pantsd is running, its
+`StatsUploadService` drains the queue; otherwise, the run spawns a short-lived detached uploader
+process so that a slow stats endpoint never adds to the wall time of the run itself.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pants.util.dirutil import safe_delete, safe_mkdir, safe_mkdir_for
+
+logger = logging.getLogger(__name__)
+
+
+def stats_spool_dir(pants_workdir: str) -> str:
+    """The location of the stats upload queue for the given workdir."""
+    return os.path.join(pants_workdir, "run-tracker", "stats_spool")
+
+
+@dataclass(frozen=True)
+class SpooledStats:
+    """A single run's stats, waiting to be uploaded to a single URL."""
+
+    path: str
+    url: str
+    auth_provider: Optional[str]
+    stats_version: int
+    headers: Dict[str, str]
+    timeout: int
+    max_attempts: int
+    attempts: int
+    next_attempt_time: float
+    stats: Dict[str, Any]
+
+    @property
+    def batch_key(self) -> Tuple[str, str, int, Tuple[Tuple[str, str], ...]]:
+        """Entries with equal keys may be uploaded together in a single request."""
+        headers = tuple(sorted(self.headers.items()))
+        return self.url, self.auth_provider or "", self.stats_version, headers
+
+
+class StatsSpool:
+    """An on-disk queue of stats waiting to be uploaded.
+
+    Each entry is one JSON file, written atomically, so that entries survive the process that
+    created them and can be drained by another process (e.g. pantsd).
+    """
+
+    _SUFFIX = ".json"
+
+    def __init__(self, spool_dir: str) -> None:
+        self._spool_dir = spool_dir
+
+    @property
+    def spool_dir(self) -> str:
+        return self._spool_dir
+
+    def enqueue(
+        self,
+        *,
+        url: str,
+        stats: Dict[str, Any],
+        stats_version: int,
+        timeout: int,
+        max_attempts: int,
+        auth_provider: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        encoder: Optional[Callable[[Dict[str, Any]], str]] = None,
+    ) -> str:
+        """Add the stats for one URL to the queue, and return the path of the new entry."""
+        entry = {
+            "url": url,
+            "auth_provider": auth_provider,
+            "stats_version": stats_version,
+            "headers": headers or {},
+            "timeout": timeout,
+            "max_attempts": max_attempts,
+            "attempts": 0,
+            "next_attempt_time": 0.0,
+            # NB: Stats may contain option values that plain `json` can't encode, so we allow the
+            # caller to pre-encode them.
+            "stats": json.loads(encoder(stats)) if encoder else stats,
+        }
+        # Names sort by creation time, so the queue is drained roughly in FIFO order.
+        name = f"{int(time.time() * 1000000):020d}-{uuid.uuid4().hex}{self._SUFFIX}"
+        path = os.path.join(self._spool_dir, name)
+        self._write(path, entry)
+        return path
+
+    def entries(self) -> Iterator[SpooledStats]:
+        """All entries in the queue in FIFO order, skipping any that can't be read."""
+        try:
+            names = sorted(n for n in os.listdir(self._spool_dir) if n.endswith(self._SUFFIX))
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self._spool_dir, name)
+            try:
+                with open(path, "r") as fp:
+                    data = json.load(fp)
+                yield SpooledStats(path=path, **data)
+            except FileNotFoundError:
+                # Uploaded by a concurrent drainer.
+                continue
+            except (ValueError, TypeError) as e:
+                logger.debug(f"Discarding corrupt spooled stats {path}: {e!r}")
+                safe_delete(path)
+
+    def remove(self, entry: SpooledStats) -> None:
+        safe_delete(entry.path)
+
+    def reschedule(self, entry: SpooledStats, next_attempt_time: float) -> None:
+        self._write(
+            entry.path,
+            {
+                "url": entry.url,
+                "auth_provider": entry.auth_provider,
+                "stats_version": entry.stats_version,
+                "headers": entry.headers,
+                "timeout": entry.timeout,
+                "max_attempts": entry.max_attempts,
+                "attempts": entry.attempts + 1,
+                "next_attempt_time": next_attempt_time,
+                "stats": entry.stats,
+            },
+        )
+
+    def try_lock(self) -> Optional[int]:
+        """Take the exclusive drain lock without blocking, returning its fd if successful."""
+        safe_mkdir(self._spool_dir)
+        fd = os.open(os.path.join(self._spool_dir, ".lock"), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    @staticmethod
+    def unlock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    @staticmethod
+    def _write(path: str, entry: Dict[str, Any]) -> None:
+        # NB: Entries may contain auth headers (e.g. cookies), so only their owner may read them.
+        safe_mkdir_for(path)
+        tmp_path = f"{path}.tmp.{uuid.uuid4().hex}"
+        fd = os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        with os.fdopen(fd, "w") as fp:
+            json.dump(entry, fp)
+        os.replace(tmp_path, path)
+
+
+# Uploads a batch of stats to one URL, returning True on success. See `RunTracker.post_stats_batch`.
+PostStatsBatch = Callable[..., bool]
+
+
+class StatsUploader:
+    """Drains a StatsSpool, batching entries per endpoint and backing off on failures."""
+
+    # Stats version 1 sends each run's stats as separate top-level params, so only version 2
+    # payloads may hold more than one run.
+    MAX_BATCH_SIZE = 50
+    INITIAL_BACKOFF_SECS = 2.0
+    MAX_BACKOFF_SECS = 300.0
+
+    def __init__(
+        self,
+        spool: StatsSpool,
+        post_stats_batch: PostStatsBatch,
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._spool = spool
+        self._post_stats_batch = post_stats_batch
+        self._clock = clock
+
+    @classmethod
+    def backoff_secs(cls, attempts: int) -> float:
+        """How long to wait before retrying an entry which has failed `attempts + 1` times."""
+        return float(min(cls.INITIAL_BACKOFF_SECS * (2 ** attempts), cls.MAX_BACKOFF_SECS))
+
+    def _batches(self, entries: Sequence[SpooledStats]) -> Iterator[List[SpooledStats]]:
+        by_key = sorted(entries, key=lambda e: (e.batch_key, e.path))
+        for _, group in groupby(by_key, key=lambda e: e.batch_key):
+            batch = list(group)
+            size = self.MAX_BATCH_SIZE if batch[0].stats_version == 2 else 1
+            for i in range(0, len(batch), size):
+                yield batch[i : i + size]
+
+    def drain(self) -> int:
+        """Upload all entries that are due, returning the number successfully uploaded.
+
+        If another process is already draining the same spool, this returns 0 immediately.
+        """
+        lock_fd = self._spool.try_lock()
+        if lock_fd is None:
+            return 0
+        try:
+            now = self._clock()
+            due = [e for e in self._spool.entries() if e.next_attempt_time <= now]
+            uploaded = 0
+            for batch in self._batches(due):
+                first = batch[0]
+                success = self._post_stats_batch(
+                    first.url,
+                    [entry.stats for entry in batch],
+                    timeout=first.timeout,
+                    auth_provider=first.auth_provider,
+                    stats_version=first.stats_version,
+                    headers=first.headers,
+                )
+                for entry in batch:
+                    if success:
+                        self._spool.remove(entry)
+                        uploaded += 1
+                    elif entry.attempts + 1 >= entry.max_attempts:
+                        logger.warning(
+                            f"Giving up on uploading stats to {entry.url} after "
+                            f"{entry.max_attempts} attempts."
+                        )
+                        self._spool.remove(entry)
+                    else:
+                        self._spool.reschedule(
+                            entry, next_attempt_time=now + self.backoff_secs(entry.attempts)
+                        )
+            return uploaded
+        finally:
+            self._spool.unlock(lock_fd)
+
+    def seconds_until_next_attempt(self) -> Optional[float]:
+        """How long until the earliest pending entry is due, or None if the spool is empty."""
+        next_times = [e.next_attempt_time for e in self._spool.entries()]
+        if not next_times:
+            return None
+        return max(0.0, min(next_times) - self._clock())
+
+    def drain_until_empty(self, max_wait_secs: float) -> None:
+        """Drain repeatedly, sleeping through backoffs, until the spool is empty or the next retry
+        would be due more than `max_wait_secs` from when this was called."""
+        deadline = self._clock() + max_wait_secs
+        while True:
+            self.drain()
+            wait = self.seconds_until_next_attempt()
+            if wait is None or self._clock() + wait > deadline:
+                return
+            time.sleep(wait)
+
+
+# Set while pantsd's StatsUploadService is draining spools in this process, in which case runs
+# leave uploads to it rather than spawning an uploader process.
+_daemon_uploader_active = threading.Event()
+
+
+def set_daemon_uploader_active(active: bool) -> None:
+    if active:
+        _daemon_uploader_active.set()
+    else:
+        _daemon_uploader_active.clear()
+
+
+def daemon_uploader_active() -> bool:
+    return _daemon_uploader_active.is_set()
+
+
+def spawn_uploader_process(spool_dir: str, max_wait_secs: float) -> None:
+    """Drain the spool from a detached process, which will outlive this run."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    with open(os.devnull, "r+b") as devnull:
+        subprocess.Popen(
+            [sys.executable, "-m", __name__, spool_dir, str(max_wait_secs)],
+            env=env,
+            stdin=devnull,
+            stdout=devnull,
+            stderr=devnull,
+            start_new_session=True,
+            close_fds=True,
+        )
+
+
+def main() -> None:
+    # NB: Imported here to avoid an import cycle, as the RunTracker spools stats using this module.
+    from pants.goal.run_tracker import RunTracker
+
+    spool_dir, max_wait_secs = sys.argv[1], float(sys.argv[2])
+    StatsUploader(StatsSpool(spool_dir), RunTracker.post_stats_batch).drain_until_empty(
+        max_wait_secs
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from pants.goal.run_tracker import RunTracker
+from pants.goal.stats_uploader import StatsSpool, StatsUploader
+
+
+@contextmanager
+def stats_server(status_code: int = 200) -> Iterator[Tuple[str, List[dict]]]:
+    """A local HTTP stand-in for a stats endpoint, which records the JSON bodies it receives."""
+    received: List[dict] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            received.append(json.loads(self.rfile.read(length)))
+            self.send_response(status_code)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("localhost", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://localhost:{server.server_port}/upload", received
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def enqueue(spool: StatsSpool, url: str, run: int, max_attempts: int = 3) -> None:
+    spool.enqueue(
+        url=url, stats={"run": run}, stats_version=2, timeout=2, max_attempts=max_attempts
+    )
+
+
+def test_batched_upload(tmp_path: Path) -> None:
+    spool = StatsSpool(str(tmp_path))
+    with stats_server() as (url, received):
+        for run in range(3):
+            enqueue(spool, url, run)
+        uploader = StatsUploader(spool, RunTracker.post_stats_batch)
+        assert uploader.drain() == 3
+    # All three runs were shipped in a single request, in FIFO order.
+    assert received == [{"builds": [{"run": 0}, {"run": 1}, {"run": 2}]}]
+    assert list(spool.entries()) == []
+    assert uploader.seconds_until_next_attempt() is None
+
+
+def test_retries_with_backoff(tmp_path: Path) -> None:
+    spool = StatsSpool(str(tmp_path))
+    now = 1000.0
+    with stats_server(status_code=503) as (url, received):
+        enqueue(spool, url, run=0, max_attempts=3)
+        uploader = StatsUploader(spool, RunTracker.post_stats_batch, clock=lambda: now)
+
+        assert uploader.drain() == 0
+        (entry,) = spool.entries()
+        assert entry.attempts == 1
+        assert entry.next_attempt_time == now + StatsUploader.INITIAL_BACKOFF_SECS
+
+        # Not yet due, so nothing is attempted.
+        assert uploader.drain() == 0
+        assert len(received) == 1
+
+        now = entry.next_attempt_time
+        assert uploader.drain() == 0
+        (entry,) = spool.entries()
+        assert entry.attempts == 2
+        assert entry.next_attempt_time == now + 2 * StatsUploader.INITIAL_BACKOFF_SECS
+
+        # The final attempt fails too, so we give up on the entry.
+        now = entry.next_attempt_time
+        assert uploader.drain() == 0
+        assert list(spool.entries()) == []
+        assert len(received) == 3
+
+
+def test_single_drainer(tmp_path: Path) -> None:
+    spool = StatsSpool(str(tmp_path))
+    with stats_server() as (url, received):
+        enqueue(spool, url, run=0)
+        lock_fd = spool.try_lock()
+        assert lock_fd is not None
+        try:
+            assert StatsUploader(spool, RunTracker.post_stats_batch).drain() == 0
+        finally:
+            spool.unlock(lock_fd)
+        assert StatsUploader(spool, RunTracker.post_stats_batch).drain() == 1
+    assert len(received) == 1
+
+
+def test_entries_are_private(tmp_path: Path) -> None:
+    spool = StatsSpool(str(tmp_path / "spool"))
+    path = spool.enqueue(
+        url="http://localhost/upload",
+        stats={"run": 0},
+        stats_version=2,
+        timeout=2,
+        max_attempts=3,
+        headers={"Cookie": "session=secret"},
+    )
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    (entry,) = spool.entries()
+    spool.reschedule(entry, next_attempt_time=1.0)
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    (entry,) = spool.entries()
+    assert entry.headers == {"Cookie": "session=secret"}
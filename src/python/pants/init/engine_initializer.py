@@ -95,8 +95,6 @@ class GraphSession:
         union_membership: UnionMembership,
         goals: Iterable[str],
         specs: Specs,
-        poll: bool = False,
-        poll_delay: Optional[float] = None,
     ) -> int:
         """Runs @goal_rules sequentially and interactively by requesting their implicit Goal
         products.
@@ -123,9 +121,7 @@ class GraphSession:
             params = Params(specs, self.console, workspace, interactive_runner)
             logger.debug(f"requesting {goal_product} to satisfy execution of `{goal}` goal")
             try:
-                exit_code = self.scheduler_session.run_goal_rule(
-                    goal_product, params, poll=poll, poll_delay=poll_delay
-                )
+                exit_code = self.scheduler_session.run_goal_rule(goal_product, params)
             finally:
                 self.console.flush()
 
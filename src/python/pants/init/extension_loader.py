@@ -1,16 +1,22 @@
 # Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+import functools
 import importlib
+import logging
+import time
 import traceback
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from pkg_resources import Requirement, WorkingSet
 
 from pants.base.exceptions import BackendConfigurationError
 from pants.build_graph.build_configuration import BuildConfiguration
+from pants.init.plugin_manifest import PLUGIN_ENTRY_POINT_GROUP, PluginManifest
 from pants.util.ordered_set import FrozenOrderedSet
 
+logger = logging.getLogger(__name__)
+
 
 class PluginLoadingError(Exception):
     pass
@@ -29,6 +35,7 @@ def load_backends_and_plugins(
     working_set: WorkingSet,
     backends: List[str],
     bc_builder: Optional[BuildConfiguration.Builder] = None,
+    plugin_manifest: Optional[PluginManifest] = None,
 ) -> BuildConfiguration:
     """Load named plugins and source backends.
 
@@ -36,10 +43,12 @@ def load_backends_and_plugins(
     :param working_set: A pkg_resources.WorkingSet to load plugins from.
     :param backends: v2 backends to load.
     :param bc_builder: The BuildConfiguration (for adding aliases).
+    :param plugin_manifest: A manifest of already activated plugins, consulted before the
+                            working_set.
     """
     bc_builder = bc_builder or BuildConfiguration.Builder()
     load_build_configuration_from_source(bc_builder, backends)
-    load_plugins(bc_builder, plugins, working_set)
+    load_plugins(bc_builder, plugins, working_set, plugin_manifest)
     return bc_builder.create()
 
 
@@ -47,6 +56,7 @@ def load_plugins(
     build_configuration: BuildConfiguration.Builder,
     plugins: List[str],
     working_set: WorkingSet,
+    plugin_manifest: Optional[PluginManifest] = None,
 ) -> None:
     """Load named plugins from the current working_set into the supplied build_configuration.
 
@@ -70,33 +80,48 @@ def load_plugins(
     :param plugins: A list of plugin names optionally with versions, in requirement format.
                               eg ['widgetpublish', 'widgetgen==1.2'].
     :param working_set: A pkg_resources.WorkingSet to load plugins from.
+    :param plugin_manifest: A manifest of already activated plugins. Plugins found in it are loaded
+                            without consulting the working_set.
     """
-    loaded: Dict = {}
+    loaded = set()
     for plugin in plugins or []:
         req = Requirement.parse(plugin)
-        dist = working_set.find(req)
-
-        if not dist:
-            raise PluginNotFound(f"Could not find plugin: {req}")
-
-        entries = dist.get_entry_map().get("pantsbuild.plugin", {})
+        entries: Dict[str, Callable[[], Any]]
+        activation = plugin_manifest.find(req) if plugin_manifest else None
+        if activation:
+            key = activation.key
+            entries = {
+                name: functools.partial(activation.load_entry_point, name)
+                for name in activation.entry_points
+            }
+        else:
+            dist = working_set.find(req)
+            if not dist:
+                raise PluginNotFound(f"Could not find plugin: {req}")
+            key = dist.as_requirement().key
+            entries = {
+                name: entry_point.load
+                for name, entry_point in dist.get_entry_map()
+                .get(PLUGIN_ENTRY_POINT_GROUP, {})
+                .items()
+            }
 
         if "load_after" in entries:
-            deps = entries["load_after"].load()()
+            deps = entries["load_after"]()()
             for dep_name in deps:
                 dep = Requirement.parse(dep_name)
                 if dep.key not in loaded:
                     raise PluginLoadOrderError(f"Plugin {plugin} must be loaded after {dep}")
         if "target_types" in entries:
-            target_types = entries["target_types"].load()()
+            target_types = entries["target_types"]()()
             build_configuration.register_target_types(target_types)
         if "build_file_aliases" in entries:
-            aliases = entries["build_file_aliases"].load()()
+            aliases = entries["build_file_aliases"]()()
             build_configuration.register_aliases(aliases)
         if "rules" in entries:
-            rules = entries["rules"].load()()
+            rules = entries["rules"]()()
             build_configuration.register_rules(rules)
-        loaded[dist.as_requirement().key] = dist
+        loaded.add(key)
 
 
 def load_build_configuration_from_source(
@@ -126,6 +151,7 @@ def load_backend(build_configuration: BuildConfiguration.Builder, backend_packag
       the build configuration.
     """
     backend_module = backend_package + ".register"
+    start = time.time()
     try:
         module = importlib.import_module(backend_module)
     except ImportError as ex:
@@ -151,3 +177,6 @@ def load_backend(build_configuration: BuildConfiguration.Builder, backend_packag
     rules = invoke_entrypoint("rules")
     if rules:
         build_configuration.register_rules(rules)
+    # NB: Importing a backend's `register` module transitively imports all of its rules, so this
+    # dominates startup time without pantsd. See `import_time_integration_test.py`.
+    logger.debug(f"Loaded the {backend_package} backend in {time.time() - start:.3f}s.")
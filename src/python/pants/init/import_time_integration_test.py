@@ -0,0 +1,86 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""A benchmark of the imports performed when starting Pants without pantsd.
+
+Run with `-s` to see the report of the slowest imports.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+from pants.init.load_backends_integration_test import discover_backends
+from pants.testutil.pants_integration_test import run_pants
+
+# See https://docs.python.org/3/using/cmdline.html#cmdoption-x.
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    self_micros: int
+    cumulative_micros: int
+    depth: int
+
+
+def parse_import_times(stderr: str) -> List[ImportTime]:
+    """Parse the report written to stderr by `python -X importtime`."""
+    import_times = []
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            self_micros, cumulative_micros, indent, module = match.groups()
+            import_times.append(
+                ImportTime(
+                    module=module,
+                    self_micros=int(self_micros),
+                    cumulative_micros=int(cumulative_micros),
+                    depth=(len(indent) - 1) // 2,
+                )
+            )
+    return import_times
+
+
+def format_report(import_times: List[ImportTime], limit: int = 25) -> str:
+    total_micros = sum(it.self_micros for it in import_times)
+    lines = [f"Imported {len(import_times)} modules in {total_micros / 1000000:.3f}s."]
+    lines.append("Slowest by cumulative time:")
+    for it in sorted(import_times, key=lambda it: it.cumulative_micros, reverse=True)[:limit]:
+        lines.append(f"  {it.cumulative_micros / 1000000:8.3f}s  {it.module}")
+    lines.append("Slowest by self time:")
+    for it in sorted(import_times, key=lambda it: it.self_micros, reverse=True)[:limit]:
+        lines.append(f"  {it.self_micros / 1000000:8.3f}s  {it.module}")
+    return "\n".join(lines)
+
+
+def test_parse_import_times() -> None:
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |     b\n"
+        "import time:        50 |        150 |   a\n"
+        "import time:        20 |        170 | pants.core.register\n"
+    )
+    assert parse_import_times(stderr) == [
+        ImportTime("b", 100, 100, 2),
+        ImportTime("a", 50, 150, 1),
+        ImportTime("pants.core.register", 20, 170, 0),
+    ]
+
+
+def test_startup_import_time() -> None:
+    backends = discover_backends()
+    result = run_pants(
+        ["--no-pantsd", "--no-verify-config", "--version"],
+        config={"GLOBAL": {"backend_packages": backends}},
+        extra_env={"PYTHONPROFILEIMPORTTIME": "1"},
+    )
+    result.assert_success()
+    import_times = parse_import_times(result.stderr)
+    print(format_report(import_times))
+
+    # Test support code should never be loaded by a production run.
+    imported = {it.module for it in import_times}
+    leaked = sorted(m for m in imported if m.startswith(("pants.testutil", "pytest", "_pytest")))
+    assert not leaked
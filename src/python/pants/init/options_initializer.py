@@ -45,7 +45,7 @@ class BuildConfigInitializer:
     def __init__(self, options_bootstrapper: OptionsBootstrapper) -> None:
         self._options_bootstrapper = options_bootstrapper
         self._bootstrap_options = options_bootstrapper.get_bootstrap_options().for_global_scope()
-        self._working_set = PluginResolver(self._options_bootstrapper).resolve()
+        self._plugin_manifest = PluginResolver(self._options_bootstrapper).activate()
 
     def _load_plugins(self) -> BuildConfiguration:
         # Add any extra paths to python path (e.g., for loading extra source backends).
@@ -57,8 +57,11 @@ class BuildConfigInitializer:
         # Load plugins and backends.
         return load_backends_and_plugins(
             self._bootstrap_options.plugins,
-            self._working_set,
+            # NB: Plugins are normally found in the manifest, but may also be installed alongside
+            # Pants itself.
+            pkg_resources.working_set,
             self._bootstrap_options.backend_packages,
+            plugin_manifest=self._plugin_manifest,
         )
 
     def setup(self) -> BuildConfiguration:
@@ -0,0 +1,145 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""A precomputed record of how to activate resolved plugins.
+
+Activating plugins via `pkg_resources` means adding each plugin location to a `WorkingSet`, which
+scans the location's metadata, and then parsing each distribution's `entry_points.txt` when loading
+it. Since resolved plugins are immutable once installed into the plugin cache, we record everything
+needed to load them in a manifest alongside the `plugins-<hash>.txt` list, and load them on later
+runs by importing their entry points directly.
+
+The resolved distributions are still added to the global `pkg_resources.working_set`, so that
+plugins (and their dependencies) may use `pkg_resources.get_distribution`, `require` and
+`iter_entry_points`, and so that a plugin requirement which conflicts with a resolved version still
+raises `VersionConflict`. But they are constructed from the metadata directory recorded in the
+manifest, rather than found by scanning each location.
+"""
+
+import importlib
+import json
+import os
+import site
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pkg_resources
+from pkg_resources import Distribution, PathMetadata, Requirement, WorkingSet, find_distributions
+
+# The entry point group that plugins register their `register.py`-style entrypoints in.
+PLUGIN_ENTRY_POINT_GROUP = "pantsbuild.plugin"
+
+
+@dataclass(frozen=True)
+class PluginActivation:
+    """A single resolved distribution in the plugin cache."""
+
+    key: str
+    version: str
+    location: str
+    # The distribution's metadata directory (e.g. `foo-1.0.dist-info`) within its location.
+    metadata_dir: str
+    # Whether the location contains `.pth` files, which must be processed via `site.addsitedir`.
+    has_pth_files: bool
+    # Maps each `pantsbuild.plugin` entry point name to its `module:attr` spec.
+    entry_points: Dict[str, str]
+
+    def satisfies(self, requirement: Requirement) -> bool:
+        return requirement.key == self.key and self.version in requirement
+
+    def to_distribution(self) -> Distribution:
+        """Construct the distribution from its recorded metadata directory, without scanning."""
+        return Distribution.from_location(
+            self.location,
+            self.metadata_dir,
+            metadata=PathMetadata(self.location, os.path.join(self.location, self.metadata_dir)),
+        )
+
+    def load_entry_point(self, name: str) -> Any:
+        module_name, _, attrs = self.entry_points[name].partition(":")
+        value: Any = importlib.import_module(module_name.strip())
+        for attr in attrs.strip().split("."):
+            if attr:
+                value = getattr(value, attr)
+        return value
+
+
+@dataclass(frozen=True)
+class PluginManifest:
+    """The activations for all distributions resolved for one set of plugin requirements."""
+
+    activations: Tuple[PluginActivation, ...]
+
+    @classmethod
+    def from_locations(cls, locations: Iterable[str]) -> "PluginManifest":
+        """Compute a manifest by scanning each location with `pkg_resources` (once)."""
+        activations = []
+        for location in locations:
+            has_pth_files = any(name.endswith(".pth") for name in os.listdir(location))
+            for dist in find_distributions(location, only=True):
+                entry_points = dist.get_entry_map().get(PLUGIN_ENTRY_POINT_GROUP, {})
+                activations.append(
+                    PluginActivation(
+                        key=dist.key,
+                        version=dist.version,
+                        location=location,
+                        metadata_dir=os.path.relpath(dist.egg_info, location),
+                        has_pth_files=has_pth_files,
+                        entry_points={
+                            name: f"{ep.module_name}:{'.'.join(ep.attrs)}"
+                            for name, ep in sorted(entry_points.items())
+                        },
+                    )
+                )
+        return cls(tuple(activations))
+
+    @classmethod
+    def load(cls, path: str) -> Optional["PluginManifest"]:
+        """Load the manifest at the given path, or return None if it is missing or stale."""
+        try:
+            with open(path, "r") as fp:
+                activations = tuple(PluginActivation(**entry) for entry in json.load(fp))
+        except (OSError, ValueError, TypeError):
+            return None
+        if not all(
+            os.path.isdir(os.path.join(activation.location, activation.metadata_dir))
+            for activation in activations
+        ):
+            return None
+        return cls(activations)
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as fp:
+            json.dump(
+                [
+                    {
+                        "key": a.key,
+                        "version": a.version,
+                        "location": a.location,
+                        "metadata_dir": a.metadata_dir,
+                        "has_pth_files": a.has_pth_files,
+                        "entry_points": a.entry_points,
+                    }
+                    for a in self.activations
+                ],
+                fp,
+            )
+
+    def activate(self, working_set: Optional[WorkingSet] = None) -> None:
+        """Make the resolved distributions importable, and add them to the working set.
+
+        :param working_set: The working set to add the resolved distributions to instead of the
+                            global working set (for testing).
+        """
+        working_set = working_set or pkg_resources.working_set
+        for location in dict.fromkeys(activation.location for activation in self.activations):
+            if any(a.has_pth_files for a in self.activations if a.location == location):
+                site.addsitedir(location)
+            elif location not in sys.path:
+                sys.path.append(location)
+        for activation in self.activations:
+            working_set.add(activation.to_distribution(), activation.location)
+
+    def find(self, requirement: Requirement) -> Optional[PluginActivation]:
+        return next((a for a in self.activations if a.satisfies(requirement)), None)
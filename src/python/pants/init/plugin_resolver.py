@@ -9,12 +9,11 @@ import site
 import uuid
 from typing import Iterable, Iterator, List, Optional, Type, TypeVar, cast
 
-from pex import resolver
 from pex.interpreter import PythonInterpreter
-from pex.network_configuration import NetworkConfiguration
 from pkg_resources import Distribution, WorkingSet
 from pkg_resources import working_set as global_working_set
 
+from pants.init.plugin_manifest import PluginManifest
 from pants.option.global_options import GlobalOptions
 from pants.option.optionable import Optionable
 from pants.option.options_bootstrapper import OptionsBootstrapper
@@ -67,7 +66,32 @@ class PluginResolver:
                 working_set.add_entry(resolved_plugin_location)
         return working_set
 
-    def _resolve_plugin_locations(self) -> Iterator[str]:
+    def activate(self, working_set: Optional[WorkingSet] = None) -> Optional[PluginManifest]:
+        """Resolves any configured plugins, makes them importable and adds them to the global
+        working set.
+
+        The returned manifest records the entry points of each resolved distribution, and is
+        cached alongside the resolved plugin list so that later runs need not parse them. Returns
+        None if no plugins are configured.
+
+        :param working_set: The working set to add the resolved plugins to instead of the global
+                            working set (for testing).
+        """
+        if not self._plugin_requirements:
+            return None
+        manifest_path = f"{os.path.splitext(self._resolved_plugins_list)[0]}.manifest.json"
+        locations = list(self._resolve_plugin_locations())
+        manifest = PluginManifest.load(manifest_path)
+        if manifest is None or {a.location for a in manifest.activations} != set(locations):
+            manifest = PluginManifest.from_locations(locations)
+            tmp_manifest_path = f"{manifest_path}.{uuid.uuid4().hex}"
+            manifest.dump(tmp_manifest_path)
+            os.rename(tmp_manifest_path, manifest_path)
+        manifest.activate(working_set)
+        return manifest
+
+    @memoized_property
+    def _resolved_plugins_list(self) -> str:
         hasher = hashlib.sha1()
 
         # Assume we have platform-specific plugin requirements and pessimistically mix the ABI
@@ -77,7 +101,10 @@ class PluginResolver:
         for req in sorted(self._plugin_requirements):
             hasher.update(req.encode())
         resolve_hash = hasher.hexdigest()
-        resolved_plugins_list = os.path.join(self.plugin_cache_dir, f"plugins-{resolve_hash}.txt")
+        return os.path.join(self.plugin_cache_dir, f"plugins-{resolve_hash}.txt")
+
+    def _resolve_plugin_locations(self) -> Iterator[str]:
+        resolved_plugins_list = self._resolved_plugins_list
 
         if self._plugins_force_resolve:
             safe_delete(resolved_plugins_list)
@@ -94,6 +121,10 @@ class PluginResolver:
                 yield self._plugin_location(plugin_path)
 
     def _resolve_plugins(self) -> Iterable[str]:
+        # NB: Resolving is rare, so we avoid paying to import the resolver on every run.
+        from pex import resolver
+        from pex.network_configuration import NetworkConfiguration
+
         logger.info(
             "Resolving new plugins...:\n  {}".format("\n  ".join(self._plugin_requirements))
         )
@@ -2,18 +2,22 @@
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
 import logging
-from typing import Optional, cast
+import os
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple, cast
 
 from pants.base.build_environment import get_buildroot, get_git
 from pants.base.specs import AddressLiteralSpec, AddressSpecs, FilesystemSpecs, Specs
 from pants.base.specs_parser import SpecsParser
-from pants.engine.addresses import AddressInput
+from pants.core.util_rules.coverage_index import CoverageIndex, coverage_index_path
+from pants.engine.addresses import Address, Addresses, AddressInput
+from pants.engine.internals.graph import Owners, OwnersRequest
 from pants.engine.internals.scheduler import SchedulerSession
 from pants.engine.internals.selectors import Params
 from pants.engine.rules import QueryRule
 from pants.option.options import Options
 from pants.option.options_bootstrapper import OptionsBootstrapper
-from pants.vcs.changed import ChangedAddresses, ChangedOptions, ChangedRequest
+from pants.vcs.changed import ChangedAddresses, ChangedOptions, ChangedRequest, DependeesOption
 
 logger = logging.getLogger(__name__)
 
@@ -58,17 +62,49 @@ def calculate_specs(
         raise InvalidSpecConstraint(
             "The `--changed-*` options are only available if Git is used for the repository."
         )
-    changed_request = ChangedRequest(
-        sources=tuple(changed_options.changed_files(git)),
-        dependees=changed_options.dependees,
-    )
+    changed_files = tuple(changed_options.changed_files(git))
+    changed_request = ChangedRequest(sources=changed_files, dependees=changed_options.dependees)
     (changed_addresses,) = session.product_request(
         ChangedAddresses, [Params(changed_request, options_bootstrapper)]
     )
     logger.debug("changed addresses: %s", changed_addresses)
 
+    if changed_options.test_impact:
+        coverage_index = CoverageIndex.load(
+            coverage_index_path(options.for_global_scope().pants_workdir)
+        )
+        uncovered_files = tuple(path for path in changed_files if not coverage_index.covers(path))
+        fallback_addresses: Iterable[Address] = ()
+        if uncovered_files:
+            (fallback_addresses,) = session.product_request(
+                ChangedAddresses,
+                [
+                    Params(
+                        ChangedRequest(
+                            sources=uncovered_files, dependees=changed_options.dependees
+                        ),
+                        options_bootstrapper,
+                    )
+                ],
+            )
+        selected_addresses = coverage_index.select(
+            cast(ChangedAddresses, changed_addresses),
+            changed_files=changed_files,
+            fallback=fallback_addresses,
+        )
+        logger.debug(
+            "test impact selected %d of %d changed addresses",
+            len(selected_addresses),
+            len(cast(ChangedAddresses, changed_addresses)),
+        )
+        return _specs_for_addresses(selected_addresses)
+
+    return _specs_for_addresses(cast(ChangedAddresses, changed_addresses))
+
+
+def _specs_for_addresses(addresses: Iterable[Address]) -> Specs:
     address_specs = []
-    for address in cast(ChangedAddresses, changed_addresses):
+    for address in addresses:
         address_input = AddressInput.parse(address.spec)
         address_specs.append(
             AddressLiteralSpec(
@@ -81,7 +117,74 @@ def calculate_specs(
     return Specs(AddressSpecs(address_specs, filter_by_global_options=True), FilesystemSpecs([]))
 
 
+@dataclass(frozen=True)
+class ChangeScopedSpecs:
+    """The portion of a run's specs which is affected by some changed files.
+
+    `affected` and `skipped` partition the addresses that the original specs resolved to.
+    """
+
+    specs: Specs
+    affected: Tuple[Address, ...]
+    skipped: Tuple[Address, ...]
+
+
+def calculate_specs_for_changed_paths(
+    specs: Specs,
+    changed_paths: Iterable[str],
+    session: SchedulerSession,
+    *,
+    build_root: Optional[str] = None,
+) -> ChangeScopedSpecs:
+    """Restrict the given specs to the targets which (transitively) own any of the changed paths.
+
+    If any changed file is not owned by a target (e.g. `pants.toml` or a constraints file), it may
+    affect anything, and so the original specs are returned unchanged.
+    """
+    build_root = build_root or get_buildroot()
+    (spec_addresses,) = session.product_request(Addresses, [specs])
+    all_affected = ChangeScopedSpecs(specs, affected=tuple(spec_addresses), skipped=())
+
+    # The watcher reports the parent directories of changed files too, but those are only
+    # interesting to the engine.
+    changed_files = tuple(
+        path for path in changed_paths if not os.path.isdir(os.path.join(build_root, path))
+    )
+    if not specs.provided or not changed_files:
+        return all_affected
+
+    owners_per_file = session.product_request(
+        Owners, [OwnersRequest((path,)) for path in changed_files]
+    )
+    unowned = [path for path, owners in zip(changed_files, owners_per_file) if not owners]
+    if unowned:
+        logger.debug("changed files without owners: %s", unowned)
+        return all_affected
+
+    (changed_addresses,) = session.product_request(
+        ChangedAddresses,
+        [ChangedRequest(sources=changed_files, dependees=DependeesOption.TRANSITIVE)],
+    )
+    # NB: Owners are file-level targets, whereas the specs may have resolved to the targets that
+    # generated them (or vice versa), so we compare the base targets.
+    changed_base_addresses = {
+        address.maybe_convert_to_base_target() for address in changed_addresses
+    }
+    affected = []
+    skipped = []
+    for address in spec_addresses:
+        if address.maybe_convert_to_base_target() in changed_base_addresses:
+            affected.append(address)
+        else:
+            skipped.append(address)
+    return ChangeScopedSpecs(
+        _specs_for_addresses(affected), affected=tuple(affected), skipped=tuple(skipped)
+    )
+
+
 def rules():
     return [
         QueryRule(ChangedAddresses, [ChangedRequest]),
+        QueryRule(Addresses, [Specs]),
+        QueryRule(Owners, [OwnersRequest]),
     ]
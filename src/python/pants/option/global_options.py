@@ -73,6 +73,7 @@ class ExecutionOptions:
     remote_store_rpc_retries: Any
     remote_store_connection_limit: Any
     process_execution_local_parallelism: Any
+    process_execution_local_memory_mb: Any
     process_execution_remote_parallelism: Any
     process_execution_cleanup_local_dirs: Any
     process_execution_speculation_delay: Any
@@ -99,6 +100,7 @@ class ExecutionOptions:
             remote_store_rpc_retries=bootstrap_options.remote_store_rpc_retries,
             remote_store_connection_limit=bootstrap_options.remote_store_connection_limit,
             process_execution_local_parallelism=bootstrap_options.process_execution_local_parallelism,
+            process_execution_local_memory_mb=bootstrap_options.process_execution_local_memory_mb,
             process_execution_remote_parallelism=bootstrap_options.process_execution_remote_parallelism,
             process_execution_cleanup_local_dirs=bootstrap_options.process_execution_cleanup_local_dirs,
             process_execution_speculation_delay=bootstrap_options.process_execution_speculation_delay,
@@ -125,6 +127,7 @@ DEFAULT_EXECUTION_OPTIONS = ExecutionOptions(
     remote_store_rpc_retries=2,
     remote_store_connection_limit=5,
     process_execution_local_parallelism=multiprocessing.cpu_count(),
+    process_execution_local_memory_mb=None,
     process_execution_remote_parallelism=128,
     process_execution_cleanup_local_dirs=True,
     process_execution_speculation_delay=1,
@@ -707,7 +710,20 @@ class GlobalOptions(Subsystem):
             type=int,
             default=DEFAULT_EXECUTION_OPTIONS.process_execution_local_parallelism,
             advanced=True,
-            help="Number of concurrent processes that may be executed locally.",
+            help="Number of concurrent processes that may be executed locally.\n\n"
+            "Processes which declare that they use more than one CPU count against this limit "
+            "for each CPU that they use.",
+        )
+        register(
+            "--process-execution-local-memory-mb",
+            type=int,
+            default=DEFAULT_EXECUTION_OPTIONS.process_execution_local_memory_mb,
+            advanced=True,
+            help="The total memory (in MiB) that may be used by processes executed locally. If "
+            "set, each of the `--process-execution-local-parallelism` slots is granted an equal "
+            "share of this memory, and processes which declare that they need more than that "
+            "occupy additional slots. If unset, only the number of CPUs used by processes is "
+            "limited.",
         )
         register(
             "--process-execution-remote-parallelism",
@@ -868,6 +884,17 @@ class GlobalOptions(Subsystem):
             advanced=True,
             help=f"The maximum number of times to loop when `{loop_flag}` is specified.",
         )
+        register(
+            "--loop-debounce",
+            type=float,
+            default=0.5,
+            advanced=True,
+            help=(
+                f"When `{loop_flag}` is specified, the number of seconds without any further file "
+                "changes to wait for before re-running goals. This batches bursts of changes (e.g. "
+                "from `git checkout`) into a single re-run."
+            ),
+        )
 
         register(
             "--lock",
@@ -918,3 +945,8 @@ class GlobalOptions(Subsystem):
                 "The `--remote-execution-server` option requires also setting "
                 "`--remote-store-server`. Often these have the same value."
             )
+
+        if opts.loop_debounce <= 0:
+            raise OptionsError(
+                f"The `--loop-debounce` option must be greater than 0, but was {opts.loop_debounce}."
+            )
@@ -0,0 +1,154 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import configparser
+import sys
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from hashlib import sha1
+from typing import Iterable, Mapping, Optional, Sequence, Tuple
+
+from pants.option.config import Config
+from pants.option.options_bootstrapper import OptionsBootstrapper
+
+
+def _digest_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as fp:
+            return sha1(fp.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _fromfile_paths(values: Iterable[str]) -> Tuple[str, ...]:
+    """The paths referenced by any `@fromfile` values among the given arg or option values."""
+    paths = set()
+    for value in values:
+        if value.startswith("-") and "=" in value:
+            value = value.split("=", 1)[1]
+        if value.startswith("@") and not value.startswith("@@"):
+            paths.add(value[1:])
+    return tuple(sorted(paths))
+
+
+def _config_values(config: Config) -> Iterable[str]:
+    """All option values set by the given Config, as they will be seen by the options parser."""
+    for single_file_config in config.configs():
+        config_values = single_file_config.values
+        for section in (Config.DEFAULT_SECTION, *config_values.sections):
+            try:
+                options = config_values.options(section)
+            except configparser.NoSectionError:
+                continue
+            for option in options:
+                try:
+                    value = config_values.get_value(section, option)
+                except configparser.Error:
+                    continue
+                if isinstance(value, str):
+                    yield value
+
+
+def _digest_files(paths: Iterable[str]) -> Tuple[Tuple[str, Optional[str]], ...]:
+    return tuple((path, _digest_file(path)) for path in paths)
+
+
+@dataclass
+class _CachedConfig:
+    config: Config
+    # The digest of each consulted config file, or None if it did not exist.
+    file_digests: Tuple[Tuple[str, Optional[str]], ...]
+    # The paths of any `@fromfile` values in the Config.
+    fromfile_paths: Tuple[str, ...]
+    # OptionsBootstrappers sharing this Config, keyed by their full args and environment.
+    bootstrappers: "OrderedDict[Tuple, OptionsBootstrapper]" = field(default_factory=OrderedDict)
+
+    def is_valid(self) -> bool:
+        return all(_digest_file(path) == digest for path, digest in self.file_digests)
+
+
+class OptionsBootstrapperCache:
+    """Reuses OptionsBootstrappers (and thus their parsed Options) across runs in pantsd.
+
+    An OptionsBootstrapper memoizes the Options it parses, so returning the same instance for an
+    identical run skips re-parsing entirely. When only non-bootstrap args (such as goals and specs)
+    change, the parsed Config is reused and only the Options are parsed again.
+
+    Entries are keyed by the `PANTS_*` env and bootstrap args, and are validated against the
+    digests of every consulted config file. Since the defaults of some options depend on the rest
+    of the environment (e.g. `CI` or `LANG`) and on whether stderr is a TTY, whole
+    OptionsBootstrappers are only reused when those are identical too. Likewise, the digests of
+    any files referenced by `@fromfile` values in the args, env or config are part of both keys.
+    """
+
+    def __init__(self, max_configs: int = 4, max_bootstrappers_per_config: int = 8) -> None:
+        self._max_configs = max_configs
+        self._max_bootstrappers_per_config = max_bootstrappers_per_config
+        self._configs: "OrderedDict[Tuple, _CachedConfig]" = OrderedDict()
+
+    def create(
+        self, env: Mapping[str, str], args: Sequence[str], *, allow_pantsrc: bool
+    ) -> OptionsBootstrapper:
+        """Equivalent to `OptionsBootstrapper.create`, but reusing prior results when possible."""
+        with warnings.catch_warnings(record=True):
+            pants_env = {k: v for k, v in env.items() if k.startswith("PANTS_")}
+            args = tuple(args)
+            bargs = OptionsBootstrapper.get_bootstrap_args(args)
+            config_file_paths = tuple(
+                OptionsBootstrapper.get_config_file_paths(env=pants_env, args=args)
+            )
+            env_tuples = tuple(sorted(pants_env.items(), key=lambda x: x[0]))
+            # Config interpolation is seeded with e.g. the homedir and user.
+            seed_values = tuple(sorted(Config._determine_seed_values().items()))
+            # NB: Bootstrap options may themselves be read from files, e.g. `--pantsrc-files=@path`.
+            env_fromfile_paths = _fromfile_paths(pants_env.values())
+            bootstrap_fromfile_digests = _digest_files(
+                sorted({*_fromfile_paths(bargs), *env_fromfile_paths})
+            )
+            config_key = (
+                env_tuples,
+                bargs,
+                config_file_paths,
+                allow_pantsrc,
+                seed_values,
+                bootstrap_fromfile_digests,
+            )
+
+            cached_config = self._configs.get(config_key)
+            if cached_config is None or not cached_config.is_valid():
+                config, consulted_paths = OptionsBootstrapper.load_config(
+                    pants_env, bargs, config_file_paths, allow_pantsrc=allow_pantsrc
+                )
+                cached_config = _CachedConfig(
+                    config=config,
+                    file_digests=_digest_files(consulted_paths),
+                    fromfile_paths=_fromfile_paths(_config_values(config)),
+                )
+                self._configs[config_key] = cached_config
+            self._configs.move_to_end(config_key)
+            while len(self._configs) > self._max_configs:
+                self._configs.popitem(last=False)
+
+            fromfile_digests = _digest_files(
+                sorted({*_fromfile_paths(args), *env_fromfile_paths, *cached_config.fromfile_paths})
+            )
+            bootstrapper_key = (
+                args,
+                tuple(sorted(env.items())),
+                sys.stderr.isatty(),
+                fromfile_digests,
+            )
+            bootstrapper = cached_config.bootstrappers.get(bootstrapper_key)
+            if bootstrapper is None:
+                bootstrapper = OptionsBootstrapper(
+                    env_tuples=env_tuples,
+                    bootstrap_args=bargs,
+                    args=args,
+                    config=cached_config.config,
+                )
+                cached_config.bootstrappers[bootstrapper_key] = bootstrapper
+            cached_config.bootstrappers.move_to_end(bootstrapper_key)
+            while len(cached_config.bootstrappers) > self._max_bootstrappers_per_config:
+                cached_config.bootstrappers.popitem(last=False)
+            return bootstrapper
@@ -0,0 +1,96 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import os
+from pathlib import Path
+from textwrap import dedent
+
+from pants.option.options_bootstrapper import OptionsBootstrapper
+from pants.option.options_bootstrapper_cache import OptionsBootstrapperCache
+from pants.util.contextutil import temporary_dir
+
+
+def test_reuse_and_invalidation() -> None:
+    with temporary_dir() as tmpdir:
+        config = Path(tmpdir, "pants.toml")
+        config.write_text(dedent("[GLOBAL]\npants_workdir = '/first'\n"))
+        rcfile = os.path.join(tmpdir, ".pantsrc")
+        config_args = [f"--pants-config-files=['{config}']", f"--pantsrc-files=['{rcfile}']"]
+
+        cache = OptionsBootstrapperCache()
+
+        def create(*args: str, **env: str) -> OptionsBootstrapper:
+            return cache.create(env=env, args=["./pants", *config_args, *args], allow_pantsrc=True)
+
+        def workdir(bootstrapper: OptionsBootstrapper) -> str:
+            return bootstrapper.bootstrap_options.for_global_scope().pants_workdir
+
+        first = create("list", "::")
+        assert workdir(first) == "/first"
+        assert create("list", "::") is first
+        assert create("list", "::") == OptionsBootstrapper.create(
+            env={}, args=["./pants", *config_args, "list", "::"], allow_pantsrc=True
+        )
+
+        # Only the goal args changed: the Config is reused, but the Options are not.
+        other_goal = create("filedeps", "::")
+        assert other_goal is not first
+        assert other_goal.config is first.config
+        assert create("filedeps", "::") is other_goal
+
+        # Changes to the PANTS_ env or to bootstrap args require reloading the Config.
+        assert create("list", "::", PANTS_LEVEL="debug").config is not first.config
+        assert create("--pants-workdir=/arg", "list", "::").config is not first.config
+
+        # As do changes to any consulted config file, including rcfiles which did not exist.
+        config.write_text(dedent("[GLOBAL]\npants_workdir = '/second'\n"))
+        second = create("list", "::")
+        assert second is not first
+        assert workdir(second) == "/second"
+        assert create("list", "::") is second
+
+        Path(rcfile).write_text(dedent("[GLOBAL]\npants_workdir = '/rc'\n"))
+        assert workdir(create("list", "::")) == "/rc"
+
+
+def test_non_pants_env_is_part_of_the_key() -> None:
+    # The defaults of some options are read from the environment when they are registered.
+    cache = OptionsBootstrapperCache()
+    args = ["./pants", "--pants-config-files=[]", "list", "::"]
+    first = cache.create(env={"LANG": "C"}, args=args, allow_pantsrc=False)
+    assert cache.create(env={"LANG": "C"}, args=args, allow_pantsrc=False) is first
+    second = cache.create(env={"LANG": "en_US.UTF-8"}, args=args, allow_pantsrc=False)
+    assert second is not first
+    assert second.config is first.config
+
+
+def test_fromfile_values_are_part_of_the_key() -> None:
+    with temporary_dir() as tmpdir:
+        fromfile = Path(tmpdir, "workdir.txt")
+        fromfile.write_text("/first")
+        config = Path(tmpdir, "pants.toml")
+        config.write_text("")
+        cache = OptionsBootstrapperCache()
+
+        def create(*args: str, **env: str) -> OptionsBootstrapper:
+            return cache.create(
+                env=env,
+                args=["./pants", f"--pants-config-files=['{config}']", *args, "list", "::"],
+                allow_pantsrc=False,
+            )
+
+        def workdir(bootstrapper: OptionsBootstrapper) -> str:
+            return bootstrapper.bootstrap_options.for_global_scope().pants_workdir
+
+        def assert_rereads_fromfile(*args: str, **env: str) -> None:
+            fromfile.write_text("/first")
+            first = create(*args, **env)
+            assert workdir(first) == "/first"
+            assert create(*args, **env) is first
+            fromfile.write_text("/second")
+            assert workdir(create(*args, **env)) == "/second"
+
+        assert_rereads_fromfile(f"--pants-workdir=@{fromfile}")
+        assert_rereads_fromfile(PANTS_WORKDIR=f"@{fromfile}")
+        config.write_text(f"[GLOBAL]\npants_workdir = '@{fromfile}'\n")
+        assert_rereads_fromfile()
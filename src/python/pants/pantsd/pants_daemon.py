@@ -15,6 +15,7 @@ from pants.base.build_environment import get_buildroot
 from pants.base.exception_sink import ExceptionSink, SignalHandler
 from pants.bin.daemon_pants_runner import DaemonPantsRunner
 from pants.engine.internals.native import Native
+from pants.goal.stats_uploader import stats_spool_dir
 from pants.init.engine_initializer import GraphScheduler
 from pants.init.logging import setup_logging, setup_logging_to_file, setup_warning_filtering
 from pants.init.options_initializer import OptionsInitializer
@@ -25,6 +26,7 @@ from pants.pantsd.pants_daemon_core import PantsDaemonCore
 from pants.pantsd.process_manager import PantsDaemonProcessManager
 from pants.pantsd.service.pants_service import PantsServices
 from pants.pantsd.service.scheduler_service import SchedulerService
+from pants.pantsd.service.stats_upload_service import StatsUploadService
 from pants.pantsd.service.store_gc_service import StoreGCService
 from pants.util.contextutil import stdio_as
 from pants.util.logging import LogLevel
@@ -100,7 +102,8 @@ class PantsDaemon(PantsDaemonProcessManager):
         )
 
         store_gc_service = StoreGCService(graph_scheduler.scheduler)
-        return PantsServices(services=(scheduler_service, store_gc_service))
+        stats_upload_service = StatsUploadService(stats_spool_dir(bootstrap_options.pants_workdir))
+        return PantsServices(services=(scheduler_service, store_gc_service, stats_upload_service))
 
     def __init__(
         self,
@@ -0,0 +1,40 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import logging
+
+from pants.goal.run_tracker import RunTracker
+from pants.goal.stats_uploader import StatsSpool, StatsUploader, set_daemon_uploader_active
+from pants.pantsd.service.pants_service import PantsService
+
+logger = logging.getLogger(__name__)
+
+
+class StatsUploadService(PantsService):
+    """Stats Upload Service.
+
+    Periodically drains the queue of run stats which the RunTracker spools with
+    `--run-tracker-stats-upload-async`, so that runs in pantsd never wait on the stats endpoints.
+    """
+
+    def __init__(self, spool_dir: str, period_secs: float = 5) -> None:
+        super().__init__()
+        self._uploader = StatsUploader(StatsSpool(spool_dir), RunTracker.post_stats_batch)
+        self._period_secs = period_secs
+
+    def run(self):
+        """Main service entrypoint.
+
+        Called via Thread.start() via PantsDaemon.run().
+        """
+        set_daemon_uploader_active(True)
+        try:
+            while not self._state.is_terminating:
+                try:
+                    self._uploader.drain()
+                except Exception as e:  # Broad catch - we don't want to fail pantsd over stats.
+                    logger.warning(f"Failed to upload spooled stats: {e!r}")
+                # See StoreGCService: wake up periodically, or when paused and then resumed.
+                self._state.maybe_pause(timeout=self._period_secs)
+        finally:
+            set_daemon_uploader_active(False)
@@ -0,0 +1,274 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import json
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from pants.option.subsystem import Subsystem
+from pants.util.dirutil import safe_file_dump
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WorkunitSpan:
+    """The timing of a single workunit, as reported to streaming workunit handlers."""
+
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    description: Optional[str]
+    level: Optional[str]
+    start_micros: int
+    # None if the workunit had not completed by the end of the run.
+    end_micros: Optional[int]
+
+    @classmethod
+    def from_workunit(cls, workunit: Mapping[str, Any]) -> "WorkunitSpan":
+        start_micros = workunit["start_secs"] * 1000000 + workunit["start_nanos"] // 1000
+        end_micros = None
+        if "duration_secs" in workunit:
+            duration_micros = (
+                workunit["duration_secs"] * 1000000 + workunit["duration_nanos"] // 1000
+            )
+            end_micros = start_micros + duration_micros
+        return cls(
+            span_id=workunit["span_id"],
+            parent_id=workunit.get("parent_id"),
+            name=workunit["name"],
+            description=workunit.get("description"),
+            level=workunit.get("level"),
+            start_micros=start_micros,
+            end_micros=end_micros,
+        )
+
+    def end_or(self, default_micros: int) -> int:
+        return self.end_micros if self.end_micros is not None else default_micros
+
+
+@dataclass(frozen=True)
+class CriticalPathEntry:
+    """A workunit on the critical path, and the time it spent not waiting on its successor."""
+
+    span: WorkunitSpan
+    duration_micros: int
+    self_micros: int
+
+
+class WorkunitTrace:
+    """Accumulates workunits over a run, and renders them as a trace and a critical path."""
+
+    def __init__(self) -> None:
+        self._spans: Dict[str, WorkunitSpan] = {}
+
+    def add_started(self, workunits: Iterable[Mapping[str, Any]]) -> None:
+        for workunit in workunits:
+            # A completed workunit may be reported in the same poll as its start.
+            self._spans.setdefault(workunit["span_id"], WorkunitSpan.from_workunit(workunit))
+
+    def add_completed(self, workunits: Iterable[Mapping[str, Any]]) -> None:
+        for workunit in workunits:
+            self._spans[workunit["span_id"]] = WorkunitSpan.from_workunit(workunit)
+
+    @property
+    def spans(self) -> Tuple[WorkunitSpan, ...]:
+        return tuple(self._spans.values())
+
+    def _run_end_micros(self) -> int:
+        return max(
+            (span.end_or(span.start_micros) for span in self._spans.values()),
+            default=0,
+        )
+
+    def _children(self) -> Dict[Optional[str], List[WorkunitSpan]]:
+        children: Dict[Optional[str], List[WorkunitSpan]] = defaultdict(list)
+        for span in self._spans.values():
+            # Workunits whose parent was filtered out (e.g. by level) are treated as roots.
+            parent_id = span.parent_id if span.parent_id in self._spans else None
+            children[parent_id].append(span)
+        return children
+
+    def critical_path(self) -> Tuple[CriticalPathEntry, ...]:
+        """The chain of workunits which bounded the wall time of the run.
+
+        Starting from the root workunit which finished last, we repeatedly descend into the child
+        which finished last, as the parent could not complete before it did. Each entry's
+        `self_micros` is the part of its duration not covered by the next entry on the path.
+        """
+        if not self._spans:
+            return ()
+        run_end = self._run_end_micros()
+        children = self._children()
+
+        def latest(spans: List[WorkunitSpan]) -> WorkunitSpan:
+            # Ties are broken towards the longer span, and then deterministically by id.
+            return max(spans, key=lambda s: (s.end_or(run_end), -s.start_micros, s.span_id))
+
+        path: List[WorkunitSpan] = [latest(children[None])]
+        while children.get(path[-1].span_id):
+            path.append(latest(children[path[-1].span_id]))
+
+        entries = []
+        for i, span in enumerate(path):
+            duration = span.end_or(run_end) - span.start_micros
+            successor = path[i + 1] if i + 1 < len(path) else None
+            covered = successor.end_or(run_end) - successor.start_micros if successor else 0
+            entries.append(
+                CriticalPathEntry(
+                    span=span, duration_micros=duration, self_micros=max(0, duration - covered)
+                )
+            )
+        return tuple(entries)
+
+    def chrome_trace_events(self) -> List[Dict[str, Any]]:
+        """Render as Chrome trace-event "complete" events, viewable in chrome://tracing or Perfetto.
+
+        Trace viewers require the events on one thread id to be properly nested, so we allocate
+        concurrent workunits to lanes (rendered as threads), preferring the lane of the parent.
+        """
+        run_end = self._run_end_micros()
+        spans = sorted(
+            self._spans.values(), key=lambda s: (s.start_micros, -s.end_or(run_end), s.span_id)
+        )
+        # Each lane holds the end times of its currently open spans, innermost last.
+        lanes: List[List[int]] = []
+        lane_of: Dict[str, int] = {}
+
+        def fits(lane: List[int], start: int, end: int) -> bool:
+            while lane and lane[-1] <= start:
+                lane.pop()
+            return not lane or end <= lane[-1]
+
+        events = []
+        for span in spans:
+            start, end = span.start_micros, span.end_or(run_end)
+            parent_lane = lane_of.get(span.parent_id) if span.parent_id else None
+            candidates = ([parent_lane] if parent_lane is not None else []) + list(
+                range(len(lanes))
+            )
+            lane_index = next((i for i in candidates if fits(lanes[i], start, end)), None)
+            if lane_index is None:
+                lanes.append([])
+                lane_index = len(lanes) - 1
+            lanes[lane_index].append(end)
+            lane_of[span.span_id] = lane_index
+
+            args: Dict[str, Any] = {"span_id": span.span_id}
+            if span.parent_id:
+                args["parent_id"] = span.parent_id
+            if span.level:
+                args["level"] = span.level
+            if span.end_micros is None:
+                args["incomplete"] = True
+            events.append(
+                {
+                    "name": span.description or span.name,
+                    "cat": span.name,
+                    "ph": "X",
+                    "ts": start,
+                    "dur": end - start,
+                    "pid": 1,
+                    "tid": lane_index + 1,
+                    "args": args,
+                }
+            )
+        return events
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        critical_path = self.critical_path()
+        return {
+            "traceEvents": self.chrome_trace_events(),
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "critical_path": [
+                    {
+                        "name": entry.span.name,
+                        "description": entry.span.description,
+                        "span_id": entry.span.span_id,
+                        "duration_secs": entry.duration_micros / 1000000,
+                        "self_secs": entry.self_micros / 1000000,
+                    }
+                    for entry in critical_path
+                ],
+            },
+        }
+
+    def critical_path_summary(self, limit: int = 10) -> str:
+        """A human-readable summary of the workunits which contributed most to the critical path."""
+        critical_path = self.critical_path()
+        if not critical_path:
+            return "No workunits were recorded."
+        total_micros = critical_path[0].duration_micros
+        lines = [f"Critical path ({total_micros / 1000000:.3f}s total):"]
+        for entry in sorted(critical_path, key=lambda e: e.self_micros, reverse=True)[:limit]:
+            label = entry.span.description or entry.span.name
+            lines.append(f"  {entry.self_micros / 1000000:8.3f}s  {label}")
+        return "\n".join(lines)
+
+
+class ChromeTrace(Subsystem):
+    """Records engine workunits and writes them as a Chrome trace, along with the critical path.
+
+    Enable with `--streaming-workunits-handlers="['pants.reporting.chrome_trace.ChromeTrace']"`,
+    then load the trace file in chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    options_scope = "chrome-trace"
+
+    @classmethod
+    def register_options(cls, register):
+        super().register_options(register)
+        register(
+            "--output-file",
+            advanced=True,
+            type=str,
+            default=None,
+            help="Where to write the trace. Defaults to `trace.json` in the run's workdir, i.e. "
+            "`.pants.d/run-tracker/trace.json`.",
+        )
+        register(
+            "--log-critical-path",
+            advanced=True,
+            type=bool,
+            default=True,
+            help="Log a summary of the workunits on the critical path at the end of the run.",
+        )
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._trace = WorkunitTrace()
+
+    @property
+    def output_file(self) -> str:
+        output_file = self.options.output_file
+        if output_file:
+            return str(output_file)
+        return os.path.join(self.options.pants_workdir, "run-tracker", "trace.json")
+
+    def handle_workunits(
+        self,
+        *,
+        started_workunits: Iterable[Mapping[str, Any]],
+        completed_workunits: Iterable[Mapping[str, Any]],
+        finished: bool,
+        **kwargs,
+    ) -> None:
+        self._trace.add_started(started_workunits)
+        self._trace.add_completed(completed_workunits)
+        if not finished:
+            return
+        # Subsystem instances may be reused across runs in pantsd, so the next run starts afresh
+        # even if we fail to write this run's trace.
+        trace, self._trace = self._trace, WorkunitTrace()
+        try:
+            safe_file_dump(self.output_file, json.dumps(trace.to_chrome_trace()), mode="w")
+        except Exception as e:  # Broad catch - we don't want to fail the build over a trace.
+            logger.warning(f"Failed to write the Chrome trace to {self.output_file}: {e!r}")
+            return
+        logger.info(f"Wrote a Chrome trace of {len(trace.spans)} workunits to {self.output_file}.")
+        if self.options.log_critical_path:
+            logger.info(trace.critical_path_summary())
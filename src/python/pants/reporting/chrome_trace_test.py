@@ -0,0 +1,110 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pants.reporting.chrome_trace import ChromeTrace, WorkunitTrace
+from pants.testutil.option_util import create_subsystem
+
+
+def workunit(
+    span_id: str, start: float, end: Optional[float], parent_id: Optional[str] = None
+) -> Dict[str, Any]:
+    start_micros = int(start * 1000000)
+    result: Dict[str, Any] = {
+        "name": f"rule_{span_id}",
+        "span_id": span_id,
+        "level": "INFO",
+        "start_secs": start_micros // 1000000,
+        "start_nanos": (start_micros % 1000000) * 1000,
+    }
+    if parent_id:
+        result["parent_id"] = parent_id
+    if end is not None:
+        duration_micros = int(end * 1000000) - start_micros
+        result["duration_secs"] = duration_micros // 1000000
+        result["duration_nanos"] = (duration_micros % 1000000) * 1000
+    return result
+
+
+def build_trace() -> WorkunitTrace:
+    # root runs from 0-10s. Its children `a` (0-4s) and `b` (1-9s) run concurrently, and `b` waits
+    # on `c` (2-8s). So the critical path is root -> b -> c.
+    trace = WorkunitTrace()
+    trace.add_started([workunit("root", 100, None), workunit("a", 100, None, parent_id="root")])
+    trace.add_completed([workunit("a", 100, 104, parent_id="root")])
+    trace.add_completed(
+        [
+            workunit("c", 102, 108, parent_id="b"),
+            workunit("b", 101, 109, parent_id="root"),
+            workunit("root", 100, 110),
+        ]
+    )
+    return trace
+
+
+def test_critical_path() -> None:
+    critical_path = build_trace().critical_path()
+    assert [entry.span.span_id for entry in critical_path] == ["root", "b", "c"]
+    assert [entry.duration_micros for entry in critical_path] == [10000000, 8000000, 6000000]
+    assert [entry.self_micros for entry in critical_path] == [2000000, 2000000, 6000000]
+    assert "Critical path (10.000s total)" in build_trace().critical_path_summary()
+
+
+def test_critical_path_incomplete_workunits() -> None:
+    trace = WorkunitTrace()
+    trace.add_started([workunit("root", 100, None), workunit("a", 101, None, parent_id="root")])
+    trace.add_completed([workunit("b", 100, 103, parent_id="root"), workunit("d", 104, 105)])
+    # Workunits which never completed are treated as running until the end of the run.
+    assert [entry.span.span_id for entry in trace.critical_path()] == ["root", "a"]
+    assert WorkunitTrace().critical_path() == ()
+
+
+def test_chrome_trace_events_are_nested_per_lane() -> None:
+    events = build_trace().to_chrome_trace()["traceEvents"]
+    by_id = {event["args"]["span_id"]: event for event in events}
+    assert set(by_id) == {"root", "a", "b", "c"}
+    assert by_id["root"]["ts"] == 100000000
+    assert by_id["root"]["dur"] == 10000000
+
+    lanes: Dict[int, List[Dict[str, Any]]] = {}
+    for event in events:
+        lanes.setdefault(event["tid"], []).append(event)
+    # `a` and `b` overlap without nesting, so they must be on different lanes.
+    assert by_id["a"]["tid"] != by_id["b"]["tid"]
+    for lane_events in lanes.values():
+        for i, outer in enumerate(lane_events):
+            for inner in lane_events[i + 1 :]:
+                disjoint = (
+                    inner["ts"] >= outer["ts"] + outer["dur"]
+                    or outer["ts"] >= inner["ts"] + inner["dur"]
+                )
+                nested = (
+                    outer["ts"] <= inner["ts"]
+                    and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+                )
+                assert disjoint or nested
+
+
+def test_trace_is_reset_when_writing_fails(tmp_path: Path) -> None:
+    output_file = tmp_path / "trace.json"
+    chrome_trace = create_subsystem(
+        ChromeTrace, output_file=str(output_file), log_critical_path=False
+    )
+
+    # The output file is a directory, so writing the first run's trace fails.
+    output_file.mkdir()
+    chrome_trace.handle_workunits(
+        started_workunits=[], completed_workunits=[workunit("first", 100, 101)], finished=True
+    )
+    assert list(output_file.iterdir()) == []
+
+    # The next run's trace must not include the first run's workunits.
+    output_file.rmdir()
+    chrome_trace.handle_workunits(
+        started_workunits=[], completed_workunits=[workunit("second", 200, 201)], finished=True
+    )
+    trace = json.loads(output_file.read_text())
+    assert [event["args"]["span_id"] for event in trace["traceEvents"]] == ["second"]
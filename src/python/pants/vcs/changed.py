@@ -60,10 +60,11 @@ class ChangedOptions:
     since: Optional[str]
     diffspec: Optional[str]
     dependees: DependeesOption
+    test_impact: bool = False
 
     @classmethod
     def from_options(cls, options: OptionValueContainer) -> "ChangedOptions":
-        return cls(options.since, options.diffspec, options.dependees)
+        return cls(options.since, options.diffspec, options.dependees, options.test_impact)
 
     @property
     def provided(self) -> bool:
@@ -111,6 +112,17 @@ class Changed(Subsystem):
             default=DependeesOption.NONE,
             help="Include direct or transitive dependees of changed targets.",
         )
+        register(
+            "--test-impact",
+            type=bool,
+            default=False,
+            help=(
+                "Of the test targets which would otherwise be selected (e.g. via `--dependees`), "
+                "only select those whose coverage included a changed file the last time that they "
+                "ran with `--test-use-coverage`. Changed files which no test has covered (e.g. "
+                "new files) fall back to selecting their dependees as usual."
+            ),
+        )
 
 
 def rules():
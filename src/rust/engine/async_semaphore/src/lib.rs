@@ -27,16 +27,21 @@
 // Arc<Mutex> can be more clear than needing to grok Orderings:
 #![allow(clippy::mutex_atomic)]
 
+use std::cmp;
 use std::collections::VecDeque;
 use std::future::Future;
 use std::sync::Arc;
 
 use parking_lot::Mutex;
-use tokio::sync::{Semaphore, SemaphorePermit};
+use tokio::sync::{Mutex as AsyncMutex, Semaphore, SemaphorePermit};
 
 struct Inner {
   sema: Semaphore,
+  permits: usize,
   available_ids: Mutex<VecDeque<usize>>,
+  // Held while acquiring more than one permit, so that two weighted acquirers cannot each hold
+  // some of the permits that the other is waiting for.
+  weighted_acquisition: AsyncMutex<()>,
 }
 
 #[derive(Clone)]
@@ -54,7 +59,9 @@ impl AsyncSemaphore {
     AsyncSemaphore {
       inner: Arc::new(Inner {
         sema: Semaphore::new(permits),
+        permits,
         available_ids: Mutex::new(available_ids),
+        weighted_acquisition: AsyncMutex::new(()),
       }),
     }
   }
@@ -71,39 +78,68 @@ impl AsyncSemaphore {
     F: FnOnce(usize) -> B + Send + 'static,
     B: Future<Output = O> + Send + 'static,
   {
-    let permit = self.acquire().await;
-    let res = f(permit.id).await;
+    self.with_acquired_weighted(1, f).await
+  }
+
+  ///
+  /// Runs the given Future-creating function (and the Future it returns) while holding `weight`
+  /// permits of the semaphore. The weight is clamped to between one and the total number of
+  /// permits, so that a heavy task can always eventually run (alone).
+  ///
+  /// The function is called with the id of the first of the acquired permits.
+  ///
+  pub async fn with_acquired_weighted<F, B, O>(self, weight: usize, f: F) -> O
+  where
+    F: FnOnce(usize) -> B + Send + 'static,
+    B: Future<Output = O> + Send + 'static,
+  {
+    let permit = self.acquire(weight).await;
+    let res = f(permit.ids[0]).await;
     drop(permit);
     res
   }
 
-  async fn acquire(&self) -> Permit<'_> {
-    let permit = self.inner.sema.acquire().await;
-    let id = {
+  async fn acquire(&self, weight: usize) -> Permit<'_> {
+    let weight = cmp::max(1, cmp::min(weight, self.inner.permits));
+    let permits = if weight == 1 {
+      vec![self.inner.sema.acquire().await]
+    } else {
+      let _guard = self.inner.weighted_acquisition.lock().await;
+      let mut permits = Vec::with_capacity(weight);
+      for _ in 0..weight {
+        permits.push(self.inner.sema.acquire().await);
+      }
+      permits
+    };
+    let ids = {
       let mut available_ids = self.inner.available_ids.lock();
-      available_ids
-        .pop_front()
-        .expect("More permits were distributed than ids exist.")
+      (0..weight)
+        .map(|_| {
+          available_ids
+            .pop_front()
+            .expect("More permits were distributed than ids exist.")
+        })
+        .collect()
     };
     Permit {
       inner: self.inner.clone(),
-      _permit: permit,
-      id,
+      _permits: permits,
+      ids,
     }
   }
 }
 
 pub struct Permit<'a> {
   inner: Arc<Inner>,
-  // NB: Kept for its `Drop` impl.
-  _permit: SemaphorePermit<'a>,
-  id: usize,
+  // NB: Kept for their `Drop` impl.
+  _permits: Vec<SemaphorePermit<'a>>,
+  ids: Vec<usize>,
 }
 
 impl<'a> Drop for Permit<'a> {
   fn drop(&mut self) {
     let mut available_ids = self.inner.available_ids.lock();
-    available_ids.push_back(self.id);
+    available_ids.extend(self.ids.drain(..));
   }
 }
 
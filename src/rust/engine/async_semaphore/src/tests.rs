@@ -235,7 +235,7 @@ async fn drop_while_waiting() {
 
   // thread2 will wait for a little while, but then drop its PermitFuture to give up on waiting.
   tokio::spawn(async move {
-    let permit_future = handle2.acquire().boxed();
+    let permit_future = handle2.acquire(1).boxed();
     let delay_future = delay_for(Duration::from_millis(100));
     let raced_result = future::select(delay_future, permit_future).await;
     // We expect to have timed out, because the other Future will not resolve until asked.
@@ -327,3 +327,57 @@ async fn dropped_future_is_removed_from_queue() {
   }
   assert_eq!(1, sema.available_permits());
 }
+
+#[tokio::test]
+async fn weighted_acquisition() {
+  let sema = AsyncSemaphore::new(3);
+  let handle1 = sema.clone();
+  let handle2 = sema.clone();
+  let handle3 = sema.clone();
+
+  let (tx_thread1, acquired_thread1) = oneshot::channel();
+  let (unblock_thread1, rx_thread1) = oneshot::channel::<()>();
+  let (tx_thread2, mut acquired_thread2) = oneshot::channel();
+  let (tx_thread3, acquired_thread3) = oneshot::channel();
+
+  // Take two of the three permits.
+  let join_handle1 = tokio::spawn(handle1.with_acquired_weighted(2, move |id| async move {
+    tx_thread1.send(id).unwrap();
+    rx_thread1.await.unwrap();
+    future::ready(())
+  }));
+  if let Err(_) = timeout(Duration::from_secs(5), acquired_thread1).await {
+    panic!("thread1 didn't acquire.");
+  }
+  assert_eq!(1, sema.available_permits());
+
+  // A task which needs two permits must wait, even though one is available. And a task which
+  // asks for more permits than exist is clamped to all of them, and waits behind it.
+  tokio::spawn(handle2.with_acquired_weighted(2, move |id| async move {
+    tx_thread2.send(id).unwrap();
+    future::ready(())
+  }));
+  tokio::spawn(handle3.with_acquired_weighted(10, move |_id| async move {
+    tx_thread3.send(()).unwrap();
+    future::ready(())
+  }));
+  delay_for(Duration::from_millis(100)).await;
+  assert_eq!(Ok(None), acquired_thread2.try_recv());
+  // The waiting task reserves the available permit in the meantime, so that it cannot be starved
+  // by tasks which need fewer permits.
+  assert_eq!(0, sema.available_permits());
+
+  unblock_thread1.send(()).unwrap();
+  if let Err(_) = timeout(Duration::from_secs(5), join_handle1).await {
+    panic!("thread1 didn't exit.");
+  }
+  match timeout(Duration::from_secs(5), acquired_thread2).await {
+    Ok(Ok(id)) => assert_eq!(id, 3),
+    _ => panic!("thread2 didn't acquire."),
+  }
+  if let Err(_) = timeout(Duration::from_secs(5), acquired_thread3).await {
+    panic!("thread3 didn't acquire.");
+  }
+  delay_for(Duration::from_millis(10)).await;
+  assert_eq!(3, sema.available_permits());
+}
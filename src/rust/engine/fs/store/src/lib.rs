@@ -46,7 +46,7 @@ use fs::{default_cache_path, FileContent, RelativePath};
 use futures::compat::Future01CompatExt;
 use futures::future::{self as future03, Either, FutureExt, TryFutureExt};
 use futures01::{future, Future};
-use hashing::Digest;
+use hashing::{Digest, WriterHasher};
 use protobuf::Message;
 use serde_derive::Serialize;
 pub use serverset::BackoffConfig;
@@ -55,7 +55,7 @@ use std::collections::{BTreeMap, HashMap, HashSet};
 use std::convert::TryInto;
 use std::fs::OpenOptions;
 use std::io::Write;
-use std::os::unix::fs::OpenOptionsExt;
+use std::os::unix::fs::{OpenOptionsExt, PermissionsExt};
 use std::path::{Path, PathBuf};
 use std::sync::Arc;
 use std::time::{Duration, Instant, SystemTime};
@@ -195,6 +195,20 @@ enum RootOrParentMetadataBuilder {
 pub struct Store {
   local: local::ByteStore,
   remote: Option<remote::ByteStore>,
+  // Files which were written (or verified) by `materialize_directory_incremental`, keyed by their
+  // destination.
+  materialized: Arc<Mutex<HashMap<PathBuf, MaterializedFile>>>,
+}
+
+///
+/// The on-disk metadata of a file whose content was known to match a Digest, which allows
+/// `materialize_directory_incremental` to skip re-hashing the file if it is unchanged since.
+///
+#[derive(Clone, Copy, Debug, Eq, PartialEq)]
+struct MaterializedFile {
+  digest: Digest,
+  len: u64,
+  modified: SystemTime,
 }
 
 #[derive(Clone, Copy, Debug, Eq, PartialEq)]
@@ -230,6 +244,7 @@ impl Store {
     Ok(Store {
       local: local::ByteStore::new(executor, path)?,
       remote: None,
+      materialized: Arc::new(Mutex::new(HashMap::new())),
     })
   }
 
@@ -243,6 +258,7 @@ impl Store {
     Store {
       local: self.local,
       remote: None,
+      materialized: self.materialized,
     }
   }
 
@@ -278,6 +294,7 @@ impl Store {
         rpc_retries,
         connection_limit,
       )?),
+      materialized: Arc::new(Mutex::new(HashMap::new())),
     })
   }
 
@@ -802,6 +819,30 @@ impl Store {
     &self,
     destination: PathBuf,
     digest: Digest,
+  ) -> BoxFuture<DirectoryMaterializeMetadata, String> {
+    self.materialize_directory_with(destination, digest, false)
+  }
+
+  ///
+  /// Like `materialize_directory`, but for a destination which may already contain (some of) the
+  /// directory: files which already have the expected content and permissions are left untouched.
+  ///
+  /// A file is known to be unchanged if its size and modification time match those recorded when
+  /// this Store last wrote or verified it; otherwise, its content is hashed to check it.
+  ///
+  pub fn materialize_directory_incremental(
+    &self,
+    destination: PathBuf,
+    digest: Digest,
+  ) -> BoxFuture<DirectoryMaterializeMetadata, String> {
+    self.materialize_directory_with(destination, digest, true)
+  }
+
+  fn materialize_directory_with(
+    &self,
+    destination: PathBuf,
+    digest: Digest,
+    incremental: bool,
   ) -> BoxFuture<DirectoryMaterializeMetadata, String> {
     let root = Arc::new(Mutex::new(None));
     self
@@ -809,6 +850,7 @@ impl Store {
         destination,
         RootOrParentMetadataBuilder::Root(root.clone()),
         digest,
+        incremental,
       )
       .and_then(move |()| Ok(Arc::try_unwrap(root).unwrap().into_inner().unwrap().build()))
       .to_boxed()
@@ -819,6 +861,7 @@ impl Store {
     destination: PathBuf,
     root_or_parent_metadata: RootOrParentMetadataBuilder,
     digest: Digest,
+    incremental: bool,
   ) -> BoxFuture<(), String> {
     let store = self.clone();
     async move {
@@ -881,8 +924,12 @@ impl Store {
           let digest = try_future!(file_node.get_digest().try_into());
           let child_files = child_files.clone();
           let name = file_node.get_name().to_owned();
-          store
-            .materialize_file(path, digest, file_node.is_executable)
+          let materialize = if incremental {
+            store.materialize_file_incremental(path, digest, file_node.is_executable)
+          } else {
+            store.materialize_file(path, digest, file_node.is_executable)
+          };
+          materialize
             .map(move |metadata| child_files.lock().insert(name, metadata))
             .to_boxed()
         })
@@ -901,7 +948,7 @@ impl Store {
             child_files.clone(),
           ));
 
-          store.materialize_directory_helper(path, builder, digest)
+          store.materialize_directory_helper(path, builder, digest, incremental)
         })
         .collect::<Vec<_>>();
       let _ = future::join_all(file_futures)
@@ -955,6 +1002,87 @@ impl Store {
     res.boxed().compat().to_boxed()
   }
 
+  fn materialize_file_incremental(
+    &self,
+    destination: PathBuf,
+    digest: Digest,
+    is_executable: bool,
+  ) -> BoxFuture<LoadMetadata, String> {
+    let store = self.clone();
+    let res = async move {
+      let is_materialized = {
+        let executor = store.local.executor().clone();
+        let store = store.clone();
+        let destination = destination.clone();
+        executor
+          .spawn_blocking(move || store.is_materialized(&destination, digest, is_executable))
+          .await
+      };
+      if is_materialized {
+        return Ok(LoadMetadata::Local);
+      }
+      let metadata = store
+        .materialize_file(destination.clone(), digest, is_executable)
+        .compat()
+        .await?;
+      store.record_materialized(&destination, digest);
+      Ok(metadata)
+    };
+    res.boxed().compat().to_boxed()
+  }
+
+  ///
+  /// Returns true if the file at `destination` already has the content of `digest` and the given
+  /// executable bit. This is blocking, as it may need to hash the file.
+  ///
+  fn is_materialized(&self, destination: &Path, digest: Digest, is_executable: bool) -> bool {
+    let metadata = match std::fs::symlink_metadata(destination) {
+      Ok(metadata) if metadata.is_file() => metadata,
+      _ => return false,
+    };
+    if metadata.len() != digest.1 as u64
+      || (metadata.permissions().mode() & 0o111 != 0) != is_executable
+    {
+      return false;
+    }
+    if let Ok(modified) = metadata.modified() {
+      let expected = MaterializedFile {
+        digest,
+        len: metadata.len(),
+        modified,
+      };
+      if self.materialized.lock().get(destination) == Some(&expected) {
+        return true;
+      }
+    }
+
+    let actual_digest = std::fs::File::open(destination).and_then(|mut file| {
+      let mut hasher = WriterHasher::new(std::io::sink());
+      std::io::copy(&mut file, &mut hasher)?;
+      Ok(hasher.finish().0)
+    });
+    let is_materialized = actual_digest.map(|d| d == digest).unwrap_or(false);
+    if is_materialized {
+      self.record_materialized(destination, digest);
+    }
+    is_materialized
+  }
+
+  fn record_materialized(&self, destination: &Path, digest: Digest) {
+    if let Ok(metadata) = std::fs::symlink_metadata(destination) {
+      if let Ok(modified) = metadata.modified() {
+        self.materialized.lock().insert(
+          destination.to_owned(),
+          MaterializedFile {
+            digest,
+            len: metadata.len(),
+            modified,
+          },
+        );
+      }
+    }
+  }
+
   ///
   /// Returns files sorted by their path.
   ///
@@ -16,7 +16,7 @@ use std;
 use std::collections::HashMap;
 use std::fs::File;
 use std::io::Read;
-use std::os::unix::fs::PermissionsExt;
+use std::os::unix::fs::{MetadataExt, PermissionsExt};
 use std::path::{Path, PathBuf};
 use std::time::Duration;
 use tempfile::TempDir;
@@ -1124,6 +1124,51 @@ async fn materialize_directory() {
   );
 }
 
+#[tokio::test]
+async fn materialize_directory_incremental() {
+  let materialize_dir = TempDir::new().unwrap();
+
+  let catnip = TestData::catnip();
+  let testdir = TestDirectory::with_mixed_executable_files();
+
+  let store_dir = TempDir::new().unwrap();
+  let store = new_local_store(store_dir.path());
+  store
+    .record_directory(&testdir.directory(), false)
+    .await
+    .expect("Error saving Directory");
+  store
+    .store_file_bytes(catnip.bytes(), false)
+    .await
+    .expect("Error saving catnip file bytes");
+
+  let feed = materialize_dir.path().join("feed");
+  let food = materialize_dir.path().join("food");
+
+  store
+    .materialize_directory_incremental(materialize_dir.path().to_owned(), testdir.digest())
+    .compat()
+    .await
+    .expect("Error materializing");
+
+  // Hardlink the unmodified file, so that we can tell whether it is replaced. Then modify the
+  // other file, and materialize again: only the modified file should be rewritten.
+  let feed_link = materialize_dir.path().join("feed_link");
+  std::fs::hard_link(&feed, &feed_link).unwrap();
+  std::fs::write(&food, b"not catnip").unwrap();
+  store
+    .materialize_directory_incremental(materialize_dir.path().to_owned(), testdir.digest())
+    .compat()
+    .await
+    .expect("Error materializing");
+
+  assert_eq!(std::fs::metadata(&feed).unwrap().nlink(), 2);
+  assert_eq!(file_contents(&feed), catnip.bytes());
+  assert_eq!(file_contents(&food), catnip.bytes());
+  assert!(is_executable(&feed));
+  assert!(!is_executable(&food));
+}
+
 #[tokio::test]
 async fn materialize_directory_executable() {
   let materialize_dir = TempDir::new().unwrap();
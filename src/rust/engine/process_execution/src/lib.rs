@@ -223,6 +223,20 @@ pub struct Process {
   pub is_nailgunnable: bool,
 
   pub cache_failures: bool,
+
+  ///
+  /// The number of local execution slots (roughly: cores) this process is expected to use while
+  /// running. Only used as a scheduling hint by the BoundedCommandRunner.
+  ///
+  #[derivative(PartialEq = "ignore", Hash = "ignore")]
+  pub cpu_weight: usize,
+
+  ///
+  /// The peak memory in MiB that this process is expected to use, or 0 if unknown. Only used as a
+  /// scheduling hint by the BoundedCommandRunner.
+  ///
+  #[derivative(PartialEq = "ignore", Hash = "ignore")]
+  pub memory_mb: usize,
 }
 
 impl Process {
@@ -253,6 +267,8 @@ impl Process {
       is_nailgunnable: false,
       execution_slot_variable: None,
       cache_failures: false,
+      cpu_weight: 1,
+      memory_mb: 0,
     }
   }
 
@@ -363,7 +379,8 @@ pub struct ProcessMetadata {
 ///
 /// The result of running a process.
 ///
-#[derive(Clone, Debug, Eq, PartialEq)]
+#[derive(Derivative, Clone, Debug, Eq)]
+#[derivative(PartialEq)]
 pub struct FallibleProcessResultWithPlatform {
   pub stdout_digest: Digest,
   pub stderr_digest: Digest,
@@ -375,6 +392,20 @@ pub struct FallibleProcessResultWithPlatform {
   pub output_directory: hashing::Digest,
 
   pub execution_attempts: Vec<ExecutionStats>,
+
+  ///
+  /// Metadata about how the process ran, such as its timing. Like `Process`'s scheduling hints,
+  /// this doesn't affect the result, so it doesn't participate in equality: otherwise, two
+  /// identical runs would compare unequal, and the engine would re-run the nodes depending on them.
+  ///
+  #[derivative(PartialEq = "ignore")]
+  pub metadata: ProcessResultMetadata,
+}
+
+#[derive(Clone, Debug, Default, Eq, PartialEq)]
+pub struct ProcessResultMetadata {
+  // The time taken to run the process, if it actually ran (rather than e.g. being a cache hit).
+  pub total_elapsed: Option<Duration>,
 }
 
 #[derive(Clone, Copy, Debug, Default, Eq, PartialEq)]
@@ -462,18 +493,66 @@ pub fn digest(req: MultiPlatformProcess, metadata: &ProcessMetadata) -> Digest {
   )
 }
 
+///
+/// How a BoundedCommandRunner weighs each request against its bound.
+///
+#[derive(Clone, Copy, Debug, Eq, PartialEq)]
+pub enum ResourceWeights {
+  ///
+  /// Every request counts as one slot.
+  ///
+  Uniform,
+  ///
+  /// Requests occupy as many slots as their `cpu_weight`, or as their `memory_mb` divided by the
+  /// given memory budget per slot (if any), whichever is larger.
+  ///
+  Hinted { memory_mb_per_slot: Option<usize> },
+}
+
 ///
 /// A CommandRunner wrapper that limits the number of concurrent requests.
 ///
 #[derive(Clone)]
 pub struct BoundedCommandRunner {
   inner: Arc<(Box<dyn CommandRunner>, AsyncSemaphore)>,
+  weights: ResourceWeights,
 }
 
 impl BoundedCommandRunner {
   pub fn new(inner: Box<dyn CommandRunner>, bound: usize) -> BoundedCommandRunner {
+    Self::new_weighted(inner, bound, ResourceWeights::Uniform)
+  }
+
+  pub fn new_weighted(
+    inner: Box<dyn CommandRunner>,
+    bound: usize,
+    weights: ResourceWeights,
+  ) -> BoundedCommandRunner {
     BoundedCommandRunner {
       inner: Arc::new((inner, AsyncSemaphore::new(bound))),
+      weights,
+    }
+  }
+
+  ///
+  /// The number of slots that the given request should occupy. The semaphore clamps this to its
+  /// bound, so that a request which is heavier than the whole machine still runs (alone).
+  ///
+  fn weight(&self, req: &MultiPlatformProcess) -> usize {
+    match self.weights {
+      ResourceWeights::Uniform => 1,
+      ResourceWeights::Hinted { memory_mb_per_slot } => req
+        .0
+        .values()
+        .map(|process| {
+          let memory_weight = match memory_mb_per_slot {
+            Some(per_slot) if per_slot > 0 => (process.memory_mb + per_slot - 1) / per_slot,
+            _ => 0,
+          };
+          std::cmp::max(process.cpu_weight, memory_weight)
+        })
+        .max()
+        .unwrap_or(1),
     }
   }
 }
@@ -497,14 +576,16 @@ impl CommandRunner for BoundedCommandRunner {
     let bounded_fut = {
       let inner = self.inner.clone();
       let semaphore = self.inner.1.clone();
+      let weight = self.weight(&req);
       let context = context.clone();
       let name = format!("{}-running", req.workunit_name());
 
-      semaphore.with_acquired(move |concurrency_id| {
+      semaphore.with_acquired_weighted(weight, move |concurrency_id| {
         log::debug!(
-          "Running {} under semaphore with concurrency id: {}",
+          "Running {} under semaphore with concurrency id: {} and weight: {}",
           desc,
-          concurrency_id
+          concurrency_id,
+          weight
         );
         let mut metadata = WorkunitMetadata::with_level(req.workunit_level());
         metadata.desc = Some(desc);
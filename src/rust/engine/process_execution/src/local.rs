@@ -32,7 +32,7 @@ use tokio_util::codec::{BytesCodec, FramedRead};
 
 use crate::{
   Context, FallibleProcessResultWithPlatform, MultiPlatformProcess, NamedCaches, Platform,
-  PlatformConstraint, Process,
+  PlatformConstraint, Process, ProcessResultMetadata,
 };
 
 use bytes::{Bytes, BytesMut};
@@ -506,6 +506,7 @@ pub trait CapturedWorkdir {
     // code. The idea going forward though is we eventually want to pass incremental results on
     // down the line for streaming process results to console logs, etc. as tracked by:
     //   https://github.com/pantsbuild/pants/issues/6089
+    let start_time = std::time::Instant::now();
     let child_results_result = {
       let child_results_future = ChildResults::collect_from(
         self
@@ -604,6 +605,9 @@ export {}
       }
     }
 
+    let metadata = ProcessResultMetadata {
+      total_elapsed: Some(start_time.elapsed()),
+    };
     match child_results_result {
       Ok(child_results) => {
         let stdout = child_results.stdout;
@@ -619,6 +623,7 @@ export {}
           output_directory: output_snapshot.digest,
           execution_attempts: vec![],
           platform,
+          metadata,
         })
       }
       Err(msg) if msg == "deadline has elapsed" => {
@@ -635,6 +640,7 @@ export {}
           output_directory: hashing::EMPTY_DIGEST,
           execution_attempts: vec![],
           platform,
+          metadata,
         })
       }
       Err(msg) => Err(msg),
@@ -66,6 +66,8 @@ fn construct_nailgun_server_request(
     is_nailgunnable: true,
     execution_slot_variable: None,
     cache_failures: false,
+    cpu_weight: 1,
+    memory_mb: 0,
   }
 }
 
@@ -31,7 +31,7 @@ use workunit_store::{with_workunit, SpanId, WorkunitMetadata, WorkunitStore};
 
 use crate::{
   Context, ExecutionStats, FallibleProcessResultWithPlatform, MultiPlatformProcess, Platform,
-  PlatformConstraint, Process, ProcessMetadata,
+  PlatformConstraint, Process, ProcessMetadata, ProcessResultMetadata,
 };
 
 // Environment variable which is exclusively used for cache key invalidation.
@@ -1081,6 +1081,7 @@ pub async fn populate_fallible_execution_result_for_timeout(
     output_directory: hashing::EMPTY_DIGEST,
     execution_attempts,
     platform,
+    metadata: ProcessResultMetadata::default(),
   })
 }
 
@@ -1114,6 +1115,7 @@ pub fn populate_fallible_execution_result(
         output_directory,
         execution_attempts,
         platform,
+        metadata: ProcessResultMetadata::default(),
       })
     })
     .to_boxed()
@@ -84,6 +84,8 @@ async fn make_execute_request() {
     is_nailgunnable: false,
     execution_slot_variable: None,
     cache_failures: false,
+    cpu_weight: 1,
+    memory_mb: 0,
   };
 
   let mut want_command = bazel_protos::remote_execution::Command::new();
@@ -165,6 +167,8 @@ async fn make_execute_request_with_instance_name() {
     is_nailgunnable: false,
     execution_slot_variable: None,
     cache_failures: false,
+    cpu_weight: 1,
+    memory_mb: 0,
   };
 
   let mut want_command = bazel_protos::remote_execution::Command::new();
@@ -259,6 +263,8 @@ async fn make_execute_request_with_cache_key_gen_version() {
     is_nailgunnable: false,
     execution_slot_variable: None,
     cache_failures: false,
+    cpu_weight: 1,
+    memory_mb: 0,
   };
 
   let mut want_command = bazel_protos::remote_execution::Command::new();
@@ -502,6 +508,8 @@ async fn make_execute_request_with_timeout() {
     is_nailgunnable: false,
     execution_slot_variable: None,
     cache_failures: false,
+    cpu_weight: 1,
+    memory_mb: 0,
   };
 
   let mut want_command = bazel_protos::remote_execution::Command::new();
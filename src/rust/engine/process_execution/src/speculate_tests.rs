@@ -2,7 +2,7 @@ use crate::remote_tests::echo_foo_request;
 use crate::speculate::SpeculatingCommandRunner;
 use crate::{
   CommandRunner, Context, FallibleProcessResultWithPlatform, MultiPlatformProcess, Platform,
-  PlatformConstraint, Process,
+  PlatformConstraint, Process, ProcessResultMetadata,
 };
 
 use async_trait::async_trait;
@@ -197,6 +197,7 @@ async fn make_delayed_command_runner(
       output_directory: EMPTY_DIGEST,
       execution_attempts: vec![],
       platform: Platform::current().unwrap(),
+      metadata: ProcessResultMetadata::default(),
     })
   };
   DelayedCommandRunner::new(
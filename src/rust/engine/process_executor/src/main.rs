@@ -373,6 +373,8 @@ async fn main() {
     is_nailgunnable,
     execution_slot_variable: None,
     cache_failures: false,
+    cpu_weight: 1,
+    memory_mb: 0,
   };
 
   let runner: Box<dyn process_execution::CommandRunner> = match server_arg {
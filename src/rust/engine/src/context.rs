@@ -23,7 +23,7 @@ use log::info;
 use parking_lot::Mutex;
 use process_execution::{
   self, speculate::SpeculatingCommandRunner, BoundedCommandRunner, CommandRunner, NamedCaches,
-  Platform, ProcessMetadata,
+  Platform, ProcessMetadata, ResourceWeights,
 };
 use rand::seq::SliceRandom;
 use regex::Regex;
@@ -96,6 +96,7 @@ pub struct ExecutionStrategyOptions {
   pub speculation_strategy: String,
   pub use_local_cache: bool,
   pub local_enable_nailgun: bool,
+  pub local_memory_mb: Option<usize>,
 }
 
 impl Core {
@@ -158,9 +159,15 @@ impl Core {
         Box::new(local_command_runner)
       };
 
-    Box::new(BoundedCommandRunner::new(
+    // Each local slot is granted an equal share of the memory budget (if any), so that processes
+    // which are expected to use more than that occupy additional slots.
+    let memory_mb_per_slot = exec_strategy_opts
+      .local_memory_mb
+      .map(|memory_mb| memory_mb / std::cmp::max(1, exec_strategy_opts.local_parallelism));
+    Box::new(BoundedCommandRunner::new_weighted(
       maybe_nailgunnable_local_command_runner,
       exec_strategy_opts.local_parallelism,
+      ResourceWeights::Hinted { memory_mb_per_slot },
     ))
   }
 
@@ -378,7 +385,7 @@ impl Core {
       &remoting_opts,
     )?;
 
-    let graph = Arc::new(InvalidatableGraph(Graph::new()));
+    let graph = Arc::new(InvalidatableGraph::new(Graph::new()));
 
     // These certs are for downloads, not to be confused with the ones used for remoting.
     let ca_certs = Core::load_certificates(ca_certs_path)?;
@@ -435,7 +442,31 @@ impl Core {
   }
 }
 
-pub struct InvalidatableGraph(Graph<NodeKey>);
+pub struct InvalidatableGraph {
+  graph: Graph<NodeKey>,
+  // The paths which have invalidated at least one Node since the last call to
+  // `drain_changed_paths`. Consumers like `--loop` use these to decide what needs to re-run.
+  changed_paths: Mutex<HashSet<PathBuf>>,
+}
+
+impl InvalidatableGraph {
+  pub fn new(graph: Graph<NodeKey>) -> InvalidatableGraph {
+    InvalidatableGraph {
+      graph,
+      changed_paths: Mutex::new(HashSet::new()),
+    }
+  }
+
+  ///
+  /// Returns (and forgets) the paths which have invalidated Nodes since the last call.
+  ///
+  pub fn drain_changed_paths(&self) -> Vec<PathBuf> {
+    let mut changed_paths = self.changed_paths.lock();
+    let mut paths: Vec<_> = changed_paths.drain().collect();
+    paths.sort();
+    paths
+  }
+}
 
 impl Invalidatable for InvalidatableGraph {
   fn invalidate(&self, paths: &HashSet<PathBuf>, caller: &str) -> usize {
@@ -450,6 +481,9 @@ impl Invalidatable for InvalidatableGraph {
       "{} invalidation: cleared {} and dirtied {} nodes for: {:?}",
       caller, cleared, dirtied, paths
     );
+    if cleared + dirtied > 0 {
+      self.changed_paths.lock().extend(paths.iter().cloned());
+    }
     cleared + dirtied
   }
 }
@@ -458,7 +492,7 @@ impl Deref for InvalidatableGraph {
   type Target = Graph<NodeKey>;
 
   fn deref(&self) -> &Graph<NodeKey> {
-    &self.0
+    &self.graph
   }
 }
 
@@ -170,6 +170,11 @@ py_module_initializer!(native_engine, |py, m| {
     "graph_invalidate_all_paths",
     py_fn!(py, graph_invalidate_all_paths(a: PyScheduler)),
   )?;
+  m.add(
+    py,
+    "graph_drain_changed_paths",
+    py_fn!(py, graph_drain_changed_paths(a: PyScheduler)),
+  )?;
   m.add(py, "graph_len", py_fn!(py, graph_len(a: PyScheduler)))?;
   m.add(
     py,
@@ -474,7 +479,8 @@ py_class!(class PyExecutionStrategyOptions |py| {
     speculation_delay: f64,
     speculation_strategy: String,
     use_local_cache: bool,
-    local_enable_nailgun: bool
+    local_enable_nailgun: bool,
+    local_memory_mb: u64
   ) -> CPyResult<Self> {
     Self::create_instance(py,
       ExecutionStrategyOptions {
@@ -485,6 +491,7 @@ py_class!(class PyExecutionStrategyOptions |py| {
         speculation_strategy,
         use_local_cache,
         local_enable_nailgun,
+        local_memory_mb: if local_memory_mb > 0 { Some(local_memory_mb as usize) } else { None },
       }
     )
   }
@@ -1135,6 +1142,18 @@ fn graph_invalidate_all_paths(py: Python, scheduler_ptr: PyScheduler) -> CPyResu
   })
 }
 
+fn graph_drain_changed_paths(py: Python, scheduler_ptr: PyScheduler) -> CPyResult<Vec<String>> {
+  with_scheduler(py, scheduler_ptr, |scheduler| {
+    Ok(
+      scheduler
+        .drain_changed_paths()
+        .into_iter()
+        .map(|path| path.to_string_lossy().into_owned())
+        .collect(),
+    )
+  })
+}
+
 fn check_invalidation_watcher_liveness(py: Python, scheduler_ptr: PyScheduler) -> PyUnitResult {
   with_scheduler(py, scheduler_ptr, |scheduler| {
     scheduler
@@ -1610,7 +1629,7 @@ fn write_digest(
         scheduler
           .core
           .store()
-          .materialize_directory(destination.clone(), lifted_digest)
+          .materialize_directory_incremental(destination.clone(), lifted_digest)
       })
       .map_err(|e| PyErr::new::<exc::ValueError, _>(py, (e,)))?;
       Ok(None)
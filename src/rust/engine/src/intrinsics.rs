@@ -183,6 +183,10 @@ fn multi_platform_process_request_to_process_result(
       })?;
 
     let platform_name: String = result.platform.into();
+    let total_elapsed_ms = match result.metadata.total_elapsed {
+      Some(elapsed) => externs::store_i64(elapsed.as_millis() as i64),
+      None => Value::from(externs::none()),
+    };
     Ok(externs::unsafe_call(
       context.core.types.process_result,
       &[
@@ -194,6 +198,9 @@ fn multi_platform_process_request_to_process_result(
           context.core.types.platform,
           &[externs::store_utf8(&platform_name)],
         ),
+        total_elapsed_ms,
+        Snapshot::store_file_digest(&context.core, &result.stdout_digest),
+        Snapshot::store_file_digest(&context.core, &result.stderr_digest),
       ],
     ))
   }
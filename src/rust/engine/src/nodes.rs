@@ -313,6 +313,9 @@ impl MultiPlatformExecuteProcess {
 
     let cache_failures: bool = externs::getattr(&value, "cache_failures").unwrap();
 
+    let cpu_weight: usize = externs::getattr(&value, "cpu_weight").unwrap();
+    let memory_mb: usize = externs::getattr(&value, "memory_mb").unwrap();
+
     Ok(process_execution::Process {
       argv: externs::getattr(&value, "argv").unwrap(),
       env,
@@ -329,6 +332,8 @@ impl MultiPlatformExecuteProcess {
       is_nailgunnable,
       execution_slot_variable,
       cache_failures,
+      cpu_weight,
+      memory_mb,
     })
   }
 
@@ -353,6 +353,13 @@ impl Scheduler {
     self.core.graph.invalidate(paths, "external")
   }
 
+  ///
+  /// Return (and forget) the paths which have invalidated the graph since the last call.
+  ///
+  pub fn drain_changed_paths(&self) -> Vec<PathBuf> {
+    self.core.graph.drain_changed_paths()
+  }
+
   ///
   /// Invalidate all filesystem dependencies in the graph.
   ///
@@ -30,6 +30,7 @@ from pants.init.extension_loader import (
     load_backends_and_plugins,
     load_plugins,
 )
+from pants.init.plugin_manifest import PluginActivation, PluginManifest
 from pants.option.subsystem import Subsystem
 from pants.util.ordered_set import FrozenOrderedSet
 
@@ -341,3 +342,38 @@ class LoaderTest(unittest.TestCase):
         # the plugin will override the alias registered by the backend
         registered_aliases = build_configuration.registered_aliases
         self.assertEqual(DummyObject2, registered_aliases.objects["override-alias"])
+
+    def test_plugin_manifest(self):
+        plugin_pkg = f"manifestplugin{uuid.uuid4().hex}"
+        plugin = types.ModuleType(plugin_pkg)
+        sys.modules[plugin_pkg] = plugin
+        setattr(plugin, "rules", lambda: [example_plugin_rule])
+        setattr(plugin, "after", lambda: ["demo2"])
+
+        manifest = PluginManifest(
+            (
+                PluginActivation(
+                    key="manifest-plugin",
+                    version="1.0.0",
+                    location="/not/consulted",
+                    metadata_dir="manifest_plugin-1.0.0.dist-info",
+                    has_pth_files=False,
+                    entry_points={
+                        "rules": f"{plugin_pkg}:rules",
+                        "load_after": f"{plugin_pkg}:after",
+                    },
+                ),
+            )
+        )
+        # Plugins in the manifest are loaded without consulting the working set, but may still
+        # depend on plugins which are only in the working set.
+        self.working_set.add(self.get_mock_plugin("demo2", "0.0.1"))
+        load_plugins(self.bc_builder, ["demo2", "manifest-plugin>=1.0"], self.working_set, manifest)
+        self.assertEqual(
+            self.bc_builder.create().rules, FrozenOrderedSet([example_plugin_rule.rule])
+        )
+
+        with self.assertRaises(PluginLoadOrderError):
+            load_plugins(self.bc_builder, ["manifest-plugin"], self.working_set, manifest)
+        with self.assertRaises(PluginNotFound):
+            load_plugins(self.bc_builder, ["manifest-plugin>=2.0"], self.working_set, manifest)
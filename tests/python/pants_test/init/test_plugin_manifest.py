@@ -0,0 +1,147 @@
+# Copyright 2020 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+import os
+import sys
+from pathlib import Path
+from textwrap import dedent
+
+import pkg_resources
+import pytest
+from pkg_resources import Requirement, VersionConflict
+
+from pants.init.plugin_manifest import PluginActivation, PluginManifest
+from pants.util.contextutil import temporary_dir
+
+
+def create_installed_plugin(location: str, name: str, version: str) -> None:
+    module = f"{name}_plugin"
+    Path(location, module).mkdir(parents=True)
+    Path(location, module, "__init__.py").touch()
+    Path(location, module, "register.py").write_text(
+        dedent(
+            """\
+            class Aliases:
+                @staticmethod
+                def build_file_aliases():
+                    return "aliases"
+
+
+            def rules():
+                return ["rule"]
+            """
+        )
+    )
+    dist_info = Path(location, f"{name}-{version}.dist-info")
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+    )
+    (dist_info / "entry_points.txt").write_text(
+        dedent(
+            f"""\
+            [pantsbuild.plugin]
+            rules = {module}.register:rules
+            build_file_aliases = {module}.register:Aliases.build_file_aliases
+
+            [console_scripts]
+            ignored = {module}.register:rules
+            """
+        )
+    )
+
+
+def test_manifest_round_trip_and_activation() -> None:
+    with temporary_dir() as tmpdir:
+        location = os.path.join(tmpdir, "Demo_Plugin-1.2.3-py3-none-any.whl-install")
+        create_installed_plugin(location, "Demo_Plugin", "1.2.3")
+
+        manifest = PluginManifest.from_locations([location])
+        assert manifest == PluginManifest(
+            (
+                PluginActivation(
+                    key="demo-plugin",
+                    version="1.2.3",
+                    location=location,
+                    metadata_dir="Demo_Plugin-1.2.3.dist-info",
+                    has_pth_files=False,
+                    entry_points={
+                        "build_file_aliases": (
+                            "Demo_Plugin_plugin.register:Aliases.build_file_aliases"
+                        ),
+                        "rules": "Demo_Plugin_plugin.register:rules",
+                    },
+                ),
+            )
+        )
+
+        manifest_path = os.path.join(tmpdir, "plugins.manifest.json")
+        manifest.dump(manifest_path)
+        assert PluginManifest.load(manifest_path) == manifest
+
+        activation = manifest.find(Requirement.parse("demo_plugin>=1.0"))
+        assert activation is not None
+        assert manifest.find(Requirement.parse("demo_plugin>=2.0")) is None
+        assert manifest.find(Requirement.parse("other")) is None
+
+        working_set = pkg_resources.working_set
+        sys_path, working_set_state = list(sys.path), working_set.__getstate__()
+        try:
+            manifest.activate()
+            assert location in sys.path
+            assert activation.load_entry_point("rules")() == ["rule"]
+            assert activation.load_entry_point("build_file_aliases")() == "aliases"
+        finally:
+            sys.path[:] = sys_path
+            working_set.__setstate__(working_set_state)
+            sys.modules.pop("Demo_Plugin_plugin.register", None)
+            sys.modules.pop("Demo_Plugin_plugin", None)
+
+
+def test_activation_adds_to_working_set(monkeypatch) -> None:
+    with temporary_dir() as tmpdir:
+        location = os.path.join(tmpdir, "Demo_Plugin-1.2.3-py3-none-any.whl-install")
+        create_installed_plugin(location, "Demo_Plugin", "1.2.3")
+        manifest = PluginManifest.from_locations([location])
+
+        working_set = pkg_resources.working_set
+        sys_path, working_set_state = list(sys.path), working_set.__getstate__()
+        try:
+            # The distributions are registered from the manifest, without scanning their locations.
+            with monkeypatch.context() as m:
+                m.setattr(pkg_resources, "find_distributions", pytest.fail)
+                manifest.activate()
+            assert location in working_set.entries
+            assert pkg_resources.get_distribution("demo_plugin").version == "1.2.3"
+            (entry_point,) = working_set.iter_entry_points("pantsbuild.plugin", "rules")
+            assert entry_point.load()() == ["rule"]
+            # A plugin requirement which the resolved version doesn't satisfy must conflict, rather
+            # than being reported as missing.
+            with pytest.raises(VersionConflict):
+                working_set.find(Requirement.parse("demo_plugin>=2.0"))
+        finally:
+            sys.path[:] = sys_path
+            working_set.__setstate__(working_set_state)
+            sys.modules.pop("Demo_Plugin_plugin.register", None)
+            sys.modules.pop("Demo_Plugin_plugin", None)
+
+
+def test_stale_manifest() -> None:
+    with temporary_dir() as tmpdir:
+        manifest_path = os.path.join(tmpdir, "plugins.manifest.json")
+        assert PluginManifest.load(manifest_path) is None
+
+        Path(manifest_path).write_text("not json")
+        assert PluginManifest.load(manifest_path) is None
+
+        # A manifest referring to a deleted plugin location must be recomputed.
+        missing = PluginActivation(
+            key="gone",
+            version="1.0",
+            location=os.path.join(tmpdir, "gone"),
+            metadata_dir="gone-1.0.dist-info",
+            has_pth_files=False,
+            entry_points={},
+        )
+        PluginManifest((missing,)).dump(manifest_path)
+        assert PluginManifest.load(manifest_path) is None
@@ -79,3 +79,32 @@ class TestGoalRuleIntegration(PantsDaemonIntegrationTestBase):
             assert [
                 f"{rel_tmpdir}:{name}" for name in ("one", "two", "three")
             ] == pants_result.stdout.splitlines()
+
+    def test_list_loop_only_reruns_affected_targets(self):
+        with self.pantsd_test_context(log_level="info") as (
+            workdir,
+            config,
+            checker,
+        ), temporary_dir(root_dir=get_buildroot()) as tmpdir:
+            rel_tmpdir = fast_relpath(tmpdir, get_buildroot())
+            for name in ("one", "two"):
+                safe_file_dump(os.path.join(tmpdir, name, "f.txt"), "")
+                safe_file_dump(os.path.join(tmpdir, name, "BUILD"), "files(sources=['f.txt'])")
+
+            handle = self.run_pants_with_workdir_without_waiting(
+                ["--loop", "--loop-max=2", "list", f"{tmpdir}::"], workdir=workdir, config=config
+            )
+            checker.assert_started()
+            time.sleep(10)
+
+            # Only the target which owns the changed file should be listed again.
+            safe_file_dump(os.path.join(tmpdir, "two", "f.txt"), "changed")
+
+            pants_result = handle.join()
+            pants_result.assert_success()
+            assert [
+                f"{rel_tmpdir}/one",
+                f"{rel_tmpdir}/two",
+                f"{rel_tmpdir}/two",
+            ] == pants_result.stdout.splitlines()
+            assert "skipping the 1 unaffected target" in pants_result.stderr